@@ -1,27 +1,43 @@
 # ai_hr_jd_project/app.py
 from flask import Flask, jsonify
 from config import Config
-from database.connection import init_db, SessionLocal # Import SessionLocal for teardown
-from routes.jd_routes import jd_bp
+from database import connection # SessionLocal is read at teardown time; it is only set by init_db()
+from routes.jd_routes import jd_bp, expiry_sweeper, request_profiler, similar_jds
+from services.metrics import install_metrics
+from services.request_timing import install_request_timing
+from services.warmup import start_warm_up
 from werkzeug.exceptions import HTTPException
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # Initialize Cloud SQL connection pool and create tables
-    # This should be called once when the application starts
-    with app.app_context():
-        init_db()
-
     # Register blueprints
     app.register_blueprint(jd_bp)
 
+    # Per-route latency/status, pool and Gemini metrics on /metrics (no-op without prometheus_client)
+    install_metrics(app)
+
+    # Server-Timing phase breakdown, slow-request logs and the opt-in profiler
+    install_request_timing(app, request_profiler)
+
+    # Database engine (plus schema upgrade, see DB_AUTO_MIGRATE) and Gemini client:
+    # now, on first use or in a background thread, depending on STARTUP_INIT
+    start_warm_up()
+
+    # Periodically mark expired JDs inactive (a database lease keeps replicas from overlapping)
+    if Config.EXPIRY_SWEEPER_ENABLED:
+        expiry_sweeper.start()
+
+    # Near-duplicate index: built and re-synced on its own thread, so /generate only reads memory
+    if similar_jds.enabled:
+        similar_jds.start()
+
     # Teardown context to close DB connections
     @app.teardown_appcontext
     def shutdown_session(exception=None):
-        if SessionLocal:
-            SessionLocal.remove()
+        if connection.SessionLocal:
+            connection.SessionLocal.remove()
 
     # Generic error handler for HTTPExceptions (like abort(404))
     @app.errorhandler(HTTPException)
@@ -0,0 +1,348 @@
+# ai_hr_jd_project/async_app.py
+# asyncio front end for the API. The LLM-bound routes, POST /api/jd/generate and
+# /api/jd/generate/stream, run as coroutines on the event loop: a generation that
+# is waiting on Gemini costs a socket and a suspended coroutine, not a worker
+# thread. Every other route is the unchanged Flask app, called through a bounded
+# thread pool (ASYNC_WSGI_THREADS), so CRUD keeps its threads however many
+# generations are in flight.
+#
+#   python async_app.py                                       # development, port 8085
+#   gunicorn "async_app:create_async_app()" --worker-class aiohttp.GunicornWebWorker --bind :$PORT
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from io import BytesIO
+
+from aiohttp import web
+from multidict import CIMultiDict
+from pydantic import ValidationError
+
+from app import create_app
+from config import Config
+from routes.jd_routes import _sse, gemini_service, generation_cache, similar_jds
+from schemas.jd_schemas import JDGenerateRequest
+from services import metrics
+from services.gemini_gateway import GeminiUnavailableError
+from services.generation_cache import generation_cache_key
+from services.request_timing import begin_request, current_phases, end_request, log_if_slow, phase, server_timing_header
+
+# Hop-by-hop or recomputed by aiohttp; never copied from the WSGI response
+_SKIPPED_RESPONSE_HEADERS = {"content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _resolve(future: asyncio.Future, result=None, error: BaseException | None = None) -> None:
+    # The awaiting handler may have been cancelled (client disconnected) before the app answered
+    if not future.done():
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class WSGIBridge:
+    """
+    Serves aiohttp requests with a WSGI app on a bounded thread pool. Buffered
+    responses come back in one hop. Streamed ones (no Content-Length: SSE,
+    NDJSON export) are iterated on a single pool thread, because Flask's
+    stream_with_context needs every chunk produced in the thread that started
+    it. The chunks are handed to the event loop through a small queue.
+    """
+
+    def __init__(self, wsgi_app, threads: int = 16, stream_queue_size: int = 8):
+        self.wsgi_app = wsgi_app
+        self.stream_queue_size = stream_queue_size
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    @staticmethod
+    def _environ(request: web.Request, body: bytes) -> dict:
+        host, _, port = (request.host or "localhost").partition(":")
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "SCRIPT_NAME": "",
+            # WSGI carries the decoded path as latin-1 code points of its UTF-8 bytes
+            "PATH_INFO": request.path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": request.query_string,
+            "SERVER_NAME": host,
+            "SERVER_PORT": port or ("443" if request.secure else "80"),
+            "SERVER_PROTOCOL": f"HTTP/{request.version.major}.{request.version.minor}",
+            "REMOTE_ADDR": request.remote or "",
+            "CONTENT_TYPE": request.headers.get("Content-Type", ""),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": request.scheme,
+            "wsgi.input": BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.headers.items():
+            key = "HTTP_" + name.upper().replace("-", "_")
+            if key in ("HTTP_CONTENT_TYPE", "HTTP_CONTENT_LENGTH"):
+                continue
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _run(self, environ: dict, loop, head: asyncio.Future, chunks: asyncio.Queue, stop: threading.Event):
+        """Runs in a pool thread: calls the app, resolves `head`, then feeds `chunks` if the body is streamed."""
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured["status"], captured["headers"] = status, headers
+
+        result = None
+        streamed = False
+        try:
+            result = self.wsgi_app(environ, start_response)
+            iterator = iter(result)
+            first = next(iterator, b"") # by now a generator-backed response has called start_response
+            streamed = not any(name.lower() == "content-length" for name, _ in captured["headers"])
+            if not streamed:
+                body = first + b"".join(iterator)
+                loop.call_soon_threadsafe(_resolve, head, (captured["status"], captured["headers"], body))
+                return
+            loop.call_soon_threadsafe(_resolve, head, (captured["status"], captured["headers"], None))
+            for piece in itertools.chain([first], iterator):
+                if stop.is_set():
+                    return
+                if piece:
+                    # Blocks while the queue is full, so a slow client slows the producer down
+                    asyncio.run_coroutine_threadsafe(chunks.put(piece), loop).result()
+        except BaseException as e:
+            if not streamed:
+                loop.call_soon_threadsafe(_resolve, head, None, e)
+            raise
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close() # runs Flask's teardown for streamed responses
+            if streamed and not stop.is_set():
+                asyncio.run_coroutine_threadsafe(chunks.put(None), loop).result()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        loop = asyncio.get_running_loop()
+        environ = self._environ(request, await request.read())
+        head = loop.create_future()
+        chunks = asyncio.Queue(maxsize=self.stream_queue_size)
+        stop = threading.Event()
+        done = loop.run_in_executor(self.executor, self._run, environ, loop, head, chunks, stop)
+        done.add_done_callback(lambda f: f.cancelled() or f.exception()) # errors already reached `head`
+
+        try:
+            status, headers, body = await head
+            code, _, reason = status.partition(" ")
+            response_headers = CIMultiDict(
+                (name, value) for name, value in headers if name.lower() not in _SKIPPED_RESPONSE_HEADERS
+            )
+            if body is not None:
+                return web.Response(status=int(code), reason=reason or None, body=body, headers=response_headers)
+
+            response = web.StreamResponse(status=int(code), reason=reason or None, headers=response_headers)
+            await response.prepare(request)
+            while (piece := await chunks.get()) is not None:
+                await response.write(piece)
+            await response.write_eof()
+            return response
+        finally:
+            # Finished, or the client went away: stop the producer and unblock a pending put
+            stop.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Async generation routes -------------------------------------------------
+
+def _json_response(data, status: int = 200, headers: dict | None = None) -> web.Response:
+    # Same bytes as Flask's jsonify: sorted keys, compact separators, trailing newline
+    body = json.dumps(data, sort_keys=True, separators=(",", ":")) + "\n"
+    return web.Response(body=body.encode("utf-8"), status=status, content_type="application/json",
+                        headers=headers)
+
+
+def _http_error(code: int, name: str, description: str) -> web.Response:
+    # The shape of create_app()'s HTTPException handler
+    return _json_response({"code": code, "name": name, "description": description}, status=code)
+
+
+def _unavailable(e: GeminiUnavailableError) -> web.Response:
+    headers = {"Retry-After": str(max(1, int(round(e.retry_after))))} if e.retry_after else None
+    return _json_response({"error": "JD generation temporarily unavailable", "details": str(e)}, 503, headers)
+
+
+async def _read_generate_request(request: web.Request):
+    """Returns (JDGenerateRequest, None) or (None, error response), matching the Flask route."""
+    if request.content_type != "application/json":
+        return None, _http_error(415, "Unsupported Media Type",
+                                 "Did not attempt to load JSON data because the request Content-Type "
+                                 "was not 'application/json'.")
+    try:
+        payload = await request.json()
+    except ValueError:
+        return None, _http_error(400, "Bad Request", "Failed to decode JSON object.")
+    try:
+        with phase("validate"):
+            return JDGenerateRequest.model_validate(payload), None
+    except ValidationError as e:
+        metrics.record_validation_failure("request")
+        return None, _json_response({"detail": e.errors()}, status=422)
+
+
+def _wants_cache_bypass(request: web.Request, req_data: JDGenerateRequest) -> bool:
+    return req_data.bypass_cache or "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+
+async def _find_similar(req_data: JDGenerateRequest, bypass: bool):
+    # As in the Flask routes; off the loop because "return" mode reads the matched JD's content
+    if not similar_jds.enabled or bypass:
+        return None
+    try:
+        with phase("similarity"):
+            return await asyncio.to_thread(similar_jds.best_match, req_data)
+    except Exception as e:
+        print(f"Similar JD lookup failed: {e}")
+        return None
+
+
+def _observed(route: str):
+    """Per-request phases, Server-Timing, metrics and the slow-request log for a coroutine route."""
+    def decorator(handler):
+        async def wrapper(request: web.Request) -> web.StreamResponse:
+            token = begin_request()
+            request["timing_started"] = started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status
+                if Config.SERVER_TIMING_ENABLED and not response.prepared:
+                    response.headers["Server-Timing"] = server_timing_header(
+                        current_phases(), time.perf_counter() - started)
+                return response
+            finally:
+                total = time.perf_counter() - started
+                phases = end_request(token)
+                metrics.record_http_request(request.method, route, status, total)
+                log_if_slow(request.method, route, status, phases, total)
+        return wrapper
+    return decorator
+
+
+@_observed("/api/jd/generate")
+async def generate_jd(request: web.Request) -> web.Response:
+    req_data, error = await _read_generate_request(request)
+    if error is not None:
+        return error
+    bypass = _wants_cache_bypass(request, req_data)
+    similar = await _find_similar(req_data, bypass)
+    try:
+        if similar is not None and similar_jds.mode == "return":
+            generated_content, cache_status = similar.content, "SIMILAR"
+        else:
+            generated_content, cache_status = await generation_cache.aget_or_generate(
+                req_data, gemini_service.agenerate_structured_jd, bypass=bypass
+            )
+        with phase("serialize"):
+            response = _json_response(generated_content.model_dump())
+        response.headers["X-Cache"] = cache_status
+        if similar is not None:
+            response.headers.update(similar.headers())
+        return response
+    except GeminiUnavailableError as e:
+        return _unavailable(e)
+    except Exception as e:
+        print(f"Error in /generate endpoint: {e}")
+        return _json_response({"error": "Failed to generate JD", "details": str(e)}, status=500)
+
+
+@_observed("/api/jd/generate/stream")
+async def generate_jd_stream(request: web.Request) -> web.StreamResponse:
+    req_data, error = await _read_generate_request(request)
+    if error is not None:
+        return error
+
+    bypass = _wants_cache_bypass(request, req_data)
+    cache_key = generation_cache_key(req_data)
+    cached = None
+    similar = await _find_similar(req_data, bypass)
+    if similar is not None and similar_jds.mode == "return":
+        cached = similar.content
+    elif generation_cache.enabled and not bypass:
+        cached = await asyncio.to_thread(generation_cache.get, cache_key)
+    if similar is not None and similar_jds.mode == "return":
+        cache_status = "SIMILAR"
+    elif cached is not None:
+        cache_status = "HIT"
+    elif not generation_cache.enabled:
+        cache_status = "DISABLED"
+    else:
+        cache_status = "BYPASS" if bypass else "MISS"
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        "X-Cache": cache_status,
+        **(similar.headers() if similar is not None else {}),
+    })
+    if Config.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = server_timing_header(
+            current_phases(), time.perf_counter() - request["timing_started"])
+    await response.prepare(request)
+
+    async def send(event: str, data) -> None:
+        await response.write(_sse(event, data).encode("utf-8"))
+
+    if cached is not None:
+        content = cached.model_dump()
+        for name, value in content.items():
+            await send("field", {"name": name, "value": value})
+        await send("done", content)
+    else:
+        try:
+            async with aclosing(gemini_service.astream_structured_jd(req_data)) as events:
+                async for kind, name, value in events:
+                    if kind == "field":
+                        await send("field", {"name": name, "value": value})
+                    else:
+                        if generation_cache.enabled:
+                            await asyncio.to_thread(generation_cache.set, cache_key, value)
+                        await send("done", value.model_dump())
+        except GeminiUnavailableError as e:
+            await send("error", {"error": "JD generation temporarily unavailable", "details": str(e),
+                                 "retry_after": e.retry_after})
+        except ConnectionResetError:
+            raise # the client went away; nothing left to tell it
+        except Exception as e:
+            print(f"Error in /generate/stream endpoint: {e}")
+            await send("error", {"error": "Failed to generate JD", "details": str(e)})
+    await response.write_eof()
+    return response
+
+
+def create_async_app(flask_app=None) -> web.Application:
+    flask_app = flask_app or create_app()
+    bridge = WSGIBridge(flask_app, threads=Config.ASYNC_WSGI_THREADS)
+
+    app = web.Application(client_max_size=Config.ASYNC_MAX_BODY_BYTES)
+    app.router.add_post("/api/jd/generate", generate_jd)
+    app.router.add_post("/api/jd/generate/stream", generate_jd_stream)
+    # Everything else, including GET on the two paths above, is served by Flask
+    app.router.add_route("*", "/{path:.*}", bridge.handle)
+
+    async def _shutdown_bridge(app):
+        bridge.shutdown()
+
+    app.on_cleanup.append(_shutdown_bridge)
+    return app
+
+
+if __name__ == '__main__':
+    web.run_app(create_async_app(), host='0.0.0.0', port=int(os.environ.get("PORT", "8085")))
@@ -0,0 +1,435 @@
+# ai_hr_jd_project/benchmarks/bench_api.py
+# End-to-end benchmark of the JD API: boots create_app() against a local database
+# with a stubbed Gemini client, drives a mixed workload at several concurrency
+# levels, and reports latency percentiles and throughput per endpoint.
+#
+# Run from the JdGen directory:
+#   python benchmarks/bench_api.py --concurrency 1,8,32 --duration 20
+#   python benchmarks/bench_api.py --compare benchmarks/results/<earlier run>.json
+#   python benchmarks/bench_api.py --base-url http://127.0.0.1:8085   # an already running server
+#   python benchmarks/bench_api.py --server async --threads 16       # async_app.py instead of Flask alone
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+DEFAULT_MIX = "generate=5,create=10,list=25,get=40,update=10,delete=10"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JD API end-to-end benchmark")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated client thread counts")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unmeasured traffic per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. get=80,list=20")
+    parser.add_argument("--seed-jds", type=int, default=200, help="JDs inserted before the run")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--database-url", default=None, help="defaults to a fresh SQLite file")
+    parser.add_argument("--base-url", default=None, help="benchmark this server instead of an in-process one")
+    parser.add_argument("--server", choices=("threaded", "async"), default="threaded",
+                        help="in-process server: Flask on werkzeug threads, or async_app.py")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="worker threads (threaded: 0 = one per request; async: ASYNC_WSGI_THREADS)")
+    parser.add_argument("--output", default=None, help="results JSON (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    return parser.parse_args(argv)
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+# --- In-process server -------------------------------------------------------
+
+def _pooled_server(app, threads: int):
+    """werkzeug's server with a fixed pool of worker threads, like gunicorn --threads."""
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        def __init__(self):
+            super().__init__("127.0.0.1", 0, app)
+            self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="bench-worker")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process, request, client_address)
+
+        def _process(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    return PooledWSGIServer()
+
+
+class AsyncServer:
+    """async_app.py on its own event loop thread; shutdown() mirrors werkzeug's server."""
+
+    def __init__(self, app):
+        import asyncio
+        from aiohttp import web
+
+        self.loop = asyncio.new_event_loop()
+        self.runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0, backlog=1024)
+        self.loop.run_until_complete(site.start())
+        self.server_port = self.runner.addresses[0][1]
+
+    def serve_forever(self):
+        self.loop.run_forever()
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def start_local_server(args) -> tuple[str, object]:
+    """Boots create_app() (or async_app.py) in-process. Returns (base_url, server)."""
+    database_url = args.database_url
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='jd-bench-'), 'bench.db')}"
+    # Config reads the environment at import time, so this has to happen before importing the app
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ.setdefault("EXPIRY_SWEEPER_ENABLED", "false")
+    os.environ.setdefault("GEN_CACHE_ENABLED", "false") # measure the generation path, not the cache
+    os.environ.setdefault("DB_POOL_SIZE", "16")
+    os.environ.setdefault("REQUEST_LOG_SLOW_MS", "-1")
+    if args.server == "async" and args.threads:
+        os.environ["ASYNC_WSGI_THREADS"] = str(args.threads)
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from stub_gemini import install_stub_client
+
+    install_stub_client(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms, seed=args.seed)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING) # no access log line per request
+    app = create_app()
+    if args.server == "async":
+        from async_app import create_async_app
+        server = AsyncServer(create_async_app(app))
+    elif args.threads:
+        server = _pooled_server(app, args.threads)
+    else:
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+# --- Client ------------------------------------------------------------------
+
+class Client:
+    """One keep-alive HTTP connection per worker thread."""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.conn = None
+
+    def request(self, method: str, path: str, body=None) -> tuple[int, bytes]:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            try:
+                self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        raise RuntimeError("unreachable")
+
+
+def jd_payload(rng: random.Random, n: int) -> dict:
+    title = f"Benchmark Engineer {n}"
+    return {
+        "job_title": title,
+        "jd_content": {
+            "job_title": title,
+            "company_summary": "A benchmark company.",
+            "role_summary": "Builds and runs services. " * 5,
+            "key_responsibilities": [f"Responsibility {i}" for i in range(rng.randint(4, 10))],
+            "required_qualifications": rng.sample(["Python", "Go", "SQL", "Kubernetes", "Terraform", "Kafka"], 3),
+            "preferred_qualifications": ["Rust"],
+            "benefits": ["Remote-friendly"],
+        },
+    }
+
+
+class Workload:
+    """Shared state between workers: ids that exist, and ids each worker may delete."""
+
+    def __init__(self, weights: dict, seed: int):
+        self.names = list(weights)
+        self.weights = [weights[name] for name in self.names]
+        self.seed = seed
+        self.ids = []
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def next_n(self) -> int:
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def random_id(self, rng: random.Random):
+        with self.lock:
+            return rng.choice(self.ids) if self.ids else None
+
+    def add_id(self, job_id: int) -> None:
+        with self.lock:
+            self.ids.append(job_id)
+
+    def take_id(self, rng: random.Random):
+        with self.lock:
+            if len(self.ids) <= 10: # keep a few around for get/update
+                return None
+            return self.ids.pop(rng.randrange(len(self.ids)))
+
+
+def op_generate(client, workload, rng):
+    n = workload.next_n()
+    return client.request("POST", "/api/jd/generate", {
+        "job_title_input": f"Benchmark Engineer {n}",
+        "key_responsibilities_input": ["Build services", "Review code"],
+        "required_skills_input": ["Python", "SQL"],
+    })
+
+
+def op_create(client, workload, rng):
+    status, body = client.request("POST", "/api/jd", jd_payload(rng, workload.next_n()))
+    if status == 201:
+        workload.add_id(json.loads(body)["job_id"])
+    return status, body
+
+
+def op_list(client, workload, rng):
+    return client.request("GET", "/api/jd?limit=25")
+
+
+def op_get(client, workload, rng):
+    job_id = workload.random_id(rng)
+    return client.request("GET", f"/api/jd/{job_id}")
+
+
+def op_update(client, workload, rng):
+    job_id = workload.random_id(rng)
+    return client.request("PUT", f"/api/jd/{job_id}", {"status": rng.choice(["active", "inactive"])})
+
+
+def op_delete(client, workload, rng):
+    job_id = workload.take_id(rng)
+    if job_id is None:
+        return op_create(client, workload, rng) # nothing spare to delete: keep the pool stocked
+    return client.request("DELETE", f"/api/jd/{job_id}")
+
+
+OPERATIONS = {
+    "generate": op_generate,
+    "create": op_create,
+    "list": op_list,
+    "get": op_get,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+def seed_database(client: Client, workload: Workload, count: int) -> None:
+    rng = random.Random(workload.seed)
+    for start in range(0, count, 500):
+        batch = [jd_payload(rng, workload.next_n()) for _ in range(min(500, count - start))]
+        status, body = client.request("POST", "/api/jd/bulk", batch)
+        if status not in (200, 201, 207):
+            raise SystemExit(f"Seeding failed: HTTP {status} {body[:200]!r}")
+        for job_id in json.loads(body).get("created_ids") or []:
+            workload.add_id(job_id)
+
+
+# --- Measurement -------------------------------------------------------------
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def run_level(base_url: str, workload: Workload, concurrency: int, duration: float, warmup: float) -> dict:
+    samples = {name: [] for name in workload.names} # name -> [(latency_s, ok)]
+    samples_lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+
+    def worker(index: int):
+        rng = random.Random(workload.seed * 1000 + concurrency * 100 + index)
+        client = Client(base_url)
+        local = {name: [] for name in workload.names}
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            name = rng.choices(workload.names, weights=workload.weights)[0]
+            started = time.perf_counter()
+            try:
+                status, _ = OPERATIONS[name](client, workload, rng)
+                ok = status < 400
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if now >= measure_from:
+                local[name].append((elapsed, ok))
+        with samples_lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    endpoints = {}
+    for name, values in samples.items():
+        latencies = sorted(elapsed for elapsed, _ in values)
+        errors = sum(1 for _, ok in values if not ok)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors,
+            "rps": round(len(values) / duration, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+    all_latencies = sorted(elapsed for values in samples.values() for elapsed, _ in values)
+    total = {
+        "requests": len(all_latencies),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "rps": round(len(all_latencies) / duration, 2),
+        "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(all_latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 2),
+    }
+    return {"concurrency": concurrency, "duration_s": duration, "total": total, "endpoints": endpoints}
+
+
+def print_level(level: dict) -> None:
+    print(f"\n== concurrency {level['concurrency']} ==")
+    print(f"{'endpoint':<10}{'reqs':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in list(level["endpoints"].items()) + [("TOTAL", level["total"])]:
+        print(f"{name:<10}{row['requests']:>8}{row['errors']:>6}{row['rps']:>9}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+def print_comparison(current: dict, baseline: dict) -> None:
+    """p95 and rps per endpoint and level, relative to the baseline run."""
+    print(f"\n== compared with {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')}) ==")
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in current["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        print(f"-- concurrency {level['concurrency']}")
+        for name, row in list(level["endpoints"].items()) + [("TOTAL", level["total"])]:
+            old = before["endpoints"].get(name) if name != "TOTAL" else before["total"]
+            if not old or not old["requests"] or not row["requests"]:
+                continue
+            p95_change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            rps_change = (row["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            print(f"   {name:<10} p95 {old['p95_ms']:>9} -> {row['p95_ms']:<9} ({p95_change:+.1f}%)"
+                  f"   rps {old['rps']:>8} -> {row['rps']:<8} ({rps_change:+.1f}%)")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BENCH_DIR, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    weights = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+    else:
+        base_url, server = start_local_server(args)
+
+    workload = Workload(weights, args.seed)
+    print(f"Seeding {args.seed_jds} JDs into {base_url} ...")
+    seed_database(Client(base_url), workload, args.seed_jds)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": args.base_url or "in-process",
+            "server": None if args.base_url else args.server,
+            "threads": args.threads,
+            "database_url": os.environ.get("DATABASE_URL") if server else None,
+            "mix": weights,
+            "seed_jds": args.seed_jds,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+        },
+        "levels": [],
+    }
+    try:
+        for concurrency in levels:
+            level = run_level(base_url, workload, concurrency, args.duration, args.warmup)
+            results["levels"].append(level)
+            print_level(level)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"{datetime.utcnow():%Y%m%dT%H%M%SZ}-{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
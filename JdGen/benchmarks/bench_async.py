@@ -0,0 +1,101 @@
+# ai_hr_jd_project/benchmarks/bench_async.py
+# Load test of the two serving modes under the same generation-heavy workload:
+# Flask on a fixed pool of worker threads (what gunicorn --threads gives us) and
+# async_app.py, where generations are coroutines and only CRUD uses the pool.
+# Each mode runs bench_api.py in its own process, then the runs are compared.
+#
+# Run from the JdGen directory:
+#   python benchmarks/bench_async.py
+#   python benchmarks/bench_async.py --concurrency 32,128,512 --llm-latency-ms 5000 --threads 16
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_api import git_commit, print_comparison
+
+MODES = ("threaded", "async")
+CRUD_OPERATIONS = ("create", "list", "get", "update", "delete")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Threaded vs async serving under LLM-bound load")
+    parser.add_argument("--concurrency", default="16,64,256", help="comma separated client counts")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--mix", default="generate=50,get=30,list=10,update=5,create=5")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads in both modes")
+    parser.add_argument("--llm-latency-ms", type=float, default=3000)
+    parser.add_argument("--llm-jitter-ms", type=float, default=500)
+    parser.add_argument("--seed-jds", type=int, default=200)
+    parser.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    return parser.parse_args(argv)
+
+
+def run_mode(mode: str, args) -> dict:
+    output = os.path.join(args.output_dir, f"async-compare-{git_commit()}-{mode}.json")
+    env = dict(os.environ)
+    # Measure the serving model rather than the gateway's thread-mode concurrency cap
+    env.setdefault("GEMINI_MAX_CONCURRENCY", "4096")
+    env.setdefault("GEMINI_ASYNC_MAX_CONCURRENCY", "4096")
+    env.setdefault("GEMINI_QUEUE_TIMEOUT_SECONDS", "120")
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, "bench_api.py"),
+        "--server", mode, "--threads", str(args.threads),
+        "--concurrency", args.concurrency, "--duration", str(args.duration), "--warmup", str(args.warmup),
+        "--mix", args.mix, "--seed-jds", str(args.seed_jds),
+        "--llm-latency-ms", str(args.llm_latency_ms), "--llm-jitter-ms", str(args.llm_jitter_ms),
+        "--database-url", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix=f'jd-{mode}-'), 'bench.db')}",
+        "--output", output,
+    ]
+    print(f"\n######## {mode} ########", flush=True)
+    subprocess.run(command, check=True, env=env)
+    with open(output) as f:
+        return json.load(f)
+
+
+def crud_summary(level: dict) -> dict:
+    """Request-weighted p50/p95 over the CRUD endpoints of one level."""
+    rows = [level["endpoints"][name] for name in CRUD_OPERATIONS if name in level["endpoints"]]
+    requests = sum(row["requests"] for row in rows)
+    if not requests:
+        return {"requests": 0, "p50_ms": 0.0, "p95_ms": 0.0}
+    return {
+        "requests": requests,
+        "p50_ms": round(sum(row["p50_ms"] * row["requests"] for row in rows) / requests, 2),
+        "p95_ms": round(max(row["p95_ms"] for row in rows if row["requests"]), 2),
+    }
+
+
+def print_summary(runs: dict) -> None:
+    print("\n== threaded vs async ==")
+    print(f"{'clients':>8} {'mode':<9}{'gen rps':>9}{'gen p95 ms':>12}{'gen err':>9}"
+          f"{'crud rps':>10}{'crud p50 ms':>13}{'crud p95 ms':>13}")
+    levels = {mode: {level["concurrency"]: level for level in run["levels"]} for mode, run in runs.items()}
+    for concurrency in sorted(levels["threaded"]):
+        for mode in MODES:
+            level = levels[mode].get(concurrency)
+            if level is None:
+                continue
+            generate = level["endpoints"].get("generate", {"rps": 0, "p95_ms": 0, "errors": 0})
+            crud = crud_summary(level)
+            print(f"{concurrency:>8} {mode:<9}{generate['rps']:>9}{generate['p95_ms']:>12}{generate['errors']:>9}"
+                  f"{round(crud['requests'] / level['duration_s'], 2):>10}{crud['p50_ms']:>13}{crud['p95_ms']:>13}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    runs = {mode: run_mode(mode, args) for mode in MODES}
+    print_summary(runs)
+    print_comparison(runs["async"], runs["threaded"]) # async relative to threaded
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
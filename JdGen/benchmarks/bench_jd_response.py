@@ -0,0 +1,77 @@
+# ai_hr_jd_project/benchmarks/bench_jd_response.py
+# Per-request CPU of building the GET /api/jd/<id> body, old path vs. the splice fast path.
+# No database or network involved. Run from the JdGen directory:
+#   python benchmarks/bench_jd_response.py [--iterations 20000]
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from database.models import JobStatus
+from schemas.jd_schemas import JDResponse, JobDescriptionContent
+from services.jd_service import JDService
+
+
+def sample_row():
+    content = JobDescriptionContent(
+        job_title="Senior Backend Engineer",
+        company_summary="A fast-growing fintech company building payment infrastructure. " * 3,
+        role_summary="Own the design and delivery of core backend services. " * 4,
+        key_responsibilities=[f"Responsibility {i}: design, build and operate services at scale." for i in range(12)],
+        required_qualifications=[f"Qualification {i}: several years of Python, SQL and cloud." for i in range(10)],
+        preferred_qualifications=[f"Nice to have {i}: Kubernetes, Terraform, Kafka." for i in range(6)],
+        benefits=[f"Benefit {i}" for i in range(8)],
+    )
+    return SimpleNamespace(
+        id=42, job_title="Senior Backend Engineer", jd_content_json=content.model_dump_json(),
+        created_at=datetime(2025, 1, 1, 12, 0, 0), expires_at=datetime(2025, 1, 1) + timedelta(days=30),
+        status=JobStatus.ACTIVE,
+    )
+
+
+def legacy_body(service: JDService, row) -> bytes:
+    # What get_jd_endpoint did before: parse, build JDResponse, model_dump, jsonify
+    response_data = JDResponse(
+        id=row.id, job_title=row.job_title, jd_content=service.parse_jd_content(row.jd_content_json),
+        created_at=row.created_at, expires_at=row.expires_at, status=row.status.value,
+    )
+    return jsonify(response_data.model_dump()).get_data()
+
+
+def measure(label: str, fn, iterations: int) -> float:
+    fn() # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    per_call_us = (time.process_time() - start) / iterations * 1e6
+    print(f"{label:<28} {per_call_us:9.1f} us CPU / request")
+    return per_call_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GET /api/jd/<id> serialization microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    service = JDService()
+    row = sample_row()
+    app = Flask(__name__)
+    with app.app_context():
+        # Same document either way, only key order inside jd_content differs
+        assert json.loads(legacy_body(service, row)) == json.loads(service.render_jd_json(row))
+        print(f"body size: {len(service.render_jd_json(row))} bytes, {args.iterations} iterations")
+        legacy = measure("parse + JDResponse + jsonify", lambda: legacy_body(service, row), args.iterations)
+        strict = measure("render_jd_json(strict=True)", lambda: service.render_jd_json(row, strict=True), args.iterations)
+        fast = measure("render_jd_json()", lambda: service.render_jd_json(row), args.iterations)
+    print(f"saved per request: {legacy - fast:.1f} us ({legacy / fast:.1f}x), strict mode saves {legacy - strict:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# ai_hr_jd_project/benchmarks/bench_startup.py
+# Cold-start cost of the API per STARTUP_INIT mode: importing the app, create_app(),
+# and the first request of each kind, which in lazy mode pays for the database
+# engine and the Gemini client. Every run is a fresh interpreter, so module
+# imports are measured cold (apart from the OS file cache).
+#
+# Run from the JdGen directory:
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --modes eager,lazy --runs 10 --importtime 15
+#
+# The schema is created once with `manage.py migrate` beforehand and every run
+# uses DB_AUTO_MIGRATE=false, as a deploy with a migration step would. The first
+# generation uses the stubbed Gemini client with no latency, so it shows what the
+# first live call adds (importing google-genai, building the client) and not the
+# LLM itself.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+
+RESULT_PREFIX = "startup-result: " # the app prints its own lines to stdout too
+STEPS = ("import_ms", "create_app_ms", "first_health_ms", "first_db_ms", "first_generate_ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import, create_app() and first-request latency per STARTUP_INIT mode")
+    parser.add_argument("--modes", default="eager,lazy,background", help="comma separated STARTUP_INIT values")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    parser.add_argument("--database-url", default=None, help="default: a temporary SQLite file")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="also list the N slowest imports of `import app` (python -X importtime)")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def measure_once() -> dict:
+    """Runs in the child process; the environment is already set up by the parent."""
+    sys.path.insert(0, APP_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    timings = {}
+
+    started = time.perf_counter()
+    import app
+    timings["import_ms"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    flask_app = app.create_app()
+    timings["create_app_ms"] = _elapsed_ms(started)
+    client = flask_app.test_client()
+
+    started = time.perf_counter()
+    response = client.get("/health")
+    timings["first_health_ms"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    response = client.get("/api/jd?limit=1")
+    timings["first_db_ms"] = _elapsed_ms(started)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET /api/jd returned {response.status_code}: {response.get_data(as_text=True)}")
+
+    from services.gemini_gateway import get_gateway
+    from stub_gemini import StubGeminiClient
+
+    started = time.perf_counter()
+    gateway = get_gateway()
+    gateway.warm() # what the first live call pays unless STARTUP_INIT already did it
+    gateway._client = StubGeminiClient(latency_ms=0, jitter_ms=0)
+    response = client.post("/api/jd/generate", json={
+        "job_title_input": "Startup Benchmark Engineer",
+        "key_responsibilities_input": ["Build services", "Review code"],
+        "required_skills_input": ["Python", "SQL"],
+    })
+    timings["first_generate_ms"] = _elapsed_ms(started)
+    if response.status_code != 200:
+        raise RuntimeError(f"POST /api/jd/generate returned {response.status_code}: {response.get_data(as_text=True)}")
+    return timings
+
+
+def child_env(database_url: str, mode: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "STARTUP_INIT": mode,
+        "DB_AUTO_MIGRATE": "false",
+        "LLM_PROVIDER": "gemini",
+        "GOOGLE_API_KEY": env.get("GOOGLE_API_KEY") or "benchmark", # the stub replaces the client before any call
+        "EXPIRY_SWEEPER_ENABLED": "false",
+        "GEN_CACHE_ENABLED": "false",
+        "REQUEST_LOG_SLOW_MS": "-1",
+    })
+    return env
+
+
+def run_child(env: dict) -> dict:
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=APP_DIR, env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{completed.stderr or completed.stdout}")
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"No result in the startup run's output:\n{completed.stdout}")
+
+
+def migrate(database_url: str) -> None:
+    env = child_env(database_url, "lazy")
+    subprocess.run([sys.executable, "manage.py", "migrate"], cwd=APP_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def slowest_imports(env: dict, count: int) -> list[dict]:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=APP_DIR, env=env,
+                               capture_output=True, text=True, check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append({"module": name, "cumulative_ms": round(int(cumulative) / 1000, 2)})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:count]
+
+
+def summarize(runs: list[dict]) -> dict:
+    return {
+        step: {
+            "median": round(statistics.median(run[step] for run in runs), 2),
+            "min": min(run[step] for run in runs),
+            "max": max(run[step] for run in runs),
+        }
+        for step in STEPS
+    }
+
+
+def print_table(summaries: dict) -> None:
+    print(f"\n{'mode':<12}" + "".join(f"{step[:-3]:>18}" for step in STEPS) + f"{'total':>10}")
+    for mode, summary in summaries.items():
+        medians = [summary[step]["median"] for step in STEPS]
+        print(f"{mode:<12}" + "".join(f"{median:>18}" for median in medians) + f"{round(sum(medians), 2):>10}")
+    print("(median milliseconds per step)")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.child:
+        print(RESULT_PREFIX + json.dumps(measure_once()), flush=True)
+        return 0
+
+    database_url = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='jd-startup-'), 'startup.db')}"
+    migrate(database_url)
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+
+    results = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "database_url": database_url,
+        },
+        "modes": {},
+    }
+    for mode in modes:
+        runs = [run_child(child_env(database_url, mode)) for _ in range(args.runs)]
+        results["modes"][mode] = {"runs": runs, "summary": summarize(runs)}
+    print_table({mode: result["summary"] for mode, result in results["modes"].items()})
+
+    if args.importtime:
+        results["slowest_imports"] = slowest_imports(child_env(database_url, "lazy"), args.importtime)
+        print("\nSlowest imports of `import app` (cumulative ms):")
+        for row in results["slowest_imports"]:
+            print(f"{row['cumulative_ms']:>10}  {row['module']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# ai_hr_jd_project/benchmarks/stub_gemini.py
+# Deterministic stand-in for genai.Client used by the benchmarks: same call shape
+# (client.models.generate_content / generate_content_stream, and the client.aio
+# coroutine versions), canned JSON built from the prompt, and a configurable,
+# seeded latency instead of a network call.
+import asyncio
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+
+def _fake_response(text: str):
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(text=text, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+                           prompt_feedback=None)
+
+
+def canned_jd(prompt: str) -> dict:
+    from services.llm_providers import StubProvider # same canned JD as LLM_PROVIDER=stub
+    return StubProvider.canned_jd(prompt)
+
+
+class _StubModels:
+    def __init__(self, stub: "StubGeminiClient"):
+        self._stub = stub
+
+    def generate_content(self, model=None, contents=None, config=None, **kwargs):
+        time.sleep(self._stub.next_latency())
+        return _fake_response(json.dumps(canned_jd(contents)))
+
+    def generate_content_stream(self, model=None, contents=None, config=None, **kwargs):
+        text = json.dumps(canned_jd(contents))
+        chunk_count = max(1, self._stub.stream_chunks)
+        step = -(-len(text) // chunk_count)
+        delay = self._stub.next_latency() / chunk_count
+        for start in range(0, len(text), step):
+            time.sleep(delay)
+            yield _fake_response(text[start:start + step])
+
+
+class _StubAsyncModels:
+    def __init__(self, stub: "StubGeminiClient"):
+        self._stub = stub
+
+    async def generate_content(self, model=None, contents=None, config=None, **kwargs):
+        await asyncio.sleep(self._stub.next_latency())
+        return _fake_response(json.dumps(canned_jd(contents)))
+
+    async def generate_content_stream(self, model=None, contents=None, config=None, **kwargs):
+        # Like client.aio: awaiting the call returns the async iterator
+        text = json.dumps(canned_jd(contents))
+        chunk_count = max(1, self._stub.stream_chunks)
+        step = -(-len(text) // chunk_count)
+        delay = self._stub.next_latency() / chunk_count
+
+        async def chunks():
+            for start in range(0, len(text), step):
+                await asyncio.sleep(delay)
+                yield _fake_response(text[start:start + step])
+        return chunks()
+
+
+class StubGeminiClient:
+    """latency_ms +/- jitter_ms per call, drawn from a seeded RNG so runs are repeatable."""
+
+    def __init__(self, latency_ms: float = 800, jitter_ms: float = 200, seed: int = 1234, stream_chunks: int = 8):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunks = stream_chunks
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = _StubModels(self)
+        self.aio = SimpleNamespace(models=_StubAsyncModels(self))
+
+    def next_latency(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+def install_stub_client(latency_ms: float = 800, jitter_ms: float = 200, seed: int = 1234) -> StubGeminiClient:
+    """
+    Puts the stub behind the process-wide GeminiGateway, so the gateway's
+    concurrency cap, retries and breaker stay in the measured path.
+    """
+    from services.gemini_gateway import get_gateway
+
+    stub = StubGeminiClient(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed)
+    get_gateway()._client = stub
+    return stub
@@ -1,21 +1,43 @@
 # ai_hr_jd_project/database/connection.py
+import threading
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
-from google.cloud.sql.connector import Connector, IPTypes
-import pymysql
+from sqlalchemy.pool import StaticPool
 from .models import Base # Import Base from models.py
+from .migrations import upgrade_schema, backfill_search_text
+from .pool import TimedQueuePool
 from config import Config
 
 # Global engine and SessionLocal
 engine = None
 SessionLocal = None
+_initialized = False # engine created and, with DB_AUTO_MIGRATE, the schema upgraded
+_init_lock = threading.RLock()
+_engine_listeners = []
+
+def _pool_options() -> dict:
+    # Shared by every backend that pools connections; all tunable from the environment
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "echo": Config.DB_ECHO,
+    }
 
 def init_connection_pool() -> sqlalchemy.engine.base.Engine:
     """
     Initializes a connection pool for a Cloud SQL instance of MySQL.
     Uses the Cloud SQL Python Connector package.
     """
+    # Imported here so DATABASE_URL deployments don't need the connector (or GCP credentials)
+    from google.cloud.sql.connector import Connector, IPTypes
+    import pymysql
+
     instance_connection_name = Config.INSTANCE_CONNECTION_NAME
     db_user = Config.DB_USER
     db_pass = Config.DB_PASS
@@ -24,7 +46,8 @@ def init_connection_pool() -> sqlalchemy.engine.base.Engine:
     if not all([instance_connection_name, db_user, db_pass, db_name]):
         raise ValueError(
             "Missing Cloud SQL connection parameters. "
-            "Ensure DB_USER, DB_PASS, DB_NAME, and INSTANCE_CONNECTION_NAME are set."
+            "Ensure DB_USER, DB_PASS, DB_NAME, and INSTANCE_CONNECTION_NAME are set "
+            "(or set DATABASE_URL to use another database)."
         )
 
     ip_type = IPTypes.PRIVATE if Config.PRIVATE_IP else IPTypes.PUBLIC
@@ -42,37 +65,106 @@ def init_connection_pool() -> sqlalchemy.engine.base.Engine:
             connect_timeout=30 # Add a timeout
         )
         return conn
-        return conn
 
     # The 'creator' argument is used to specify a custom connection function
     pool = create_engine(
         Config.get_db_uri(), # e.g., "mysql+pymysql://"
         creator=getconn,
-        pool_size=5,
-        max_overflow=2,
-        pool_timeout=30,
-        pool_recycle=1800, # e.g., recycle connections every 30 minutes
+        **_pool_options(),
     )
     return pool
 
-def init_db():
-    global engine, SessionLocal
+def create_url_engine(database_url: str) -> sqlalchemy.engine.base.Engine:
+    """Engine for an arbitrary SQLAlchemy URL (DATABASE_URL)."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, **_pool_options())
+
+    if url.database in (None, "", ":memory:"):
+        # One shared connection, otherwise every pooled connection would be a separate empty database
+        return create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False},
+                             echo=Config.DB_ECHO)
+
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False}, **_pool_options())
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the single writer; busy_timeout queues writers instead of failing
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return sqlite_engine
+
+def create_db_engine() -> sqlalchemy.engine.base.Engine:
+    if Config.DATABASE_URL:
+        return create_url_engine(Config.DATABASE_URL)
+    return init_connection_pool()
+
+def pool_stats() -> dict | None:
+    """Checkout wait times and pool occupancy, or None before init_db()."""
     if engine is None:
-        engine = init_connection_pool()
-        SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
-        # Create tables
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created (if they didn't exist).")
+        return None
+    stats = {"backend": engine.dialect.name, "pool_class": type(engine.pool).__name__}
+    if isinstance(engine.pool, TimedQueuePool):
+        stats.update(engine.pool.wait_stats())
+    else:
+        stats["status"] = engine.pool.status()
+    return stats
+
+def add_engine_listener(listener) -> None:
+    """Calls listener(engine) once the engine exists: right away, or when it is created."""
+    with _init_lock:
+        _engine_listeners.append(listener)
+        if engine is not None:
+            listener(engine)
+
+def init_engine() -> sqlalchemy.engine.base.Engine:
+    """Creates the engine and session factory without touching the schema."""
+    global engine, SessionLocal
+    with _init_lock:
+        if engine is None:
+            new_engine = create_db_engine()
+            for listener in _engine_listeners:
+                listener(new_engine)
+            SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=new_engine))
+            engine = new_engine
+    return engine
+
+def migrate_db(db_engine: sqlalchemy.engine.base.Engine) -> None:
+    # Create tables, plus any columns/indexes added since the tables were created
+    upgrade_schema(db_engine)
+    print("Database tables created (if they didn't exist).")
+    backfilled = backfill_search_text(db_engine)
+    if backfilled:
+        print(f"Backfilled search_text for {backfilled} job descriptions.")
+
+def init_db():
+    """
+    Engine, session factory and (unless DB_AUTO_MIGRATE=false) the schema upgrade.
+    Called by create_app() under STARTUP_INIT=eager, otherwise on first use
+    (get_db(), get_engine()) or from the warm-up thread. Safe to call repeatedly.
+    """
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if not _initialized:
+            db_engine = init_engine()
+            if Config.DB_AUTO_MIGRATE:
+                migrate_db(db_engine)
+            _initialized = True
+
+def get_engine() -> sqlalchemy.engine.base.Engine:
+    init_db()
+    return engine
 
 def get_db():
-    if SessionLocal is None:
-        raise Exception("Database not initialized. Call init_db() first.")
+    init_db() # no-op once initialized
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-
-# Call init_db() when this module is imported or at app startup
-# For robust applications, this might be better placed in app.py's app creation factory.
-# init_db() # We will call this in app.py
\ No newline at end of file
@@ -0,0 +1,74 @@
+# ai_hr_jd_project/database/migrations.py
+# Lightweight, additive schema upgrades. Base.metadata.create_all() only creates
+# missing tables; it never adds columns or indexes to a table that already
+# exists. upgrade_schema() fills that gap for the additive changes this project
+# makes (new nullable/defaulted columns and new indexes) so existing Cloud SQL
+# databases pick them up without a separate migration tool.
+import sqlalchemy
+from sqlalchemy import inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from .models import Base, JDTable
+
+
+def _column_ddl(engine, table_name: str, column) -> str:
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable and column.server_default is not None:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def _index_applies(engine, index) -> bool:
+    # Dialect-specific indexes (e.g. MySQL FULLTEXT) are skipped elsewhere
+    return not index.dialect_kwargs.get("mysql_prefix") or engine.dialect.name == "mysql"
+
+
+def upgrade_schema(engine: sqlalchemy.engine.base.Engine) -> list[str]:
+    """Creates missing tables, columns and indexes. Returns the DDL statements applied."""
+    Base.metadata.create_all(bind=engine)
+    applied = []
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    ddl = _column_ddl(engine, table.name, column)
+                    conn.exec_driver_sql(ddl)
+                    applied.append(ddl)
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes and _index_applies(engine, index):
+                    statement = CreateIndex(index)
+                    conn.execute(statement)
+                    applied.append(str(statement.compile(dialect=engine.dialect)).strip())
+    for ddl in applied:
+        print(f"Schema upgrade applied: {ddl}")
+    return applied
+
+
+def backfill_search_text(engine: sqlalchemy.engine.base.Engine, batch_size: int = 500) -> int:
+    """Fills job_descriptions.search_text for rows written before the column existed."""
+    from services.search_index import extract_search_text # avoid a models -> services import cycle
+
+    updated = 0
+    with Session(bind=engine) as db:
+        while True:
+            rows = db.execute(
+                select(JDTable.id, JDTable.jd_content_json)
+                .where(JDTable.search_text.is_(None))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                # "" marks a row as processed even if its content has nothing searchable
+                db.execute(update(JDTable).where(JDTable.id == row.id)
+                           .values(search_text=extract_search_text(row.jd_content_json) or ""))
+            db.commit()
+            updated += len(rows)
+    return updated
@@ -1,5 +1,5 @@
 # ai_hr_jd_project/database/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Index, Boolean, ForeignKey
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 import enum
@@ -10,6 +10,10 @@ class JobStatus(enum.Enum):
     ACTIVE = "active"
     INACTIVE = "inactive"
 
+class SkillKind(enum.Enum):
+    REQUIRED = "required"
+    PREFERRED = "preferred"
+
 class JDTable(Base):
     __tablename__ = "job_descriptions"
 
@@ -22,6 +26,71 @@ class JDTable(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=True)
     status = Column(Enum(JobStatus), default=JobStatus.ACTIVE, nullable=False)
+    # Plain text pulled out of jd_content_json (responsibilities, qualifications, ...) for full-text search
+    search_text = Column(Text, nullable=True)
+    # True once this row's qualifications are mirrored into jd_skills (backfill picks up the rest)
+    skills_indexed = Column(Boolean, nullable=False, default=False, server_default="0")
+    # Bumped by the ORM on every UPDATE (version_id_col below); the basis of the resource's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) newest first, optionally within one status
+        Index("ix_job_descriptions_created_at_id", "created_at", "id"),
+        Index("ix_job_descriptions_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_job_descriptions_expires_at", "expires_at"),
+        # The expiry sweeper looks for ACTIVE rows whose expires_at has passed
+        Index("ix_job_descriptions_status_expires_at", "status", "expires_at"),
+        # MySQL only; other databases fall back to the in-process index in services/search_index.py
+        Index("ix_job_descriptions_fulltext", "job_title", "search_text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+    # A flush issues UPDATE ... WHERE id = :id AND version = :loaded_version, so a
+    # concurrent write raises StaleDataError instead of being silently overwritten
+    __mapper_args__ = {"version_id_col": version}
+
+    def __repr__(self):
+        return f"<JDTable(id={self.id}, job_title='{self.job_title}')>"
+
+class JDSkillTable(Base):
+    # One row per required/preferred qualification, so skill questions don't need to parse JSON
+    __tablename__ = "jd_skills"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(Enum(SkillKind), nullable=False)
+    skill = Column(String(512), nullable=False) # as written in the JD
+    skill_key = Column(String(255), nullable=False) # normalized (lowercase, trimmed) for lookups
+
+    __table_args__ = (
+        Index("ix_jd_skills_skill_key_job_id", "skill_key", "job_id"),
+        Index("ix_jd_skills_job_id", "job_id"),
+    )
+
+    def __repr__(self):
+        return f"<JDSkillTable(job_id={self.job_id}, skill_key='{self.skill_key}')>"
+
+class GenerationJobTable(Base):
+    # Shared store for asynchronous /generate jobs so several replicas can poll the same job
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True) # uuid4 hex string
+    status = Column(String(16), nullable=False, index=True) # queued / running / succeeded / failed
+    request_json = Column(Text, nullable=False)
+    result_json = Column(Text, nullable=True)
+    cache_status = Column(String(16), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<GenerationJobTable(id={self.id}, status='{self.status}')>"
+
+class MaintenanceLeaseTable(Base):
+    # Named leases so a periodic job (e.g. the expiry sweeper) runs on one replica at a time
+    __tablename__ = "maintenance_leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), nullable=False) # "<hostname>:<pid>:<random>" of the current holder
+    expires_at = Column(DateTime, nullable=False)
 
     def __repr__(self):
-        return f"<JDTable(id={self.id}, job_title='{self.job_title}')>"
\ No newline at end of file
+        return f"<MaintenanceLeaseTable(name={self.name}, holder='{self.holder}')>"
@@ -0,0 +1,91 @@
+# ai_hr_jd_project/database/pool.py
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Called with (seconds_waited, timed_out) after every checkout, e.g. to export a histogram
+_wait_observers = []
+
+
+def add_wait_observer(observer) -> None:
+    if observer not in _wait_observers:
+        _wait_observers.append(observer)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection
+    (including opening a new one), so pool_size / max_overflow can be tuned
+    from real traffic instead of guessed. Recent waits are kept in a bounded
+    window for percentiles.
+    """
+
+    WINDOW = 2048
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=self.WINDOW)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._local = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get calls itself again after losing a race; only time the outer call
+        if getattr(self._local, "timing", False):
+            return super()._do_get()
+        self._local.timing = True
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            self._local.timing = False
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self._waits.append(waited)
+                self._checkouts += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            for observer in _wait_observers:
+                observer(waited, timed_out)
+
+    def wait_stats(self) -> dict:
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            checkouts, timeouts = self._checkouts, self._timeouts
+            total_wait, max_wait = self._total_wait, self._max_wait
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3)
+
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checkouts": checkouts,
+            "checkout_timeouts": timeouts,
+            "wait_ms": {
+                "mean": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(max_wait * 1000, 3),
+                "window": len(waits),
+            },
+        }
@@ -0,0 +1,12 @@
+# ai_hr_jd_project/gunicorn.conf.py
+# gunicorn --config gunicorn.conf.py --bind :$PORT run:app
+# For /metrics across workers, export PROMETHEUS_MULTIPROC_DIR (an empty, writable directory)
+# before starting gunicorn; it must be cleared between restarts.
+import os
+
+
+def child_exit(server, worker):
+    # Drops the exited worker's live gauges (pool occupancy) from the aggregated /metrics
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,92 @@
+# ai_hr_jd_project/manage.py
+# Maintenance commands. Run from the JdGen directory, e.g.:
+#   python manage.py migrate
+#   python manage.py backfill-skills
+#   python manage.py sweep-expired
+#   python manage.py build-similarity-index --output /srv/jd/similar_jds.json
+import argparse
+import json
+import sys
+
+from config import Config
+from database import connection
+from database.connection import init_db, init_engine, migrate_db
+from services.skills_service import index_pending_skills
+from services.expiry_sweeper import ExpirySweeper
+from services.jd_service import JDService
+from services.similar_jds import SimilarJDService
+
+
+def migrate(args) -> int:
+    """Creates missing tables, columns and indexes. Run at deploy time with DB_AUTO_MIGRATE=false."""
+    migrate_db(init_engine())
+    return 0
+
+
+def backfill_skills(args) -> int:
+    """Mirrors qualifications of rows not yet in jd_skills (e.g. rows created before the table existed)."""
+    init_db()
+    db = connection.SessionLocal()
+    try:
+        indexed = index_pending_skills(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Indexed skills for {indexed} job descriptions.")
+    return 0
+
+
+def sweep_expired(args) -> int:
+    """One expiry sweep, for running from cron / Cloud Scheduler instead of the in-process thread."""
+    init_db()
+    sweeper = ExpirySweeper.from_config(JDService())
+    if args.batch_size:
+        sweeper.batch_size = args.batch_size
+    report = sweeper.run_once()
+    print(json.dumps(report))
+    return 0 if report["lease_acquired"] else 1
+
+
+def build_similarity_index(args) -> int:
+    """Indexes every JD for near-duplicate detection and writes the snapshot workers load (SIMILAR_JD_INDEX_PATH)."""
+    output = args.output or Config.SIMILAR_JD_INDEX_PATH
+    if not output:
+        print("Pass --output or set SIMILAR_JD_INDEX_PATH.")
+        return 2
+    service = SimilarJDService.from_config()
+    init_db()
+    db = connection.SessionLocal()
+    try:
+        report = service.sync(db)
+    finally:
+        db.close()
+    service.save_snapshot(output)
+    print(json.dumps({**report, "output": output}))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="JD service maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Create or upgrade the database schema")
+    migrate_parser.set_defaults(func=migrate)
+
+    backfill = subparsers.add_parser("backfill-skills", help="Populate jd_skills for existing job descriptions")
+    backfill.add_argument("--batch-size", type=int, default=500)
+    backfill.set_defaults(func=backfill_skills)
+
+    sweep = subparsers.add_parser("sweep-expired", help="Mark JDs past their expires_at as inactive")
+    sweep.add_argument("--batch-size", type=int, default=None)
+    sweep.set_defaults(func=sweep_expired)
+
+    similarity = subparsers.add_parser("build-similarity-index",
+                                       help="Build the near-duplicate index snapshot for /generate")
+    similarity.add_argument("--output", default=None, help="default: SIMILAR_JD_INDEX_PATH")
+    similarity.set_defaults(func=build_similarity_index)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
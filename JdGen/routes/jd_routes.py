@@ -1,49 +1,364 @@
 # ai_hr_jd_project/routes/jd_routes.py
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, request, jsonify, abort, Response, stream_with_context, url_for, current_app, send_from_directory
 from sqlalchemy.orm import Session
-from database.connection import get_db # Use get_db for dependency injection
+from database.connection import get_db, pool_stats # Use get_db for dependency injection
+from config import Config
 from services.gemini_service import GeminiService
-from services.jd_service import JDService
+from services.gemini_gateway import GeminiUnavailableError
+from services.jd_service import JDService, JDVersionConflictError, jd_etag, parse_jd_etag
+from services.generation_cache import GenerationCache, generation_cache_key
+from services.response_cache import JDResponseCache
+from services.generation_jobs import GenerationJobManager, JobQueueFullError, job_to_dict, FINISHED_STATUSES
+from services.search_index import SearchService
+from services.similar_jds import SimilarJDService
+from services.skills_service import SkillsService
+from services.expiry_sweeper import ExpirySweeper
+from services import metrics
+from services.profiling import RequestProfiler
+from services.request_timing import phase
 from schemas.jd_schemas import (
-    JDGenerateRequest, JobDescriptionContent,
-    JDCreateRequest, JDUpdateRequest,
+    JDGenerateRequest, JDBatchGenerateRequest, JobDescriptionContent,
+    JDCreateRequest, JDUpdateRequest, JDPatchRequest,
     JDResponse, JDListResponseItem
 )
 from pydantic import ValidationError
 import json # For parsing jd_content_json from DB
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+import csv
+import hashlib
+import io
+import os
 
 jd_bp = Blueprint('jd_routes', __name__, url_prefix='/api/jd')
 
 gemini_service = GeminiService()
 jd_service = JDService()
+search_service = SearchService.from_config()
+jd_service.add_listener(search_service)
+skills_service = SkillsService()
+jd_response_cache = JDResponseCache.from_config()
+jd_service.add_listener(jd_response_cache)
+similar_jds = SimilarJDService.from_config()
+jd_service.add_listener(similar_jds)
+expiry_sweeper = ExpirySweeper.from_config(jd_service) # started by create_app()
+request_profiler = RequestProfiler.from_config() # None unless PROFILING_ENABLED
+generation_cache = GenerationCache.from_config()
+generation_jobs = GenerationJobManager.from_config(
+    lambda req: generation_cache.get_or_generate(req, gemini_service.generate_structured_jd, bypass=req.bypass_cache)
+)
+
+def _validation_error(e: ValidationError):
+    metrics.record_validation_failure("request")
+    return jsonify({"detail": e.errors()}), 422 # Unprocessable Entity
+
+def _wants_cache_bypass(req_data: JDGenerateRequest) -> bool:
+    # Either the body flag or a standard "Cache-Control: no-cache" request header
+    cache_control = request.headers.get("Cache-Control", "").lower()
+    return req_data.bypass_cache or "no-cache" in cache_control
+
+def _find_similar(req_data: JDGenerateRequest, bypass: bool):
+    # Best effort: a failed lookup must not stop the generation itself
+    if not similar_jds.enabled or bypass:
+        return None
+    try:
+        with phase("similarity"):
+            return similar_jds.best_match(req_data)
+    except Exception as e:
+        print(f"Similar JD lookup failed: {e}")
+        return None
 
 @jd_bp.route('/generate', methods=['POST'])
 def generate_jd_endpoint():
     try:
-        req_data = JDGenerateRequest.model_validate(request.json)
+        with phase("validate"):
+            req_data = JDGenerateRequest.model_validate(request.json)
     except ValidationError as e:
-        return jsonify({"detail": e.errors()}), 422 # Unprocessable Entity
+        return _validation_error(e)
 
+    bypass = _wants_cache_bypass(req_data)
+    similar = _find_similar(req_data, bypass)
     try:
-        generated_content: JobDescriptionContent = gemini_service.generate_structured_jd(req_data)
-        return jsonify(generated_content.model_dump()), 200
+        if similar is not None and similar_jds.mode == "return":
+            generated_content, cache_status = similar.content, "SIMILAR" # no LLM call
+        else:
+            generated_content, cache_status = generation_cache.get_or_generate(
+                req_data, gemini_service.generate_structured_jd, bypass=bypass
+            )
+        with phase("serialize"):
+            response = jsonify(generated_content.model_dump())
+        response.headers["X-Cache"] = cache_status
+        if similar is not None:
+            response.headers.update(similar.headers())
+        return response, 200
+    except GeminiUnavailableError as e:
+        # Busy or circuit open: tell the client to come back later instead of hanging
+        response = jsonify({"error": "JD generation temporarily unavailable", "details": str(e)})
+        if e.retry_after:
+            response.headers["Retry-After"] = str(max(1, int(round(e.retry_after))))
+        return response, 503
     except Exception as e:
         # Log the exception e
         print(f"Error in /generate endpoint: {e}")
         return jsonify({"error": "Failed to generate JD", "details": str(e)}), 500
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@jd_bp.route('/generate/stream', methods=['POST'])
+def generate_jd_stream_endpoint():
+    try:
+        with phase("validate"):
+            req_data = JDGenerateRequest.model_validate(request.json)
+    except ValidationError as e:
+        return _validation_error(e)
+
+    bypass = _wants_cache_bypass(req_data)
+    cache_key = generation_cache_key(req_data)
+    cached = None
+    similar = _find_similar(req_data, bypass)
+    if similar is not None and similar_jds.mode == "return":
+        cached = similar.content
+    elif generation_cache.enabled and not bypass:
+        cached = generation_cache.get(cache_key)
+
+    def event_stream():
+        # One "field" event per completed JobDescriptionContent field, then "done" with the full JD
+        if cached is not None:
+            content = cached.model_dump()
+            for name, value in content.items():
+                yield _sse("field", {"name": name, "value": value})
+            yield _sse("done", content)
+            return
+        try:
+            for kind, name, value in gemini_service.stream_structured_jd(req_data):
+                if kind == "field":
+                    yield _sse("field", {"name": name, "value": value})
+                else:
+                    if generation_cache.enabled:
+                        generation_cache.set(cache_key, value)
+                    yield _sse("done", value.model_dump())
+        except GeminiUnavailableError as e:
+            yield _sse("error", {"error": "JD generation temporarily unavailable", "details": str(e),
+                                 "retry_after": e.retry_after})
+        except Exception as e:
+            print(f"Error in /generate/stream endpoint: {e}")
+            yield _sse("error", {"error": "Failed to generate JD", "details": str(e)})
+
+    if similar is not None and similar_jds.mode == "return":
+        cache_status = "SIMILAR"
+    elif cached is not None:
+        cache_status = "HIT"
+    elif not generation_cache.enabled:
+        cache_status = "DISABLED"
+    else:
+        cache_status = "BYPASS" if bypass else "MISS"
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Cache": cache_status}
+    if similar is not None:
+        headers.update(similar.headers())
+    return Response(stream_with_context(event_stream()), mimetype="text/event-stream", headers=headers)
+
+@jd_bp.route('/generate/similar', methods=['POST'])
+def similar_jds_endpoint():
+    # Same body as /generate; lists stored JDs close enough to reuse, without calling the LLM
+    try:
+        with phase("validate"):
+            req_data = JDGenerateRequest.model_validate(request.json)
+    except ValidationError as e:
+        return _validation_error(e)
+    try:
+        min_score = float(request.args.get("min_score", similar_jds.threshold))
+        limit = int(request.args.get("limit", 5))
+    except (TypeError, ValueError):
+        return jsonify({"detail": "min_score must be a number and limit an integer"}), 422
+    if not 0 <= min_score <= 1 or not 1 <= limit <= 50:
+        return jsonify({"detail": "min_score must be in [0, 1] and limit in [1, 50]"}), 422
+    try:
+        with phase("similarity"):
+            matches = similar_jds.find_matches(req_data, min_score=min_score, limit=limit)
+        return jsonify({"min_score": min_score, "matches": matches}), 200
+    except Exception as e:
+        print(f"Error in /generate/similar endpoint: {e}")
+        return jsonify({"error": "Failed to look up similar JDs", "details": str(e)}), 500
+
+@jd_bp.route('/generate/batch', methods=['POST'])
+def generate_jd_batch_endpoint():
+    raw_data = request.json
+    if isinstance(raw_data, list): # A bare list of JDGenerateRequest objects is accepted too
+        raw_data = {"items": raw_data}
+    try:
+        with phase("validate"):
+            batch = JDBatchGenerateRequest.model_validate(raw_data)
+    except ValidationError as e:
+        return _validation_error(e)
+    if len(batch.items) > Config.BATCH_MAX_ITEMS:
+        return jsonify({"detail": f"A batch may contain at most {Config.BATCH_MAX_ITEMS} items."}), 422
+
+    parallelism = min(batch.max_parallel or Config.BATCH_DEFAULT_PARALLELISM, Config.BATCH_MAX_PARALLELISM)
+    bypass = "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+    def generate_one(item: JDGenerateRequest):
+        return generation_cache.get_or_generate(item, gemini_service.generate_structured_jd,
+                                                bypass=bypass or item.bypass_cache)
+
+    def ndjson_stream():
+        # One line per item in completion order (each carries its input index), then a summary line
+        succeeded: dict[int, JobDescriptionContent] = {}
+        failed = 0
+        pool = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="jd-gen-batch")
+        try:
+            futures = {pool.submit(generate_one, item): index for index, item in enumerate(batch.items)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    content, cache_status = future.result()
+                    succeeded[index] = content
+                    line = {"type": "result", "index": index, "status": "succeeded",
+                            "cache": cache_status, "jd_content": content.model_dump()}
+                except Exception as e:
+                    failed += 1
+                    print(f"Error in /generate/batch item {index}: {e}")
+                    line = {"type": "result", "index": index, "status": "failed", "error": str(e)}
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            # If the client goes away, don't keep generating the rest of the batch
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        summary = {"type": "summary", "total": len(batch.items), "succeeded": len(succeeded), "failed": failed}
+        if batch.persist and succeeded:
+            db: Session = next(get_db())
+            try:
+                ordered = [succeeded[index] for index in sorted(succeeded)]
+                summary["persisted_job_ids"] = jd_service.create_jds(db, [
+                    JDCreateRequest(job_title=content.job_title_generated, jd_content=content,
+                                    expires_at=batch.expires_at)
+                    for content in ordered
+                ])
+                summary["persisted_indexes"] = sorted(succeeded)
+            except Exception as e:
+                print(f"Error persisting /generate/batch results: {e}")
+                db.rollback()
+                summary["persist_error"] = str(e)
+        yield json.dumps(summary) + "\n"
+
+    return Response(stream_with_context(ndjson_stream()), mimetype="application/x-ndjson",
+                    headers={"X-Accel-Buffering": "no"})
+
+@jd_bp.route('/generate/jobs', methods=['POST'])
+def create_generation_job_endpoint():
+    try:
+        with phase("validate"):
+            req_data = JDGenerateRequest.model_validate(request.json)
+    except ValidationError as e:
+        return _validation_error(e)
+
+    if _wants_cache_bypass(req_data):
+        req_data.bypass_cache = True
+    try:
+        job_id = generation_jobs.submit(req_data)
+    except JobQueueFullError as e:
+        response = jsonify({"error": "Generation queue is full", "details": str(e)})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+    status_url = url_for('jd_routes.get_generation_job_endpoint', job_id=job_id)
+    response = jsonify({"job_id": job_id, "status": "queued", "status_url": status_url,
+                        "events_url": url_for('jd_routes.generation_job_events_endpoint', job_id=job_id)})
+    response.headers["Location"] = status_url
+    return response, 202
+
+@jd_bp.route('/generate/jobs/<job_id>', methods=['GET'])
+def get_generation_job_endpoint(job_id: str):
+    job = generation_jobs.get(job_id)
+    if job is None:
+        abort(404, description="Generation job not found")
+    return jsonify(job_to_dict(job)), 200
+
+@jd_bp.route('/generate/jobs/<job_id>/events', methods=['GET'])
+def generation_job_events_endpoint(job_id: str):
+    if generation_jobs.get(job_id) is None:
+        abort(404, description="Generation job not found")
+
+    def event_stream():
+        # Server-sent events: a "status" event on every change, a final "result" event, and
+        # comment heartbeats so proxies don't close the idle connection.
+        last_status = None
+        deadline = time.monotonic() + Config.JOB_SSE_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            job = generation_jobs.get(job_id)
+            if job is None:
+                yield _sse("error", {"error": "Generation job expired"})
+                return
+            if job["status"] in FINISHED_STATUSES:
+                yield _sse("result", job_to_dict(job))
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield _sse("status", {"job_id": job_id, "status": last_status})
+            else:
+                yield ": keep-alive\n\n"
+            time.sleep(Config.JOB_SSE_POLL_INTERVAL_SECONDS)
+        yield _sse("timeout", {})
+
+    return Response(stream_with_context(event_stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@jd_bp.route('/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    return jsonify({
+        "generation": generation_cache.stats(),
+        "responses": jd_response_cache.stats(),
+        "gemini": gemini_service.provider.stats(),
+        "prompt": gemini_service.prompt_compiler.stats(),
+        "similar_jds": similar_jds.stats(),
+    }), 200
+
+@jd_bp.route('/db/pool', methods=['GET'])
+def db_pool_stats_endpoint():
+    return jsonify(pool_stats()), 200
+
+def _require_profiling_admin():
+    if request_profiler is None:
+        abort(404, description="Profiling is disabled (PROFILING_ENABLED=false)")
+    if not request_profiler.is_authorized(request.headers.get("X-Profile-Token")):
+        abort(403, description="A valid X-Profile-Token header is required")
+
+@jd_bp.route('/admin/profiling', methods=['GET'])
+def profiling_status_endpoint():
+    _require_profiling_admin()
+    return jsonify(request_profiler.stats()), 200
+
+@jd_bp.route('/admin/profiling', methods=['POST'])
+def arm_profiling_endpoint():
+    # Body: {"sample_rate": 0.1, "duration_seconds": 300} profiles ~10% of requests for five minutes
+    _require_profiling_admin()
+    body = request.get_json(silent=True) or {}
+    try:
+        sample_rate = float(body.get("sample_rate", 1.0))
+        duration_seconds = float(body.get("duration_seconds", 60))
+    except (TypeError, ValueError):
+        return jsonify({"detail": "sample_rate and duration_seconds must be numbers"}), 422
+    if not 0 <= sample_rate <= 1 or not 0 < duration_seconds <= 3600:
+        return jsonify({"detail": "sample_rate must be in [0, 1] and duration_seconds in (0, 3600]"}), 422
+    request_profiler.arm(sample_rate, duration_seconds)
+    return jsonify(request_profiler.stats()), 200
+
+@jd_bp.route('/admin/profiling/<name>', methods=['GET'])
+def download_profile_endpoint(name: str):
+    _require_profiling_admin()
+    # send_from_directory rejects names that would escape the directory
+    return send_from_directory(os.path.abspath(request_profiler.directory), name, as_attachment=True)
+
 @jd_bp.route('', methods=['POST'])
 def create_jd_endpoint():
     db: Session = next(get_db())
     try:
-        # Ensure jd_content is parsed into JobDescriptionContent if it's a dict
-        raw_data = request.json
-        if raw_data is not None and 'jd_content' in raw_data and isinstance(raw_data['jd_content'], dict):
-            raw_data['jd_content'] = JobDescriptionContent(**raw_data['jd_content'])
-
-        req_data = JDCreateRequest.model_validate(raw_data)
+        # model_validate builds the nested JobDescriptionContent from the dict itself
+        with phase("validate"):
+            req_data = JDCreateRequest.model_validate(request.json)
     except ValidationError as e:
-        return jsonify({"detail": e.errors()}), 422
+        return _validation_error(e)
 
     try:
         created_jd_db = jd_service.create_jd(db, req_data)
@@ -53,73 +368,355 @@ def create_jd_endpoint():
         db.rollback()
         return jsonify({"error": "Failed to create JD", "details": str(e)}), 500
 
+def _iter_bulk_rows():
+    # NDJSON is read line by line straight off the request stream, so a large
+    # import never has to sit in memory as one JSON document.
+    if request.mimetype in ("application/x-ndjson", "application/jsonlines", "application/json-seq"):
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line), None
+                except ValueError as e:
+                    yield None, f"Invalid JSON: {e}"
+        return
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list):
+        yield None, "Request body must be a JSON array or NDJSON (application/x-ndjson)."
+        return
+    for row in payload:
+        yield row, None
+
+@jd_bp.route('/bulk', methods=['POST'])
+def bulk_import_jds_endpoint():
+    chunk_size = min(request.args.get("chunk_size", Config.BULK_IMPORT_CHUNK_SIZE, type=int) or 1,
+                     Config.BULK_IMPORT_MAX_CHUNK_SIZE)
+    return_ids = request.args.get("return_ids", "true").lower() != "false"
+    db: Session = next(get_db())
+
+    created_ids: list[int] = []
+    created_count = 0
+    errors = []
+    chunk: list[JDCreateRequest] = []
+    chunk_indexes: list[int] = []
+    chunks_committed = 0
+
+    def flush_chunk():
+        nonlocal chunks_committed, created_count
+        try:
+            created_ids.extend(jd_service.bulk_insert_jds(db, chunk, return_ids=return_ids))
+            created_count += len(chunk)
+            chunks_committed += 1
+        except Exception as e:
+            # A failed chunk is reported row by row; earlier chunks stay committed
+            print(f"Error in POST /api/jd/bulk chunk: {e}")
+            db.rollback()
+            errors.extend({"index": index, "detail": f"Database error: {e}"} for index in chunk_indexes)
+        chunk.clear()
+        chunk_indexes.clear()
+
+    for index, (row, parse_error) in enumerate(_iter_bulk_rows()):
+        if parse_error is not None:
+            errors.append({"index": index, "detail": parse_error})
+            continue
+        try:
+            chunk.append(JDCreateRequest.model_validate(row))
+            chunk_indexes.append(index)
+        except ValidationError as e:
+            metrics.record_validation_failure("request")
+            errors.append({"index": index, "detail": e.errors(include_url=False)})
+            continue
+        if len(chunk) >= chunk_size:
+            flush_chunk()
+    if chunk:
+        flush_chunk()
+
+    response = {
+        "created": created_count,
+        "created_ids": created_ids if return_ids else None,
+        "chunks_committed": chunks_committed,
+        "errors": errors,
+    }
+    if created_count:
+        return jsonify(response), 201
+    return jsonify(response), 422 if errors else 200
+
+def _parse_filter_args() -> dict:
+    # Query-string filters shared by the list and export endpoints; raises ValueError on bad input
+    status = request.args.get("status")
+    if status is not None and status not in ("active", "inactive"):
+        raise ValueError("status must be 'active' or 'inactive'")
+    filters = {"status": status, "title_prefix": request.args.get("title_prefix") or None}
+    for name in ("expires_after", "expires_before"):
+        filters[name] = _parse_utc_arg(name)
+    return filters
+
+def _parse_utc_arg(name: str) -> datetime | None:
+    # Stored datetimes are naive UTC, so drop any offset after converting; raises ValueError
+    value = request.args.get(name)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _iso_or_none(value) -> str | None:
+    return value.isoformat() if value is not None else None
+
+@jd_bp.route('/export', methods=['GET'])
+def export_jds_endpoint():
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"detail": "format must be 'ndjson' or 'csv'"}), 422
+    try:
+        filters = _parse_filter_args()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 422
+    db: Session = next(get_db())
+    rows = jd_service.iter_jds_for_export(db, batch_size=Config.EXPORT_BATCH_SIZE, **filters)
+
+    def ndjson_stream():
+        # The stored jd_content_json is already valid JSON, so it is spliced in verbatim
+        for row in rows:
+            yield (
+                '{"id": ' + str(row.id)
+                + ', "job_title": ' + json.dumps(row.job_title)
+                + ', "status": ' + json.dumps(row.status.value)
+                + ', "created_at": ' + json.dumps(_iso_or_none(row.created_at))
+                + ', "expires_at": ' + json.dumps(_iso_or_none(row.expires_at))
+                + ', "jd_content": ' + row.jd_content_json + '}\n'
+            )
+
+    def csv_stream():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "job_title", "status", "created_at", "expires_at", "jd_content_json"])
+        for row in rows:
+            writer.writerow([row.id, row.job_title, row.status.value, _iso_or_none(row.created_at),
+                             _iso_or_none(row.expires_at), row.jd_content_json])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+
+    if export_format == "csv":
+        stream, mimetype, extension = csv_stream(), "text/csv", "csv"
+    else:
+        stream, mimetype, extension = ndjson_stream(), "application/x-ndjson", "ndjson"
+    return Response(stream_with_context(stream), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=job_descriptions.{extension}",
+        "X-Accel-Buffering": "no",
+    })
+
 @jd_bp.route('', methods=['GET'])
 def list_jds_endpoint():
+    limit = request.args.get("limit", Config.LIST_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, Config.LIST_MAX_LIMIT))
+    try:
+        filters = _parse_filter_args()
+        cursor = request.args.get("cursor") or None
+        if cursor:
+            jd_service.decode_cursor(cursor)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 422
+
     db: Session = next(get_db())
     try:
-        jds_summary_db = jd_service.get_all_jds_summary(db)
-        # Manually construct the response if direct Pydantic conversion is tricky for tuples
-        response_items = [{"id": item.id, "job_title": item.job_title} for item in jds_summary_db]
-        return jsonify(response_items), 200
+        jds_summary_db, next_cursor = jd_service.get_jds_page(db, limit=limit, cursor=cursor, **filters)
+        # The page's ETag depends only on which rows it holds and their versions
+        page_key = ",".join(f"{item.id}:{item.version}" for item in jds_summary_db) + f"|{next_cursor or ''}"
+        etag = hashlib.sha1(page_key.encode("utf-8")).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = _not_modified(etag)
+        else:
+            # Manually construct the response if direct Pydantic conversion is tricky for tuples
+            with phase("serialize"):
+                response_items = [{"id": item.id, "job_title": item.job_title} for item in jds_summary_db]
+                response = jsonify(response_items)
+            response.set_etag(etag)
+        # The body stays a plain list; the next page is advertised in headers
+        if next_cursor:
+            next_args = {k: v for k, v in request.args.items() if k != "cursor"}
+            next_args.update(cursor=next_cursor, limit=limit)
+            response.headers["X-Next-Cursor"] = next_cursor
+            response.headers["Link"] = f'<{url_for("jd_routes.list_jds_endpoint", **next_args)}>; rel="next"'
+        return response
     except Exception as e:
         print(f"Error in GET /api/jd endpoint: {e}")
         return jsonify({"error": "Failed to retrieve JDs", "details": str(e)}), 500
 
+@jd_bp.route('/search', methods=['GET'])
+def search_jds_endpoint():
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"detail": "Query parameter 'q' is required"}), 422
+    status = request.args.get("status")
+    if status is not None and status not in ("active", "inactive"):
+        return jsonify({"detail": "status must be 'active' or 'inactive'"}), 422
+    page = max(1, request.args.get("page", 1, type=int))
+    page_size = max(1, min(request.args.get("page_size", 20, type=int), Config.SEARCH_MAX_PAGE_SIZE))
+
+    db: Session = next(get_db())
+    try:
+        return jsonify(search_service.search(db, query, page=page, page_size=page_size, status=status)), 200
+    except Exception as e:
+        print(f"Error in GET /api/jd/search endpoint: {e}")
+        return jsonify({"error": "Failed to search JDs", "details": str(e)}), 500
+
+def _parse_skill_filters() -> dict:
+    kind = request.args.get("kind")
+    if kind is not None and kind not in ("required", "preferred"):
+        raise ValueError("kind must be 'required' or 'preferred'")
+    status = request.args.get("status")
+    if status is not None and status not in ("active", "inactive"):
+        raise ValueError("status must be 'active' or 'inactive'")
+    return {"kind": kind, "status": status}
+
+@jd_bp.route('/skills', methods=['GET'])
+def find_jds_by_skill_endpoint():
+    skill = (request.args.get("skill") or "").strip()
+    match = request.args.get("match", "contains")
+    if not skill:
+        return jsonify({"detail": "Query parameter 'skill' is required"}), 422
+    if match not in SkillsService.MATCH_MODES:
+        return jsonify({"detail": f"match must be one of {', '.join(SkillsService.MATCH_MODES)}"}), 422
+    try:
+        filters = _parse_skill_filters()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 422
+    limit = max(1, min(request.args.get("limit", 100, type=int), Config.LIST_MAX_LIMIT))
+
+    db: Session = next(get_db())
+    try:
+        return jsonify(skills_service.find_jds(db, skill, match=match, limit=limit, **filters)), 200
+    except Exception as e:
+        print(f"Error in GET /api/jd/skills endpoint: {e}")
+        return jsonify({"error": "Failed to look up skill", "details": str(e)}), 500
+
+@jd_bp.route('/skills/top', methods=['GET'])
+def top_skills_endpoint():
+    try:
+        filters = _parse_skill_filters()
+        for name in ("created_after", "created_before"):
+            filters[name] = _parse_utc_arg(name)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 422
+    limit = max(1, min(request.args.get("limit", 20, type=int), Config.LIST_MAX_LIMIT))
+
+    db: Session = next(get_db())
+    try:
+        return jsonify(skills_service.top_skills(db, limit=limit, **filters)), 200
+    except Exception as e:
+        print(f"Error in GET /api/jd/skills/top endpoint: {e}")
+        return jsonify({"error": "Failed to aggregate skills", "details": str(e)}), 500
+
 @jd_bp.route('/<int:job_id>', methods=['GET'])
 def get_jd_endpoint(job_id: int):
+    cached = jd_response_cache.get(job_id)
+    if cached is not None:
+        cached_body, etag = cached
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+        response = current_app.response_class(cached_body, mimetype=current_app.json.mimetype)
+        response.set_etag(etag)
+        response.headers["X-Cache"] = "HIT"
+        return response
+
+    generation = jd_response_cache.generation # taken before the read, see JDResponseCache.set
     db: Session = next(get_db())
+    if request.if_none_match:
+        # Revalidation only needs the version, not the multi-KB JSON column
+        version = jd_service.get_jd_version(db, job_id)
+        if version is not None and request.if_none_match.contains_weak(jd_etag(job_id, version)):
+            return _not_modified(jd_etag(job_id, version))
+
     db_jd = jd_service.get_jd_by_id(db, job_id)
     if db_jd is None:
         abort(404, description="Job Description not found")
     
-    # Parse the stored JSON string back into the Pydantic model for the response
-    parsed_content = jd_service.parse_jd_content(getattr(db_jd, "jd_content_json"))
-    
-    response_data = JDResponse(
-        id=getattr(db_jd, "id"),
-        job_title=getattr(db_jd, "job_title"),
-        jd_content=parsed_content,
-        created_at=getattr(db_jd, "created_at"),
-        expires_at=getattr(db_jd, "expires_at"),
-        status=db_jd.status.value # Get string value from Enum
-    )
-    return jsonify(response_data.model_dump()), 200
+    # The stored JSON is spliced into the body as-is (see JDService.render_jd_json)
+    body = jd_service.render_jd_json(db_jd, strict=Config.JD_RESPONSE_STRICT)
+    etag = jd_etag(job_id, db_jd.version)
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    jd_response_cache.set(job_id, body, etag, expires_at=db_jd.expires_at, generation=generation)
+    response.set_etag(etag)
+    response.headers["X-Cache"] = "MISS"
+    return response, 200
 
+def _not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def _if_match_version(job_id: int) -> int | None:
+    """
+    The version an If-Match header pins a write to, or None when there is no
+    precondition (no header, or "*").
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    for etag in if_match.as_set():
+        version = parse_jd_etag(job_id, etag)
+        if version is not None:
+            return version
+    return 0 # versions start at 1, so an ETag of some other resource never matches
+
+def _precondition_failed(e: JDVersionConflictError):
+    response = jsonify({"error": "Job Description was modified by another request", "details": str(e)})
+    if e.current_version is not None:
+        response.set_etag(jd_etag(e.job_id, e.current_version))
+    return response, 412
 
 @jd_bp.route('/<int:job_id>', methods=['PUT'])
 def update_jd_endpoint(job_id: int):
     db: Session = next(get_db())
     try:
-        raw_data = request.json
-        # Handle jd_content if it's part of the update
-        if raw_data is not None and 'jd_content' in raw_data and raw_data['jd_content'] and isinstance(raw_data['jd_content'], dict):
-            raw_data['jd_content'] = JobDescriptionContent(**raw_data['jd_content'])
-        
-        req_data = JDUpdateRequest.model_validate(raw_data)
+        with phase("validate"):
+            req_data = JDUpdateRequest.model_validate(request.json)
 
     except ValidationError as e:
-        return jsonify({"detail": e.errors()}), 422
+        return _validation_error(e)
 
-    updated_jd_db = jd_service.update_jd(db, job_id, req_data)
+    try:
+        updated_jd_db = jd_service.update_jd(db, job_id, req_data, expected_version=_if_match_version(job_id))
+    except JDVersionConflictError as e:
+        return _precondition_failed(e)
     if updated_jd_db is None:
         abort(404, description="Job Description not found")
 
-    # Parse content for response
-    parsed_content = jd_service.parse_jd_content(getattr(updated_jd_db, "jd_content_json"))
-    response_data = JDResponse(
-        id=getattr(updated_jd_db, "id"),
-        job_title=getattr(updated_jd_db, "job_title"),
-        jd_content=parsed_content,
-        created_at=getattr(updated_jd_db, "created_at"),
-        expires_at=getattr(updated_jd_db, "expires_at"),
-        status=updated_jd_db.status.value
-    )
-    return jsonify(response_data.model_dump()), 200
+    body = jd_service.render_jd_json(updated_jd_db, strict=Config.JD_RESPONSE_STRICT)
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    response.set_etag(jd_etag(job_id, updated_jd_db.version))
+    return response, 200
+
+@jd_bp.route('/<int:job_id>', methods=['PATCH'])
+def patch_jd_endpoint(job_id: int):
+    try:
+        with phase("validate"):
+            req_data = JDPatchRequest.model_validate(request.json)
+    except ValidationError as e:
+        return _validation_error(e)
+
+    db: Session = next(get_db())
+    try:
+        patched_row = jd_service.patch_jd(db, job_id, req_data, expected_version=_if_match_version(job_id))
+    except JDVersionConflictError as e:
+        return _precondition_failed(e)
+    if patched_row is None:
+        abort(404, description="Job Description not found")
+
+    body = jd_service.render_jd_json(patched_row, strict=Config.JD_RESPONSE_STRICT)
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    response.set_etag(jd_etag(job_id, patched_row.version))
+    return response, 200
 
 @jd_bp.route('/<int:job_id>', methods=['DELETE'])
 def delete_jd_endpoint(job_id: int):
     db: Session = next(get_db())
-    deleted = jd_service.delete_jd(db, job_id)
+    try:
+        deleted = jd_service.delete_jd(db, job_id, expected_version=_if_match_version(job_id))
+    except JDVersionConflictError as e:
+        return _precondition_failed(e)
     if not deleted:
         abort(404, description="Job Description not found")
     return jsonify({"message": "Job Description deleted successfully"}), 200
\ No newline at end of file
@@ -28,8 +28,15 @@ class JDGenerateRequest(BaseModel):
     key_responsibilities_input: List[str]
     required_skills_input: List[str]
     company_description_input: Optional[str] = None
+    bypass_cache: bool = False # Skip the generation cache lookup (the fresh result is still cached)
     # Add other inputs Gemini might need, e.g., tone, experience_level
 
+class JDBatchGenerateRequest(BaseModel):
+    items: List[JDGenerateRequest] = Field(..., min_length=1)
+    max_parallel: Optional[int] = Field(None, ge=1) # Capped by BATCH_MAX_PARALLELISM
+    persist: bool = False # Save every successful result through JDService in one transaction
+    expires_at: Optional[datetime] = None # Applied to persisted JDs
+
 class JDCreateRequest(BaseModel):
     job_title: str # For DB storage and easy query, can be same as jd_content.job_title_generated
     jd_content: JobDescriptionContent # The structured JD from Gemini or manual input
@@ -47,6 +54,38 @@ class JDUpdateRequest(BaseModel):
             raise ValueError("Status must be 'active' or 'inactive'")
         return value
 
+class JDContentPatch(BaseModel):
+    # Top-level fields of JobDescriptionContent to overwrite in place; anything not sent is kept
+    job_title_generated: Optional[str] = Field(None, alias="job_title")
+    company_summary: Optional[str] = None
+    role_summary: Optional[str] = None
+    key_responsibilities: Optional[List[str]] = None
+    required_qualifications: Optional[List[str]] = None
+    preferred_qualifications: Optional[List[str]] = None
+    benefits: Optional[List[str]] = None
+
+    class Config:
+        populate_by_name = True
+        extra = "forbid" # unknown keys would otherwise be merged into the stored JSON
+
+    @validator('job_title_generated', 'role_summary', 'key_responsibilities', 'required_qualifications')
+    def required_fields_not_null(cls, value):
+        if value is None:
+            raise ValueError("This field is required in the JD content and cannot be null")
+        return value
+
+class JDPatchRequest(BaseModel):
+    job_title: Optional[str] = None
+    jd_content: Optional[JDContentPatch] = None
+    expires_at: Optional[datetime] = None # an explicit null clears it
+    status: Optional[str] = None
+
+    @validator('status')
+    def status_must_be_valid(cls, value):
+        if value is not None and value not in ['active', 'inactive']:
+            raise ValueError("Status must be 'active' or 'inactive'")
+        return value
+
 class JDResponse(BaseModel):
     id: int
     job_title: str
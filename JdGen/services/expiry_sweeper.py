@@ -0,0 +1,134 @@
+# ai_hr_jd_project/services/expiry_sweeper.py
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import Config
+from database import connection
+from database.models import MaintenanceLeaseTable
+from services.jd_service import JDService
+
+
+def acquire_lease(db: Session, name: str, holder: str, lease_seconds: float) -> bool:
+    """
+    Takes (or renews) the named lease if it is free, expired or already ours.
+    A plain UPDATE/INSERT pair rather than GET_LOCK() so it works on any
+    database and survives a crashed holder: the lease simply runs out.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    taken = db.execute(
+        update(MaintenanceLeaseTable)
+        .where(MaintenanceLeaseTable.name == name,
+               (MaintenanceLeaseTable.expires_at < now) | (MaintenanceLeaseTable.holder == holder))
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not taken:
+        try:
+            db.execute(insert(MaintenanceLeaseTable).values(name=name, holder=holder, expires_at=expires_at))
+            taken = 1
+        except IntegrityError:
+            # Someone else holds a live lease
+            db.rollback()
+            return False
+    db.commit()
+    return bool(taken)
+
+
+def release_lease(db: Session, name: str, holder: str) -> None:
+    db.execute(
+        update(MaintenanceLeaseTable)
+        .where(MaintenanceLeaseTable.name == name, MaintenanceLeaseTable.holder == holder)
+        .values(expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+class ExpirySweeper:
+    """
+    Marks ACTIVE JDs whose expires_at has passed as INACTIVE, batch by batch.
+    Runs either once (manage.py sweep-expired, e.g. from Cloud Scheduler) or
+    every interval seconds on a daemon thread. A database lease keeps replicas
+    from sweeping at the same time; JDService notifies its listeners, so this
+    process's caches and search index see the new status.
+    """
+    LEASE_NAME = "expiry_sweeper"
+
+    def __init__(self, jd_service: JDService, batch_size: int = 500, max_batches: int = 100,
+                 interval: float = 300, lease_seconds: float = 120):
+        self.jd_service = jd_service
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.last_run: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, jd_service: JDService) -> "ExpirySweeper":
+        return cls(jd_service,
+                   batch_size=Config.EXPIRY_SWEEP_BATCH_SIZE,
+                   max_batches=Config.EXPIRY_SWEEP_MAX_BATCHES,
+                   interval=Config.EXPIRY_SWEEP_INTERVAL_SECONDS,
+                   lease_seconds=Config.EXPIRY_SWEEP_LEASE_SECONDS)
+
+    def run_once(self) -> dict:
+        """One sweep. Returns a report: rows expired, batches, and whether the lease was ours (and stayed ours)."""
+        started = time.monotonic()
+        report = {"expired": 0, "batches": 0, "lease_acquired": False, "lease_lost": False, "finished_at": None}
+        with Session(bind=connection.get_engine()) as db:
+            if not acquire_lease(db, self.LEASE_NAME, self.holder, self.lease_seconds):
+                report["finished_at"] = datetime.utcnow().isoformat() + "Z"
+                self.last_run = report
+                return report
+            report["lease_acquired"] = True
+            try:
+                now = datetime.utcnow()
+                # Bounded so one run can't hold the lease forever; the rest waits for the next run
+                while report["batches"] < self.max_batches:
+                    expired = self.jd_service.expire_due_jds(db, now, batch_size=self.batch_size)
+                    if not expired:
+                        break
+                    report["expired"] += expired
+                    report["batches"] += 1
+                    if not acquire_lease(db, self.LEASE_NAME, self.holder, self.lease_seconds): # renew
+                        # The lease ran out mid-run and another replica took it; leave the rest to it
+                        report["lease_lost"] = True
+                        print("Expiry sweep: lease lost to another holder; stopping this run.")
+                        break
+            finally:
+                release_lease(db, self.LEASE_NAME, self.holder)
+        report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        report["finished_at"] = datetime.utcnow().isoformat() + "Z"
+        self.last_run = report
+        if report["expired"]:
+            print(f"Expiry sweep: {report['expired']} job descriptions marked inactive "
+                  f"in {report['batches']} batches ({report['duration_ms']} ms).")
+        return report
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in expiry sweep: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="jd-expiry-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,374 @@
+# ai_hr_jd_project/services/gemini_gateway.py
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+from config import Config
+from services import metrics
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GeminiUnavailableError(Exception):
+    """Raised when a call is rejected without reaching Gemini. Routes map it to 503."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GatewayBusyError(GeminiUnavailableError):
+    """All concurrency slots stayed busy for longer than the queue timeout."""
+
+
+class CircuitOpenError(GeminiUnavailableError):
+    """The circuit breaker is open because Gemini has been failing."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker. After `failure_threshold`
+    consecutive failures it opens for `reset_timeout` seconds, then lets a
+    single trial call through; success closes it again, failure re-opens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError or lets the call through; returns True if it is the half-open trial."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError("Gemini circuit breaker is open; failing fast.", retry_after=retry_after or 1.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def release_trial(self, trial: bool) -> None:
+        """
+        Hands back a trial that ended without telling us anything about Gemini
+        (no free slot, cancelled, stream closed by the consumer), so the next
+        call can make it. Without this the breaker would stay open for good.
+        """
+        if not trial:
+            return
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    # google.genai.errors.APIError exposes the HTTP status as `.code`
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    code = _status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    # Connection resets and read timeouts from the HTTP layer carry no status code
+    return isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ in (
+        "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError",
+    )
+
+
+class GeminiGateway:
+    """
+    Process-wide entry point for Gemini calls. Owns one reusable genai.Client
+    (and therefore one HTTP connection pool), caps the number of in-flight
+    calls, retries transient failures with jittered exponential backoff and
+    trips a circuit breaker while Gemini is degraded.
+
+    The a* methods are the asyncio path (client.aio) used by async_app.py.
+    Waiting coroutines cost no thread, so they get their own, much larger
+    concurrency limit; the breaker is shared with the threaded path.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 8,
+                 queue_timeout: float = 5.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 request_timeout: float = 60.0, breaker: Optional[CircuitBreaker] = None,
+                 async_max_concurrency: int = 256):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.async_max_concurrency = async_max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots: Optional[asyncio.Semaphore] = None # created on first use, inside the event loop
+        self._async_in_flight = 0
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "GeminiGateway":
+        return cls(
+            api_key=Config.GOOGLE_API_KEY,
+            max_concurrency=Config.GEMINI_MAX_CONCURRENCY,
+            queue_timeout=Config.GEMINI_QUEUE_TIMEOUT_SECONDS,
+            max_retries=Config.GEMINI_MAX_RETRIES,
+            backoff_base=Config.GEMINI_BACKOFF_BASE_SECONDS,
+            backoff_max=Config.GEMINI_BACKOFF_MAX_SECONDS,
+            request_timeout=Config.GEMINI_REQUEST_TIMEOUT_SECONDS,
+            breaker=CircuitBreaker(
+                failure_threshold=Config.GEMINI_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=Config.GEMINI_BREAKER_RESET_SECONDS,
+            ),
+            async_max_concurrency=Config.GEMINI_ASYNC_MAX_CONCURRENCY,
+        )
+
+    @property
+    def client(self) -> "genai.Client":
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise ValueError("GOOGLE_API_KEY not configured.")
+                    # Imported here: google-genai takes longer to import than the rest of the app together
+                    from google import genai
+                    from google.genai import types
+                    self._client = genai.Client(
+                        api_key=self.api_key,
+                        # HttpOptions.timeout is in milliseconds
+                        http_options=types.HttpOptions(timeout=int(self.request_timeout * 1000)),
+                    )
+        return self._client
+
+    def warm(self) -> None:
+        """Builds the client ahead of the first call (see services/warmup.py)."""
+        self.client
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # "Full jitter": uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_delay(self, e: Exception, attempt: int, can_retry: bool = True) -> Optional[float]:
+        """Backoff before the next attempt, or None if `e` should be raised. Updates the breaker."""
+        if not is_retryable(e):
+            # Gemini answered (e.g. a 400), so the service itself is healthy
+            self.breaker.record_success()
+            return None
+        if can_retry and attempt < self.max_retries:
+            return self._backoff_delay(attempt)
+        self.breaker.record_failure()
+        return None
+
+    def _acquire_slot(self) -> None:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise GatewayBusyError(
+                f"Too many concurrent Gemini calls (limit {self.max_concurrency}).",
+                retry_after=self.queue_timeout,
+            )
+
+    @contextmanager
+    def _guarded_call(self):
+        # The breaker goes first, so an open circuit fails fast instead of queueing for a slot
+        trial = self.breaker.before_call()
+        try:
+            self._acquire_slot()
+        except BaseException:
+            self.breaker.release_trial(trial)
+            raise
+        try:
+            yield
+        except Exception:
+            raise # the retry loop has recorded the outcome on the breaker
+        except BaseException:
+            # GeneratorExit (stream closed early), KeyboardInterrupt: no outcome either way
+            self.breaker.release_trial(trial)
+            raise
+        finally:
+            self._slots.release()
+
+    def generate_content(self, **kwargs):
+        """Drop-in for client.models.generate_content(**kwargs) with the gateway policies applied."""
+        with self._guarded_call():
+            attempt = 0
+            while True:
+                try:
+                    response = self.client.models.generate_content(**kwargs)
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    metrics.record_llm_retry("generate")
+                    print(f"Gemini call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return response
+
+    def generate_content_stream(self, **kwargs):
+        """
+        Streaming counterpart of generate_content(): yields response chunks.
+        The concurrency slot is held until the stream is exhausted or closed.
+        Retries only happen before the first chunk, since a partial answer
+        cannot be replayed to the consumer.
+        """
+        with self._guarded_call():
+            attempt = 0
+            while True:
+                received_any = False
+                try:
+                    for chunk in self.client.models.generate_content_stream(**kwargs):
+                        received_any = True
+                        yield chunk
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt, can_retry=not received_any)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    metrics.record_llm_retry("stream")
+                    print(f"Gemini stream failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return
+
+    async def _acquire_async_slot(self) -> None:
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.async_max_concurrency)
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise GatewayBusyError(
+                f"Too many concurrent Gemini calls (limit {self.async_max_concurrency}).",
+                retry_after=self.queue_timeout,
+            ) from None
+        self._async_in_flight += 1
+
+    def _release_async_slot(self) -> None:
+        self._async_in_flight -= 1
+        self._async_slots.release()
+
+    @asynccontextmanager
+    async def _aguarded_call(self):
+        # Same as _guarded_call(); CancelledError is the usual way an async call ends without an outcome
+        trial = self.breaker.before_call()
+        try:
+            await self._acquire_async_slot()
+        except BaseException:
+            self.breaker.release_trial(trial)
+            raise
+        try:
+            yield
+        except Exception:
+            raise
+        except BaseException:
+            self.breaker.release_trial(trial)
+            raise
+        finally:
+            self._release_async_slot()
+
+    async def agenerate_content(self, **kwargs):
+        """Coroutine version of generate_content(), through client.aio."""
+        async with self._aguarded_call():
+            attempt = 0
+            while True:
+                try:
+                    response = await self.client.aio.models.generate_content(**kwargs)
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    metrics.record_llm_retry("generate")
+                    print(f"Gemini call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return response
+
+    async def agenerate_content_stream(self, **kwargs):
+        """Async generator version of generate_content_stream(), same retry rules."""
+        async with self._aguarded_call():
+            attempt = 0
+            while True:
+                received_any = False
+                try:
+                    async for chunk in await self.client.aio.models.generate_content_stream(**kwargs):
+                        received_any = True
+                        yield chunk
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt, can_retry=not received_any)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    metrics.record_llm_retry("stream")
+                    print(f"Gemini stream failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return
+
+    def stats(self) -> dict:
+        return {
+            "provider": "gemini",
+            "max_concurrency": self.max_concurrency,
+            # BoundedSemaphore has no public counter; _value is the number of free slots
+            "in_flight": self.max_concurrency - self._slots._value,
+            "async_max_concurrency": self.async_max_concurrency,
+            "async_in_flight": self._async_in_flight,
+            "circuit_state": self.breaker.state,
+        }
+
+
+_gateway: Optional[GeminiGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> GeminiGateway:
+    """Returns the process-wide gateway, creating it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = GeminiGateway.from_config()
+    return _gateway
@@ -1,53 +1,39 @@
 # ai_hr_jd_project/services/gemini_service.py
-from google import genai
 from config import Config
+from pydantic import ValidationError
 from schemas.jd_schemas import JobDescriptionContent, JDGenerateRequest # Import the Pydantic model for structured output
+from services.llm_providers import get_provider, response_text
+from services import metrics
+from services.request_timing import phase
+from services.json_stream import IncrementalJSONObjectParser
+from services.prompt_compiler import PromptCompiler
+
+# Gemini writes the JSON with aliases ("job_title"); the API speaks field names ("job_title_generated")
+_ALIAS_TO_FIELD = {
+    (field.alias or name): name for name, field in JobDescriptionContent.model_fields.items()
+}
 
 class GeminiService:
-    def __init__(self):
-        if not Config.GOOGLE_API_KEY:
-            raise ValueError("GOOGLE_API_KEY not configured.")
-        client = genai.Client(api_key="GOOGLE_API_KEY")
+    def __init__(self, provider=None, prompt_compiler=None):
+        # LLM_PROVIDER picks the backend (see services/llm_providers.py). The live one is the
+        # GeminiGateway, which owns the single shared genai.Client, concurrency limit, retries and breaker.
+        # Resolved on first use, so importing the routes doesn't build it
+        self._provider = provider
+        self.prompt_compiler = prompt_compiler or PromptCompiler.from_config()
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            self._provider = get_provider()
+        return self._provider
 
 
     def generate_structured_jd(self, jd_input: JDGenerateRequest) -> JobDescriptionContent:
-        prompt = f"""
-        Act as an expert HR recruitment specialist and a master copywriter.
-        Based on the following information, generate a comprehensive and engaging job description.
-        The output MUST be a valid JSON object matching the provided schema.
-
-        Job Title to be created: {jd_input.job_title_input}
-        Key Responsibilities: {', '.join(jd_input.key_responsibilities_input)}
-        Required Skills/Qualifications: {', '.join(jd_input.required_skills_input)}
-        Company Description (optional): {jd_input.company_description_input or 'Not provided, create a generic placeholder if needed.'}
-
-        Desired JSON Structure:
-        {{
-            "job_title": "string (The final job title, can be same as input or refined)",
-            "company_summary": "string (Brief summary of the company)",
-            "role_summary": "string (Brief summary of the role)",
-            "key_responsibilities": ["string", "..."],
-            "required_qualifications": ["string", "..."],
-            "preferred_qualifications": ["string", "..."],
-            "benefits": ["string", "..."]
-        }}
-
-        Ensure all fields in the JSON structure are populated appropriately based on the input.
-        If some information (like preferred_qualifications or benefits) is not directly provided,
-        you can either omit it, provide sensible defaults, or indicate it needs to be filled.
-        The job_title in the output JSON should be the one you craft for the JD.
-        """
         response = None
         try:
-            client = genai.Client(api_key=Config.GOOGLE_API_KEY)
-            response = client.models.generate_content(
-    model="gemini-2.5-flash",
-    contents=prompt,
-    config={
-        "response_mime_type": "application/json",
-        "response_schema":  JobDescriptionContent,  # Use the Pydantic model schema
-    },
-)
+            call = self._generation_call(jd_input)
+            with phase("gemini"):
+                response = self.provider.generate_content(**call)
 
             # The response.text will be a JSON string.
             # response.candidates[0].content.parts[0].text is also the JSON string
@@ -105,7 +91,8 @@ class GeminiService:
                 # The `response.text` attribute of `GenerateContentResponse` will contain the JSON string.
                 # We can then parse this with Pydantic.
                 if hasattr(response, 'text') and response.text:
-                    parsed_jd = JobDescriptionContent.model_validate_json(response.text)
+                    with phase("parse"):
+                        parsed_jd = JobDescriptionContent.model_validate_json(response.text)
                     return parsed_jd
                 else:
                     # Fallback or error if text is not available or empty
@@ -122,6 +109,8 @@ class GeminiService:
                     # For `genai.GenerativeModel`, it's usually `response.text`.
                     raise ValueError("Failed to get parsed JSON from Gemini response. Raw response: " + str(response))
         except Exception as e:
+            if isinstance(e, ValidationError):
+                metrics.record_validation_failure("gemini")
             print(f"Error generating JD with Gemini: {e}")
             if response is not None:
                 print(f"Gemini raw response (if available): {getattr(response, 'prompt_feedback', '')}")
@@ -129,4 +118,68 @@ class GeminiService:
             raise  # Re-raise the exception to be caught by the route
         
         raise ValueError("Gemini response was empty or not in expected format.")
-        raise ValueError("Gemini response was empty or not in expected format.")
\ No newline at end of file
+        raise ValueError("Gemini response was empty or not in expected format.")
+
+    def _generation_call(self, jd_input: JDGenerateRequest) -> dict:
+        prompt = self.prompt_compiler.compile(jd_input)
+        return {
+            "model": Config.GEMINI_MODEL,
+            "contents": prompt.contents,
+            "config": {
+                "system_instruction": prompt.system_instruction, # the same for every call
+                "response_mime_type": "application/json",
+                "response_schema": JobDescriptionContent,  # Use the Pydantic model schema
+            },
+        }
+
+    def stream_structured_jd(self, jd_input: JDGenerateRequest):
+        """
+        Streams the generation. Yields ("field", name, value) as soon as each
+        top-level JobDescriptionContent field is complete in the streamed JSON,
+        then a final ("done", None, JobDescriptionContent) once the whole object validates.
+        """
+        parser = IncrementalJSONObjectParser()
+        for chunk in self.provider.generate_content_stream(**self._generation_call(jd_input)):
+            text = getattr(chunk, "text", None)
+            if not text:
+                continue
+            for key, value in parser.feed(text):
+                yield "field", _ALIAS_TO_FIELD.get(key, key), value
+        yield "done", None, self._validate_streamed(parser)
+
+    def _validate_streamed(self, parser: IncrementalJSONObjectParser) -> JobDescriptionContent:
+        if not parser.text.strip():
+            raise ValueError("Gemini stream was empty or not in expected format.")
+        try:
+            return JobDescriptionContent.model_validate_json(parser.text)
+        except ValidationError:
+            metrics.record_validation_failure("gemini")
+            raise
+
+    # asyncio versions for async_app.py: the event loop waits on Gemini instead of a worker thread
+
+    async def agenerate_structured_jd(self, jd_input: JDGenerateRequest) -> JobDescriptionContent:
+        try:
+            with phase("gemini"):
+                response = await self.provider.agenerate_content(**self._generation_call(jd_input))
+            text = response_text(response)
+            if not text:
+                raise ValueError("Gemini response was empty or not in expected format.")
+            with phase("parse"):
+                return JobDescriptionContent.model_validate_json(text)
+        except Exception as e:
+            if isinstance(e, ValidationError):
+                metrics.record_validation_failure("gemini")
+            print(f"Error generating JD with Gemini: {e}")
+            raise
+
+    async def astream_structured_jd(self, jd_input: JDGenerateRequest):
+        """Async generator version of stream_structured_jd(), yielding the same tuples."""
+        parser = IncrementalJSONObjectParser()
+        async for chunk in self.provider.agenerate_content_stream(**self._generation_call(jd_input)):
+            text = getattr(chunk, "text", None)
+            if not text:
+                continue
+            for key, value in parser.feed(text):
+                yield "field", _ALIAS_TO_FIELD.get(key, key), value
+        yield "done", None, self._validate_streamed(parser)
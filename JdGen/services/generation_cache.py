@@ -0,0 +1,237 @@
+# ai_hr_jd_project/services/generation_cache.py
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from config import Config
+from schemas.jd_schemas import JDGenerateRequest, JobDescriptionContent
+
+
+def _clean_lines(items) -> list[str]:
+    # The Streamlit form sends textarea.split('\n'), so blank lines and stray
+    # whitespace are common. They don't change what Gemini produces.
+    cleaned = []
+    for item in items or []:
+        line = " ".join(str(item).split())
+        if line:
+            cleaned.append(line)
+    return cleaned
+
+
+def _skill_set(items) -> list[str]:
+    # Case-insensitive de-duplication, like PromptCompiler (so "Python" and "python."
+    # are one skill), in an order that doesn't depend on the hash seed: the key has
+    # to be the same in every worker sharing the SQLite tier, and after a restart.
+    skills = []
+    seen = set()
+    for line in sorted(_clean_lines(items), key=lambda line: (line.casefold(), line)):
+        key = line.casefold().rstrip(".")
+        if key not in seen:
+            seen.add(key)
+            skills.append(line)
+    return skills
+
+
+def normalize_generate_request(jd_input: JDGenerateRequest) -> dict:
+    """Canonical form of a generation request, used only for cache keys."""
+    return {
+        "job_title": " ".join(jd_input.job_title_input.split()),
+        # Responsibilities keep their order (it shapes the generated list),
+        # skills are a set as far as the prompt is concerned.
+        "key_responsibilities": _clean_lines(jd_input.key_responsibilities_input),
+        "required_skills": _skill_set(jd_input.required_skills_input),
+        "company_description": " ".join((jd_input.company_description_input or "").split()),
+    }
+
+
+def generation_cache_key(jd_input: JDGenerateRequest) -> str:
+    canonical = json.dumps(normalize_generate_request(jd_input), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheTier:
+    """Optional persistent tier so cached generations survive restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jd_generation_cache ("
+            " cache_key TEXT PRIMARY KEY,"
+            " content_json TEXT NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, max_age: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_json, stored_at FROM jd_generation_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return row[0]
+
+    def set(self, key: str, content_json: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jd_generation_cache (cache_key, content_json, stored_at) VALUES (?, ?, ?)",
+                (key, content_json, time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self, max_age: float) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jd_generation_cache WHERE stored_at < ?", (time.time() - max_age,)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+
+class GenerationCache:
+    """
+    Bounded LRU (with TTL) in front of the Gemini call, keyed on the
+    normalized JDGenerateRequest. A persistent SQLite tier can back it; its
+    expired rows are purged every `purge_every` writes.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400,
+                 persistent_tier: Optional[SQLiteCacheTier] = None, enabled: bool = True,
+                 purge_every: int = 256):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent_tier = persistent_tier
+        self.enabled = enabled
+        self.purge_every = purge_every
+        self._writes = 0
+        self._entries: "OrderedDict[str, Tuple[float, JobDescriptionContent]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @classmethod
+    def from_config(cls) -> "GenerationCache":
+        tier = SQLiteCacheTier(Config.GEN_CACHE_SQLITE_PATH) if Config.GEN_CACHE_SQLITE_PATH else None
+        return cls(
+            max_entries=Config.GEN_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.GEN_CACHE_TTL_SECONDS,
+            persistent_tier=tier,
+            enabled=Config.GEN_CACHE_ENABLED,
+        )
+
+    def get(self, key: str) -> Optional[JobDescriptionContent]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, content = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return content
+                del self._entries[key]
+
+        if self.persistent_tier is not None:
+            content_json = self.persistent_tier.get(key, self.ttl_seconds)
+            if content_json is not None:
+                content = JobDescriptionContent.model_validate_json(content_json)
+                self._put_memory(key, content)
+                with self._lock:
+                    self.hits += 1
+                    self.persistent_hits += 1
+                return content
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, content: JobDescriptionContent) -> None:
+        self._put_memory(key, content)
+        if self.persistent_tier is not None:
+            self.persistent_tier.set(key, content.model_dump_json())
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % self.purge_every == 0
+            if purge:
+                self.persistent_tier.purge_expired(self.ttl_seconds)
+
+    def _put_memory(self, key: str, content: JobDescriptionContent) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_generate(self, jd_input: JDGenerateRequest,
+                        generate: Callable[[JDGenerateRequest], JobDescriptionContent],
+                        bypass: bool = False) -> Tuple[JobDescriptionContent, str]:
+        """
+        Returns (content, cache_status) where cache_status is one of
+        "HIT", "MISS", "BYPASS" or "DISABLED". A bypass still refreshes the entry.
+        """
+        if not self.enabled:
+            return generate(jd_input), "DISABLED"
+
+        key, cached = self._lookup(jd_input, bypass)
+        if cached is not None:
+            return cached, "HIT"
+        content = generate(jd_input)
+        self.set(key, content)
+        return content, "BYPASS" if bypass else "MISS"
+
+    async def aget_or_generate(self, jd_input: JDGenerateRequest,
+                               agenerate: Callable[[JDGenerateRequest], Awaitable[JobDescriptionContent]],
+                               bypass: bool = False) -> Tuple[JobDescriptionContent, str]:
+        """get_or_generate() for coroutines. The SQLite tier, if any, is read and written off the event loop."""
+        if not self.enabled:
+            return await agenerate(jd_input), "DISABLED"
+
+        if self.persistent_tier is not None:
+            key, cached = await asyncio.to_thread(self._lookup, jd_input, bypass)
+        else:
+            key, cached = self._lookup(jd_input, bypass)
+        if cached is not None:
+            return cached, "HIT"
+        content = await agenerate(jd_input)
+        if self.persistent_tier is not None:
+            await asyncio.to_thread(self.set, key, content)
+        else:
+            self.set(key, content)
+        return content, "BYPASS" if bypass else "MISS"
+
+    def _lookup(self, jd_input: JDGenerateRequest, bypass: bool) -> Tuple[str, Optional[JobDescriptionContent]]:
+        key = generation_cache_key(jd_input)
+        if bypass:
+            with self._lock:
+                self.bypasses += 1
+            return key, None
+        return key, self.get(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent_tier": self.persistent_tier.path if self.persistent_tier else None,
+            }
@@ -0,0 +1,225 @@
+# ai_hr_jd_project/services/generation_jobs.py
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import Config
+from database import connection
+from database.models import GenerationJobTable
+from schemas.jd_schemas import JDGenerateRequest, JobDescriptionContent
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Raised by submit() when the worker pool already has max_pending jobs waiting."""
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() + "Z" if value else None
+
+
+class InMemoryJobStore:
+    """Jobs live in this process only. Fine for a single instance or local development."""
+
+    def __init__(self):
+        self._jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, request_json: str) -> None:
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": QUEUED,
+                "request_json": request_json,
+                "result_json": None,
+                "cache_status": None,
+                "error": None,
+                "created_at": datetime.utcnow(),
+                "finished_at": None,
+            }
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status=RUNNING)
+
+    def mark_succeeded(self, job_id: str, result_json: str, cache_status: str) -> None:
+        self._update(job_id, status=SUCCEEDED, result_json=result_json,
+                     cache_status=cache_status, finished_at=datetime.utcnow())
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._update(job_id, status=FAILED, error=error, finished_at=datetime.utcnow())
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def purge_expired(self, ttl_seconds: float) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                # Unfinished jobs that old were orphaned by a crashed worker
+                if (job["finished_at"] or job["created_at"]) < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class DatabaseJobStore:
+    """Jobs stored in the generation_jobs table so every replica can answer a poll."""
+
+    def _session(self) -> Session:
+        # Plain sessions (not the request-scoped SessionLocal) because workers run off-request
+        return Session(bind=connection.get_engine())
+
+    def create(self, job_id: str, request_json: str) -> None:
+        with self._session() as db:
+            db.add(GenerationJobTable(id=job_id, status=QUEUED, request_json=request_json,
+                                      created_at=datetime.utcnow()))
+            db.commit()
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._session() as db:
+            db.query(GenerationJobTable).filter(GenerationJobTable.id == job_id).update(fields)
+            db.commit()
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status=RUNNING)
+
+    def mark_succeeded(self, job_id: str, result_json: str, cache_status: str) -> None:
+        self._update(job_id, status=SUCCEEDED, result_json=result_json,
+                     cache_status=cache_status, finished_at=datetime.utcnow())
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._update(job_id, status=FAILED, error=error, finished_at=datetime.utcnow())
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._session() as db:
+            row = db.get(GenerationJobTable, job_id)
+            if row is None:
+                return None
+            return {
+                "job_id": row.id,
+                "status": row.status,
+                "request_json": row.request_json,
+                "result_json": row.result_json,
+                "cache_status": row.cache_status,
+                "error": row.error,
+                "created_at": row.created_at,
+                "finished_at": row.finished_at,
+            }
+
+    def purge_expired(self, ttl_seconds: float) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+        with self._session() as db:
+            deleted = db.query(GenerationJobTable).filter(
+                (GenerationJobTable.finished_at < cutoff)
+                | (GenerationJobTable.finished_at.is_(None) & (GenerationJobTable.created_at < cutoff))
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+
+
+def job_to_dict(job: dict) -> dict:
+    """Public representation of a job for the API."""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "created_at": _iso(job["created_at"]),
+        "finished_at": _iso(job["finished_at"]),
+        "cache": job["cache_status"],
+        "result": json.loads(job["result_json"]) if job["result_json"] else None,
+        "error": job["error"],
+    }
+
+
+class GenerationJobManager:
+    """
+    Runs generation requests on a bounded background thread pool so the HTTP
+    worker that accepted the request is released immediately.
+    """
+
+    def __init__(self, store, generate: Callable[[JDGenerateRequest], Tuple[JobDescriptionContent, str]],
+                 max_workers: int = 4, max_pending: int = 100, ttl_seconds: float = 3600,
+                 purge_interval: float = 60):
+        self.store = store
+        self.generate = generate
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jd-gen-job")
+        # Counts queued + running jobs; a non-blocking acquire keeps the queue bounded
+        self._capacity = threading.BoundedSemaphore(max_workers + max_pending)
+        self._last_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, generate) -> "GenerationJobManager":
+        store = DatabaseJobStore() if Config.JOB_STORE == "database" else InMemoryJobStore()
+        return cls(store, generate,
+                   max_workers=Config.JOB_WORKERS,
+                   max_pending=Config.JOB_MAX_PENDING,
+                   ttl_seconds=Config.JOB_TTL_SECONDS)
+
+    def submit(self, jd_input: JDGenerateRequest) -> str:
+        self._maybe_purge()
+        if not self._capacity.acquire(blocking=False):
+            raise JobQueueFullError(f"Generation queue is full ({self.max_pending} pending jobs).")
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.create(job_id, jd_input.model_dump_json())
+            self._executor.submit(self._run, job_id, jd_input)
+        except Exception:
+            self._capacity.release()
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def _run(self, job_id: str, jd_input: JDGenerateRequest) -> None:
+        try:
+            self.store.mark_running(job_id)
+            content, cache_status = self.generate(jd_input)
+            self.store.mark_succeeded(job_id, content.model_dump_json(), cache_status)
+        except Exception as e:
+            print(f"Error in generation job {job_id}: {e}")
+            try:
+                self.store.mark_failed(job_id, str(e))
+            except Exception as store_error:
+                print(f"Could not record failure of generation job {job_id}: {store_error}")
+        finally:
+            self._capacity.release()
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_purge = now
+            purged = self.store.purge_expired(self.ttl_seconds)
+            if purged:
+                print(f"Purged {purged} expired generation jobs.")
+        except Exception as e:
+            print(f"Error purging generation jobs: {e}")
+        finally:
+            self._purge_lock.release()
@@ -1,57 +1,418 @@
 # ai_hr_jd_project/services/jd_service.py
+from sqlalchemy import insert, select, update, delete, or_, and_, func, cast, JSON
 from sqlalchemy.orm import Session
-from database.models import JDTable, JobStatus
-from schemas.jd_schemas import JDCreateRequest, JDUpdateRequest, JobDescriptionContent
+from sqlalchemy.orm.exc import StaleDataError
+from database.models import JDTable, JDSkillTable, JobStatus
+from schemas.jd_schemas import JDCreateRequest, JDUpdateRequest, JDPatchRequest, JobDescriptionContent
+from services.search_index import extract_search_text
+from services.skills_service import replace_skills
+from services.request_timing import phase
 from datetime import datetime
+from werkzeug.http import http_date
+import base64
 import json
 
+class JDVersionConflictError(Exception):
+    """The JD was changed since the version the caller based its write on (If-Match failed)."""
+
+    def __init__(self, job_id: int, current_version: int | None):
+        super().__init__(f"Job Description {job_id} is at version {current_version}")
+        self.job_id = job_id
+        self.current_version = current_version
+
+def jd_etag(job_id: int, version: int) -> str:
+    # Opaque to clients; also parsed back by parse_jd_etag for If-Match
+    return f"jd-{job_id}-v{version}"
+
+def parse_jd_etag(job_id: int, etag: str) -> int | None:
+    prefix = f"jd-{job_id}-v"
+    if etag.startswith(prefix) and etag[len(prefix):].isdigit():
+        return int(etag[len(prefix):])
+    return None
+
 class JDService:
+    def __init__(self):
+        # Objects told about committed writes (search index, caches, ...). Each may implement
+        # on_jd_saved(job_id, job_title, status, jd_content_json), on_jd_deleted(job_id)
+        # and on_jds_changed() for writes whose rows aren't known individually.
+        self._listeners = []
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, hook: str, *args) -> None:
+        with phase("listeners"):
+            for listener in self._listeners:
+                callback = getattr(listener, hook, None)
+                if callback is None:
+                    continue
+                try:
+                    callback(*args)
+                except Exception as e:
+                    # The write is already committed; a listener failure must not turn it into an error
+                    print(f"Error in JDService listener {type(listener).__name__}.{hook}: {e}")
+
+    def _notify_saved(self, db_jd: JDTable) -> None:
+        self._notify("on_jd_saved", db_jd.id, db_jd.job_title, db_jd.status.value, db_jd.jd_content_json)
+
     def create_jd(self, db: Session, jd_data: JDCreateRequest) -> JDTable:
         # Convert Pydantic model to JSON string for storage
-        jd_content_json_str = jd_data.jd_content.model_dump_json()
+        with phase("serialize"):
+            jd_content_json_str = jd_data.jd_content.model_dump_json()
+            search_text = extract_search_text(jd_content_json_str)
 
         db_jd = JDTable(
             job_title=jd_data.job_title, # Using the explicit job_title from request
             jd_content_json=jd_content_json_str,
+            search_text=search_text,
             created_at=datetime.utcnow(),
             expires_at=jd_data.expires_at,
             status=JobStatus.ACTIVE # Default status
         )
         db.add(db_jd)
+        db.flush()
+        # Mirror the qualifications into jd_skills in the same transaction
+        replace_skills(db, [(db_jd.id, jd_content_json_str)], existing=False)
         db.commit()
         db.refresh(db_jd)
+        self._notify_saved(db_jd)
         return db_jd
 
+    def create_jds(self, db: Session, jd_list: list[JDCreateRequest]) -> list[int]:
+        # Several JDs in a single transaction; either all of them are stored or none
+        db_jds = []
+        for jd_data in jd_list:
+            jd_content_json_str = jd_data.jd_content.model_dump_json()
+            db_jds.append(JDTable(
+                job_title=jd_data.job_title,
+                jd_content_json=jd_content_json_str,
+                search_text=extract_search_text(jd_content_json_str),
+                created_at=datetime.utcnow(),
+                expires_at=jd_data.expires_at,
+                status=JobStatus.ACTIVE
+            ))
+        db.add_all(db_jds)
+        db.flush()
+        # Read the values before commit() expires the objects (avoids one SELECT per row)
+        saved = [(db_jd.id, db_jd.job_title, db_jd.jd_content_json) for db_jd in db_jds]
+        replace_skills(db, [(job_id, content_json) for job_id, _, content_json in saved], existing=False)
+        db.commit()
+        for job_id, job_title, jd_content_json in saved:
+            self._notify("on_jd_saved", job_id, job_title, JobStatus.ACTIVE.value, jd_content_json)
+        return [job_id for job_id, _, _ in saved]
+
+    def bulk_insert_jds(self, db: Session, jd_list: list[JDCreateRequest], return_ids: bool = True) -> list[int]:
+        """
+        One executemany-style INSERT for the whole list, committed once.
+        Ids come back via INSERT ... RETURNING where the dialect supports it.
+        MySQL has no RETURNING, so when ids are requested there we fall back to
+        an ORM flush (still one transaction); pass return_ids=False to keep the
+        single multi-row INSERT.
+        """
+        if not jd_list:
+            return []
+        # One created_at for the whole chunk, at the column's precision (DATETIME keeps
+        # whole seconds on MySQL) so the return_ids=False path can match it back
+        now = datetime.utcnow().replace(microsecond=0)
+        rows = []
+        for jd_data in jd_list:
+            jd_content_json_str = jd_data.jd_content.model_dump_json()
+            rows.append({
+                "job_title": jd_data.job_title,
+                "jd_content_json": jd_content_json_str,
+                "search_text": extract_search_text(jd_content_json_str),
+                "created_at": now,
+                "expires_at": jd_data.expires_at,
+                "status": JobStatus.ACTIVE,
+            })
+        dialect = db.get_bind().dialect
+        if not return_ids:
+            last_id = db.execute(select(func.max(JDTable.id))).scalar() or 0
+            db.execute(insert(JDTable), rows)
+            # Without ids, this statement's rows are read back inside the same transaction:
+            # past the previous max id, with the chunk's created_at and not yet indexed
+            # (other writers' committed rows already are). Older unindexed rows are left
+            # to `manage.py backfill-skills`.
+            inserted = db.execute(
+                select(JDTable.id, JDTable.jd_content_json)
+                .where(JDTable.id > last_id, JDTable.created_at == now, JDTable.skills_indexed.is_(False))
+            ).all()
+            replace_skills(db, [(row.id, row.jd_content_json) for row in inserted], existing=False)
+            db.commit()
+            self._notify("on_jds_changed")
+            return []
+        if getattr(dialect, "insert_executemany_returning", False):
+            result = db.execute(
+                insert(JDTable).returning(JDTable.id, sort_by_parameter_order=True), rows
+            )
+            created_ids = list(result.scalars())
+            replace_skills(db, [(job_id, row["jd_content_json"]) for job_id, row in zip(created_ids, rows)],
+                           existing=False)
+            db.commit()
+            for job_id, row in zip(created_ids, rows):
+                self._notify("on_jd_saved", job_id, row["job_title"], JobStatus.ACTIVE.value, row["jd_content_json"])
+            return created_ids
+        return self.create_jds(db, jd_list)
+
     def get_jd_by_id(self, db: Session, job_id: int) -> JDTable | None:
         return db.query(JDTable).filter(JDTable.id == job_id).first()
 
+    def get_jd_version(self, db: Session, job_id: int) -> int | None:
+        # Cheap revalidation: reads one integer, never the JSON payload
+        return db.execute(select(JDTable.version).where(JDTable.id == job_id)).scalar()
+
     def get_all_jds_summary(self, db: Session, skip: int = 0, limit: int = 100):
         return db.query(JDTable.id, JDTable.job_title).offset(skip).limit(limit).all()
 
-    def update_jd(self, db: Session, job_id: int, update_data: JDUpdateRequest) -> JDTable | None:
+    @staticmethod
+    def apply_filters(stmt, status: str | None = None, title_prefix: str | None = None,
+                      expires_after: datetime | None = None, expires_before: datetime | None = None):
+        # Shared WHERE clauses for the list and export endpoints
+        if status is not None:
+            stmt = stmt.where(JDTable.status == JobStatus(status))
+        if title_prefix:
+            stmt = stmt.where(JDTable.job_title.startswith(title_prefix, autoescape=True))
+        if expires_after is not None:
+            stmt = stmt.where(JDTable.expires_at >= expires_after)
+        if expires_before is not None:
+            stmt = stmt.where(JDTable.expires_at < expires_before)
+        return stmt
+
+    def iter_jds_for_export(self, db: Session, batch_size: int = 500, **filters):
+        """
+        Yields raw rows (no ORM objects, no Pydantic) for every matching JD.
+        yield_per turns on stream_results, i.e. a server-side cursor on MySQL,
+        so memory stays flat regardless of table size.
+        """
+        stmt = select(
+            JDTable.id, JDTable.job_title, JDTable.status,
+            JDTable.created_at, JDTable.expires_at, JDTable.jd_content_json,
+        ).order_by(JDTable.id)
+        stmt = self.apply_filters(stmt, **filters).execution_options(yield_per=batch_size)
+        yield from db.execute(stmt)
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, job_id: int) -> str:
+        raw = json.dumps([created_at.isoformat(), job_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        # Raises ValueError for anything that isn't a cursor we issued
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, job_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return datetime.fromisoformat(created_at), int(job_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def get_jds_page(self, db: Session, limit: int = 100, cursor: str | None = None, **filters):
+        """
+        Keyset pagination over (created_at, id), newest first. Returns
+        (rows, next_cursor); next_cursor is None on the last page. Unlike
+        OFFSET, each page costs the same however deep into the table it is.
+        """
+        stmt = select(JDTable.id, JDTable.job_title, JDTable.created_at, JDTable.version)
+        stmt = self.apply_filters(stmt, **filters)
+        if cursor:
+            after_created_at, after_id = self.decode_cursor(cursor)
+            stmt = stmt.where(or_(
+                JDTable.created_at < after_created_at,
+                and_(JDTable.created_at == after_created_at, JDTable.id < after_id),
+            ))
+        stmt = stmt.order_by(JDTable.created_at.desc(), JDTable.id.desc()).limit(limit + 1)
+        rows = db.execute(stmt).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    def update_jd(self, db: Session, job_id: int, update_data: JDUpdateRequest,
+                  expected_version: int | None = None) -> JDTable | None:
+        """
+        Raises JDVersionConflictError when expected_version is given and the
+        row is at another version, or when a concurrent write wins the race.
+        """
         db_jd = self.get_jd_by_id(db, job_id)
         if db_jd:
+            if expected_version is not None and db_jd.version != expected_version:
+                raise JDVersionConflictError(job_id, db_jd.version)
             if update_data.job_title is not None:
                 setattr(db_jd, "job_title", update_data.job_title)
             if update_data.jd_content is not None:
-                setattr(db_jd, "jd_content_json", update_data.jd_content.model_dump_json())
+                with phase("serialize"):
+                    jd_content_json_str = update_data.jd_content.model_dump_json()
+                    search_text = extract_search_text(jd_content_json_str)
+                setattr(db_jd, "jd_content_json", jd_content_json_str)
+                setattr(db_jd, "search_text", search_text)
+                replace_skills(db, [(job_id, jd_content_json_str)])
             if update_data.expires_at is not None:  # Allows setting to None too
                 setattr(db_jd, "expires_at", update_data.expires_at)
             if update_data.status is not None:
-                setattr(db_jd, "status", update_data.status)
+                # The column stores the enum, so map 'active'/'inactive' to JobStatus
+                setattr(db_jd, "status", JobStatus(update_data.status))
 
-            db.commit()
+            try:
+                db.commit()
+            except StaleDataError:
+                db.rollback()
+                raise JDVersionConflictError(job_id, self.get_jd_version(db, job_id))
             db.refresh(db_jd)
+            self._notify_saved(db_jd)
         return db_jd
 
-    def delete_jd(self, db: Session, job_id: int) -> bool:
-        db_jd = self.get_jd_by_id(db, job_id)
-        if db_jd:
-            db.delete(db_jd)
-            db.commit()
-            return True
-        return False
+    # Columns a PATCH hands back to the caller (everything the response needs)
+    _PATCH_RETURNING = (JDTable.id, JDTable.job_title, JDTable.jd_content_json, JDTable.created_at,
+                        JDTable.expires_at, JDTable.status, JDTable.version)
+
+    @staticmethod
+    def _json_literal(dialect_name: str, value):
+        # A JSON value (not a JSON-encoded string) for json_set()
+        value_json = json.dumps(value)
+        if dialect_name == "mysql":
+            return cast(value_json, JSON)
+        return func.json(value_json)
+
+    def patch_jd(self, db: Session, job_id: int, patch: JDPatchRequest, expected_version: int | None = None):
+        """
+        Applies a partial update in a single UPDATE statement, without reading
+        the row first: scalar columns are assigned, jd_content fields are merged
+        into the stored JSON with json_set(), and version is bumped. The new row
+        comes back through RETURNING, or one SELECT on dialects without it
+        (MySQL). Returns that row, or None if the JD doesn't exist; raises
+        JDVersionConflictError when expected_version doesn't match.
+        """
+        dialect = db.get_bind().dialect
+        values = {"version": JDTable.version + 1}
+        if patch.job_title is not None:
+            values["job_title"] = patch.job_title
+        if "expires_at" in patch.model_fields_set:
+            values["expires_at"] = patch.expires_at
+        if patch.status is not None:
+            values["status"] = JobStatus(patch.status)
+        content_changes = patch.jd_content.model_dump(exclude_unset=True) if patch.jd_content else {}
+        if content_changes:
+            merged = JDTable.jd_content_json
+            for field, value in content_changes.items():
+                merged = func.json_set(merged, f"$.{field}", self._json_literal(dialect.name, value))
+            values["jd_content_json"] = merged
+
+        stmt = update(JDTable).where(JDTable.id == job_id).values(**values)
+        if expected_version is not None:
+            stmt = stmt.where(JDTable.version == expected_version)
+        stmt = stmt.execution_options(synchronize_session=False)
+
+        if getattr(dialect, "update_returning", False):
+            row = db.execute(stmt.returning(*self._PATCH_RETURNING)).first()
+        else:
+            result = db.execute(stmt)
+            row = None
+            if result.rowcount:
+                row = db.execute(select(*self._PATCH_RETURNING).where(JDTable.id == job_id)).first()
+        if row is None:
+            db.rollback()
+            current_version = self.get_jd_version(db, job_id)
+            if current_version is None:
+                return None
+            raise JDVersionConflictError(job_id, current_version)
+
+        if content_changes:
+            # Derived data follows the merged content in the same transaction
+            db.execute(update(JDTable).where(JDTable.id == job_id)
+                       .values(search_text=extract_search_text(row.jd_content_json))
+                       .execution_options(synchronize_session=False))
+            replace_skills(db, [(job_id, row.jd_content_json)])
+        db.commit()
+        self._notify("on_jd_saved", row.id, row.job_title, row.status.value, row.jd_content_json)
+        return row
+
+    def expire_due_jds(self, db: Session, now: datetime, batch_size: int = 500) -> int:
+        """
+        Flips up to batch_size ACTIVE JDs whose expires_at has passed to
+        INACTIVE, in one transaction. Driven by the (status, expires_at) index.
+        The UPDATE re-checks the status, so running it twice (or from two
+        processes) never double-counts. Listeners hear about the rows this
+        call actually flipped: they come back through UPDATE ... RETURNING,
+        or, on dialects without it (MySQL), the candidates are locked with
+        SELECT ... FOR UPDATE so the UPDATE flips exactly those. Returns the
+        number of rows changed.
+        """
+        update_returning = getattr(db.get_bind().dialect, "update_returning", False)
+        candidates = (
+            select(JDTable.id, JDTable.job_title, JDTable.jd_content_json)
+            .where(JDTable.status == JobStatus.ACTIVE, JDTable.expires_at <= now)
+            .order_by(JDTable.expires_at)
+            .limit(batch_size)
+        )
+        if not update_returning:
+            candidates = candidates.with_for_update()
+        rows = db.execute(candidates).all()
+        if not rows:
+            return 0
+        stmt = (
+            update(JDTable)
+            .where(JDTable.id.in_([row.id for row in rows]), JDTable.status == JobStatus.ACTIVE)
+            .values(status=JobStatus.INACTIVE, version=JDTable.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if update_returning:
+            flipped = set(db.execute(stmt.returning(JDTable.id)).scalars())
+        else:
+            db.execute(stmt)
+            flipped = {row.id for row in rows}
+        db.commit()
+        for row in rows:
+            if row.id in flipped:
+                self._notify("on_jd_saved", row.id, row.job_title, JobStatus.INACTIVE.value, row.jd_content_json)
+        return len(flipped)
+
+    def delete_jd(self, db: Session, job_id: int, expected_version: int | None = None) -> bool:
+        """
+        One DELETE, no prior SELECT; the rowcount tells whether the JD existed
+        (and, with expected_version, whether it was still at that version).
+        """
+        stmt = delete(JDTable).where(JDTable.id == job_id)
+        if expected_version is not None:
+            stmt = stmt.where(JDTable.version == expected_version)
+        result = db.execute(stmt.execution_options(synchronize_session=False))
+        if not result.rowcount:
+            db.rollback()
+            if expected_version is not None:
+                current_version = self.get_jd_version(db, job_id)
+                if current_version is not None:
+                    raise JDVersionConflictError(job_id, current_version)
+            return False
+        if db.get_bind().dialect.name != "mysql":
+            # MySQL applies the ON DELETE CASCADE; SQLite only does with PRAGMA foreign_keys=ON
+            db.execute(delete(JDSkillTable).where(JDSkillTable.job_id == job_id))
+        db.commit()
+        self._notify("on_jd_deleted", job_id)
+        return True
 
     # Helper to parse the JSON content back to Pydantic model for responses
     def parse_jd_content(self, jd_content_json: str) -> JobDescriptionContent:
-        return JobDescriptionContent.model_validate_json(jd_content_json)
\ No newline at end of file
+        with phase("parse"):
+            return JobDescriptionContent.model_validate_json(jd_content_json)
+
+    def render_jd_json(self, db_jd, strict: bool = False) -> bytes:
+        """
+        The JDResponse body for a row, built by splicing the stored
+        jd_content_json into the envelope. The content was validated when it
+        was written, so the default path never parses it; strict=True
+        re-validates it (and normalizes it through JobDescriptionContent)
+        first. Dates use the same HTTP-date format as Flask's jsonify.
+        """
+        jd_content_json = db_jd.jd_content_json
+        if strict:
+            jd_content_json = self.parse_jd_content(jd_content_json).model_dump_json()
+        expires_at = db_jd.expires_at
+        with phase("serialize"):
+            return (
+                '{"created_at":' + json.dumps(http_date(db_jd.created_at))
+                + ',"expires_at":' + (json.dumps(http_date(expires_at)) if expires_at is not None else "null")
+                + ',"id":' + str(db_jd.id)
+                + ',"jd_content":' + jd_content_json
+                + ',"job_title":' + json.dumps(db_jd.job_title)
+                + ',"status":' + json.dumps(db_jd.status.value)
+                + "}\n"
+            ).encode("utf-8")
\ No newline at end of file
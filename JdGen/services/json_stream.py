@@ -0,0 +1,72 @@
+# ai_hr_jd_project/services/json_stream.py
+import json
+from typing import Any, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """
+    Incremental parser for a single top-level JSON object that arrives in chunks
+    (e.g. a streamed Gemini response). feed() returns every top-level member
+    whose value became complete with that chunk, as (key, value) pairs, so
+    callers can act on "role_summary" long before "benefits" has been written.
+
+    Only the top level is tracked: a member is complete once the scanner sees
+    the ',' or '}' that ends it outside of any string or nested container.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0             # next character to scan
+        self._depth = 0           # container depth; the top-level object is depth 1
+        self._in_string = False
+        self._escape = False
+        self._member_start = None # index just after the '{' or ',' that opened the current member
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> list[Tuple[str, Any]]:
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = i + 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    completed.extend(self._close_member(i))
+                    self.done = True
+                    self._depth = 0
+                    i += 1
+                    break
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._close_member(i))
+                self._member_start = i + 1
+            i += 1
+        self._pos = i
+        return completed
+
+    def _close_member(self, end: int) -> list[Tuple[str, Any]]:
+        member = self._text[self._member_start:end].strip()
+        if not member:
+            return []
+        # Let the json module do the real parsing of "key": value
+        return list(json.loads("{" + member + "}").items())
@@ -0,0 +1,410 @@
+# ai_hr_jd_project/services/llm_providers.py
+# Backends that GeminiService can generate through. All of them expose the
+# call shape of GeminiGateway / client.models: generate_content(**kwargs) and
+# generate_content_stream(**kwargs), returning objects with a `.text` (and
+# `.candidates[0].content.parts[0].text`), plus stats(). agenerate_content and
+# agenerate_content_stream are the asyncio versions used by async_app.py.
+#
+#   gemini  the live API through the shared GeminiGateway
+#   record  live API, and every prompt/response pair is saved to LLM_RECORDINGS_DIR
+#   replay  serves the recorded responses, with optional latency; no network, no quota
+#   stub    canned, deterministic JDs built from the prompt; no recordings needed
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+from config import Config
+from services import metrics
+
+PROVIDERS = ("gemini", "record", "replay", "stub")
+
+
+class ReplayMissError(LookupError):
+    """The replay backend has no recording for this request."""
+
+
+@dataclass(frozen=True)
+class LLMRequest:
+    model: str
+    contents: str
+    system_instruction: Optional[str] = None
+    response_schema: Optional[str] = None # name of the Pydantic model the JSON must match
+
+    @classmethod
+    def from_call(cls, model=None, contents=None, config=None, **kwargs) -> "LLMRequest":
+        config = config or {}
+        schema = config.get("response_schema")
+        return cls(
+            model=model or "",
+            contents=contents if isinstance(contents, str) else json.dumps(contents, default=str),
+            system_instruction=config.get("system_instruction"),
+            response_schema=getattr(schema, "__name__", None) if schema is not None else None,
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the request, used as the recording's file name."""
+        canonical = json.dumps([self.model, self.system_instruction, self.response_schema, self.contents])
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def text_response(text: str):
+    """A minimal stand-in for a GenerateContentResponse carrying `text`."""
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(text=text, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+                           usage_metadata=None, prompt_feedback=None)
+
+
+def response_text(response) -> Optional[str]:
+    text = getattr(response, "text", None)
+    if text:
+        return text
+    try:
+        return response.candidates[0].content.parts[0].text
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+def split_chunks(text: str, chunk_count: int) -> list[str]:
+    step = max(1, -(-len(text) // max(1, chunk_count)))
+    return [text[start:start + step] for start in range(0, len(text), step)]
+
+
+class RecordingStore:
+    """One JSON file per request key: {"request": {...}, "response_text": ..., "recorded_at": ...}."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, request: LLMRequest) -> Optional[str]:
+        try:
+            with open(self._path(request.key), encoding="utf-8") as f:
+                return json.load(f)["response_text"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, request: LLMRequest, text: str) -> None:
+        record = {
+            "request": {
+                "model": request.model,
+                "system_instruction": request.system_instruction,
+                "response_schema": request.response_schema,
+                "contents": request.contents,
+            },
+            "response_text": text,
+            "recorded_at": datetime.utcnow().isoformat() + "Z",
+        }
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a concurrent replay never reads half a file
+            tmp_path = self._path(request.key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path(request.key))
+
+    def count(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+        except FileNotFoundError:
+            return 0
+
+
+class RecordingProvider:
+    """Passes calls to the live backend and saves each successful response."""
+
+    name = "record"
+
+    def __init__(self, inner, store: RecordingStore):
+        self.inner = inner
+        self.store = store
+        self.recorded = 0
+
+    def generate_content(self, **kwargs):
+        response = self.inner.generate_content(**kwargs)
+        text = response_text(response)
+        if text:
+            self.store.save(LLMRequest.from_call(**kwargs), text)
+            self.recorded += 1
+        return response
+
+    def generate_content_stream(self, **kwargs) -> Iterator:
+        chunks = []
+        for chunk in self.inner.generate_content_stream(**kwargs):
+            text = getattr(chunk, "text", None)
+            if text:
+                chunks.append(text)
+            yield chunk
+        # Only complete streams are recorded; replay re-chunks the full text
+        if chunks:
+            self.store.save(LLMRequest.from_call(**kwargs), "".join(chunks))
+            self.recorded += 1
+
+    async def agenerate_content(self, **kwargs):
+        response = await self.inner.agenerate_content(**kwargs)
+        text = response_text(response)
+        if text:
+            await asyncio.to_thread(self.store.save, LLMRequest.from_call(**kwargs), text)
+            self.recorded += 1
+        return response
+
+    async def agenerate_content_stream(self, **kwargs):
+        chunks = []
+        async for chunk in self.inner.agenerate_content_stream(**kwargs):
+            text = getattr(chunk, "text", None)
+            if text:
+                chunks.append(text)
+            yield chunk
+        if chunks:
+            await asyncio.to_thread(self.store.save, LLMRequest.from_call(**kwargs), "".join(chunks))
+            self.recorded += 1
+
+    def warm(self) -> None:
+        self.inner.warm()
+
+    def stats(self) -> dict:
+        return {**self.inner.stats(), "provider": self.name, "recorded": self.recorded,
+                "recordings_dir": self.store.directory}
+
+
+class _SimulatedLatency:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_delay(self) -> float:
+        if not self.latency_ms and not self.jitter_ms:
+            return 0.0
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+class StubProvider:
+    """Deterministic canned JDs derived from the prompt, for running the stack fully offline."""
+
+    name = "stub"
+    _TITLE_RE = re.compile(r"Job Title to be created:\s*(.+)")
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, seed: Optional[int] = None,
+                 stream_chunks: int = 8):
+        self.latency = _SimulatedLatency(latency_ms, jitter_ms, seed)
+        self.stream_chunks = stream_chunks
+        self.calls = 0
+
+    @classmethod
+    def canned_jd(cls, prompt: str) -> dict:
+        match = cls._TITLE_RE.search(prompt or "")
+        title = match.group(1).strip() if match else "Software Engineer"
+        return {
+            "job_title": title,
+            "company_summary": "A placeholder company used for offline runs.",
+            "role_summary": f"As a {title} you will design, build and run production services.",
+            "key_responsibilities": [f"Responsibility {i} for the {title} role." for i in range(8)],
+            "required_qualifications": ["Python", "SQL", "Cloud infrastructure", "Testing"],
+            "preferred_qualifications": ["Kubernetes", "Terraform"],
+            "benefits": ["Remote-friendly", "Learning budget", "Health insurance"],
+        }
+
+    def _text(self, kwargs) -> str:
+        self.calls += 1
+        return json.dumps(self.canned_jd(LLMRequest.from_call(**kwargs).contents))
+
+    def generate_content(self, **kwargs):
+        text = self._text(kwargs)
+        time.sleep(self.latency.next_delay())
+        return text_response(text)
+
+    def generate_content_stream(self, **kwargs) -> Iterator:
+        chunks = split_chunks(self._text(kwargs), self.stream_chunks)
+        delay = self.latency.next_delay() / len(chunks)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield text_response(chunk)
+
+    async def agenerate_content(self, **kwargs):
+        text = self._text(kwargs)
+        await asyncio.sleep(self.latency.next_delay())
+        return text_response(text)
+
+    async def agenerate_content_stream(self, **kwargs):
+        chunks = split_chunks(self._text(kwargs), self.stream_chunks)
+        delay = self.latency.next_delay() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield text_response(chunk)
+
+    def stats(self) -> dict:
+        return {"provider": self.name, "calls": self.calls}
+
+
+class ReplayProvider:
+    """
+    Serves recorded responses. A request without a recording raises
+    ReplayMissError, or falls back to StubProvider when on_miss="stub".
+    """
+
+    name = "replay"
+
+    def __init__(self, store: RecordingStore, latency_ms: float = 0, jitter_ms: float = 0,
+                 on_miss: str = "error", stream_chunks: int = 8, seed: Optional[int] = None):
+        self.store = store
+        self.latency = _SimulatedLatency(latency_ms, jitter_ms, seed)
+        self.on_miss = on_miss
+        self.stream_chunks = stream_chunks
+        self._fallback = StubProvider() if on_miss == "stub" else None
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, kwargs) -> str:
+        request = LLMRequest.from_call(**kwargs)
+        text = self.store.load(request)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        if self._fallback is not None:
+            return self._fallback._text(kwargs)
+        raise ReplayMissError(f"No recorded LLM response for request {request.key[:12]} in {self.store.directory}")
+
+    def generate_content(self, **kwargs):
+        text = self._lookup(kwargs)
+        time.sleep(self.latency.next_delay())
+        return text_response(text)
+
+    def generate_content_stream(self, **kwargs) -> Iterator:
+        chunks = split_chunks(self._lookup(kwargs), self.stream_chunks)
+        delay = self.latency.next_delay() / len(chunks)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield text_response(chunk)
+
+    async def agenerate_content(self, **kwargs):
+        text = await asyncio.to_thread(self._lookup, kwargs)
+        await asyncio.sleep(self.latency.next_delay())
+        return text_response(text)
+
+    async def agenerate_content_stream(self, **kwargs):
+        chunks = split_chunks(await asyncio.to_thread(self._lookup, kwargs), self.stream_chunks)
+        delay = self.latency.next_delay() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield text_response(chunk)
+
+    def stats(self) -> dict:
+        return {"provider": self.name, "hits": self.hits, "misses": self.misses, "on_miss": self.on_miss,
+                "recordings": self.store.count(), "recordings_dir": self.store.directory}
+
+
+class InstrumentedProvider:
+    """Records latency, failures and token usage of any provider (see services/metrics.py)."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = getattr(inner, "name", "gemini") # the GeminiGateway itself has no name
+
+    def generate_content(self, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.inner.generate_content(**kwargs)
+        except Exception as e:
+            metrics.record_llm_call(self.name, "generate", time.perf_counter() - started, error=e)
+            raise
+        metrics.record_llm_call(self.name, "generate", time.perf_counter() - started,
+                                usage=getattr(response, "usage_metadata", None))
+        return response
+
+    def generate_content_stream(self, **kwargs) -> Iterator:
+        started = time.perf_counter()
+        usage = None
+        error = None
+        try:
+            for chunk in self.inner.generate_content_stream(**kwargs):
+                # Each chunk's usage_metadata is cumulative, so the last one is the total
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        except BaseException as e: # includes GeneratorExit when the client disconnects mid-stream
+            error = e
+            raise
+        finally:
+            metrics.record_llm_call(self.name, "stream", time.perf_counter() - started, error=error, usage=usage)
+
+    async def agenerate_content(self, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.inner.agenerate_content(**kwargs)
+        except Exception as e:
+            metrics.record_llm_call(self.name, "generate", time.perf_counter() - started, error=e)
+            raise
+        metrics.record_llm_call(self.name, "generate", time.perf_counter() - started,
+                                usage=getattr(response, "usage_metadata", None))
+        return response
+
+    async def agenerate_content_stream(self, **kwargs):
+        started = time.perf_counter()
+        usage = None
+        error = None
+        try:
+            async for chunk in self.inner.agenerate_content_stream(**kwargs):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        except BaseException as e: # includes GeneratorExit / CancelledError when the client disconnects
+            error = e
+            raise
+        finally:
+            metrics.record_llm_call(self.name, "stream", time.perf_counter() - started, error=error, usage=usage)
+
+    def warm(self) -> None:
+        warm = getattr(self.inner, "warm", None) # only the live backends have a client to build
+        if warm is not None:
+            warm()
+
+    def stats(self) -> dict:
+        return self.inner.stats()
+
+
+def create_provider(name: Optional[str] = None):
+    name = (name or Config.LLM_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"LLM_PROVIDER must be one of {', '.join(PROVIDERS)}, got '{name}'")
+    if name == "stub":
+        return StubProvider(latency_ms=Config.LLM_REPLAY_LATENCY_MS, jitter_ms=Config.LLM_REPLAY_JITTER_MS)
+    store = RecordingStore(Config.LLM_RECORDINGS_DIR)
+    if name == "replay":
+        return ReplayProvider(store, latency_ms=Config.LLM_REPLAY_LATENCY_MS,
+                              jitter_ms=Config.LLM_REPLAY_JITTER_MS, on_miss=Config.LLM_REPLAY_ON_MISS)
+
+    from services.gemini_gateway import get_gateway # the live backends need google-genai and an API key
+    if not Config.GOOGLE_API_KEY:
+        raise ValueError("GOOGLE_API_KEY not configured.")
+    if name == "record":
+        return RecordingProvider(get_gateway(), store)
+    return get_gateway()
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Returns the process-wide provider selected by LLM_PROVIDER, creating it on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = InstrumentedProvider(create_provider())
+    return _provider
@@ -0,0 +1,176 @@
+# ai_hr_jd_project/services/metrics.py
+# Prometheus metrics. prometheus_client is optional: without it every record_*
+# function is a no-op and /metrics is not registered.
+#
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory before the
+# workers start; each worker then writes to its own mmap files and /metrics
+# aggregates them (see gunicorn.conf.py for the cleanup hook).
+import os
+import time
+
+from flask import Response, g, request
+from sqlalchemy import event
+
+from config import Config
+from database import connection, pool as db_pool
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+METRICS_AVAILABLE = prometheus_client is not None
+
+# Token counters on GenerateContentResponse.usage_metadata, by the label they are exported under
+_USAGE_FIELDS = {
+    "prompt": "prompt_token_count",
+    "candidates": "candidates_token_count",
+    "thoughts": "thoughts_token_count",
+    "cached": "cached_content_token_count",
+}
+
+if METRICS_AVAILABLE:
+    HTTP_REQUEST_DURATION = Histogram(
+        "jd_http_request_duration_seconds", "Time until the response headers were ready, by route.",
+        ["method", "route"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+    HTTP_REQUESTS = Counter(
+        "jd_http_requests_total", "Responses by route and status code.", ["method", "route", "status"],
+    )
+    DB_POOL_SIZE = Gauge("jd_db_pool_size", "Configured pool size.", multiprocess_mode="livesum")
+    DB_POOL_CHECKED_OUT = Gauge("jd_db_pool_checked_out", "Connections currently checked out.",
+                                multiprocess_mode="livesum")
+    DB_POOL_OVERFLOW = Gauge("jd_db_pool_overflow", "Connections open beyond pool_size.",
+                             multiprocess_mode="livesum")
+    DB_POOL_WAIT = Histogram(
+        "jd_db_pool_wait_seconds", "Time a checkout waited for a connection, including opening one.",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5, 30),
+    )
+    DB_POOL_TIMEOUTS = Counter("jd_db_pool_checkout_timeouts_total", "Checkouts that hit pool_timeout.")
+    LLM_CALL_DURATION = Histogram(
+        "jd_gemini_call_duration_seconds", "LLM call latency including retries; streams until the last chunk.",
+        ["provider", "mode"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+    )
+    LLM_FAILURES = Counter(
+        "jd_gemini_failures_total", "LLM calls that raised, by exception type.", ["provider", "mode", "reason"],
+    )
+    LLM_RETRIES = Counter("jd_gemini_retries_total", "Gemini calls retried after a transient error.", ["mode"])
+    LLM_TOKENS = Counter("jd_gemini_tokens_total", "Tokens reported in usage_metadata.", ["provider", "type"])
+    JSON_VALIDATION_FAILURES = Counter(
+        "jd_json_validation_failures_total", "Payloads rejected by schema validation.", ["source"],
+    )
+    PROMPT_TOKENS = Histogram(
+        "jd_prompt_estimated_tokens", "Locally estimated input tokens per generation prompt (instructions included).",
+        buckets=(100, 200, 400, 600, 800, 1000, 1500, 2000, 3000, 5000, 8000),
+    )
+    PROMPT_ITEMS_DROPPED = Counter(
+        "jd_prompt_items_dropped_total", "Input list items left out of prompts, by reason.", ["reason"],
+    )
+
+
+def record_http_request(method: str, route: str, status: int, seconds: float) -> None:
+    if METRICS_AVAILABLE and Config.METRICS_ENABLED:
+        HTTP_REQUEST_DURATION.labels(method, route).observe(seconds)
+        HTTP_REQUESTS.labels(method, route, str(status)).inc()
+
+
+def record_llm_call(provider: str, mode: str, seconds: float, error: BaseException | None = None,
+                    usage=None) -> None:
+    if not METRICS_AVAILABLE:
+        return
+    LLM_CALL_DURATION.labels(provider, mode).observe(seconds)
+    if error is not None:
+        LLM_FAILURES.labels(provider, mode, type(error).__name__).inc()
+    if usage is not None:
+        for label, field in _USAGE_FIELDS.items():
+            count = getattr(usage, field, None)
+            if count:
+                LLM_TOKENS.labels(provider, label).inc(count)
+
+
+def record_llm_retry(mode: str) -> None:
+    if METRICS_AVAILABLE:
+        LLM_RETRIES.labels(mode).inc()
+
+
+def record_validation_failure(source: str) -> None:
+    """source: "request" for API bodies, "gemini" for model output that didn't match the schema."""
+    if METRICS_AVAILABLE:
+        JSON_VALIDATION_FAILURES.labels(source).inc()
+
+
+def record_prompt(estimated_tokens: int, dropped: dict) -> None:
+    """dropped: items left out per reason ("duplicate", "max_items", "budget")."""
+    if not METRICS_AVAILABLE:
+        return
+    PROMPT_TOKENS.observe(estimated_tokens)
+    for reason, count in dropped.items():
+        if count:
+            PROMPT_ITEMS_DROPPED.labels(reason).inc(count)
+
+
+def _record_pool_wait(seconds: float, timed_out: bool) -> None:
+    DB_POOL_WAIT.observe(seconds)
+    if timed_out:
+        DB_POOL_TIMEOUTS.inc()
+
+
+def bind_engine(engine) -> None:
+    """Keeps the pool gauges current from checkout/checkin events (they survive engine.dispose())."""
+    if not METRICS_AVAILABLE or engine is None or not hasattr(engine.pool, "overflow"):
+        return
+
+    def on_checkout(*args):
+        DB_POOL_CHECKED_OUT.inc()
+        DB_POOL_SIZE.set(engine.pool.size())
+        DB_POOL_OVERFLOW.set(max(0, engine.pool.overflow())) # as of the latest checkout
+
+    def on_checkin(*args):
+        # Fires before the pool takes the connection back, so its own counters are one behind
+        DB_POOL_CHECKED_OUT.dec()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    db_pool.add_wait_observer(_record_pool_wait)
+    DB_POOL_SIZE.set(engine.pool.size())
+
+
+def render_latest() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry)
+
+
+def install_metrics(app) -> bool:
+    """Times every request and serves /metrics. Returns False when disabled or unavailable."""
+    if not Config.METRICS_ENABLED:
+        return False
+    if not METRICS_AVAILABLE:
+        print("METRICS_ENABLED is set but prometheus_client is not installed; /metrics is disabled.")
+        return False
+    connection.add_engine_listener(bind_engine) # now, or whenever the database is first used
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            # The URL rule, not the path, so /api/jd/<int:job_id> is one series rather than one per id
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            record_http_request(request.method, route, response.status_code, time.perf_counter() - started)
+        return response
+
+    @app.route(Config.METRICS_PATH, methods=['GET'])
+    def metrics_endpoint():
+        return Response(render_latest(), content_type=CONTENT_TYPE_LATEST)
+
+    return True
@@ -0,0 +1,155 @@
+# ai_hr_jd_project/services/profiling.py
+import cProfile
+import hmac
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from flask import g
+
+from config import Config
+
+BACKENDS = ("cprofile", "pyinstrument")
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of individual requests, saved to `directory` for offline
+    analysis: cProfile .prof files (pstats, snakeviz) or pyinstrument .html.
+
+    A request is profiled when it carries `X-Profile: <token>`, or when it is
+    sampled: `sample_rate` permanently, or a temporary rate set with arm()
+    (POST /api/jd/admin/profiling). Only one request is profiled at a time,
+    which bounds the overhead and keeps concurrent profilers from clashing.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 0.0, token: Optional[str] = None,
+                 backend: str = "cprofile", max_profiles: int = 200):
+        if backend not in BACKENDS:
+            raise ValueError(f"PROFILER must be one of {', '.join(BACKENDS)}, got '{backend}'")
+        if backend == "pyinstrument":
+            try:
+                import pyinstrument # optional dependency
+            except ImportError:
+                print("pyinstrument is not installed; profiling with cProfile instead.")
+                backend = "cprofile"
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        self.backend = backend
+        self.max_profiles = max_profiles
+        self._slot = threading.Lock()
+        self._armed_rate = 0.0
+        self._armed_until = 0.0
+        self.saved = 0
+
+    @classmethod
+    def from_config(cls) -> Optional["RequestProfiler"]:
+        if not Config.PROFILING_ENABLED:
+            return None
+        return cls(
+            directory=Config.PROFILING_DIR,
+            sample_rate=Config.PROFILING_SAMPLE_RATE,
+            token=Config.PROFILING_TOKEN,
+            backend=Config.PROFILER,
+            max_profiles=Config.PROFILING_MAX_FILES,
+        )
+
+    def is_authorized(self, token: Optional[str]) -> bool:
+        return bool(self.token and token and hmac.compare_digest(self.token, token))
+
+    def arm(self, sample_rate: float, duration_seconds: float) -> None:
+        """Samples `sample_rate` of requests for the next `duration_seconds`."""
+        self._armed_rate = sample_rate
+        self._armed_until = time.monotonic() + duration_seconds
+
+    def current_sample_rate(self) -> float:
+        if time.monotonic() < self._armed_until:
+            return max(self.sample_rate, self._armed_rate)
+        return self.sample_rate
+
+    def maybe_start(self, request) -> None:
+        requested = self.is_authorized(request.headers.get("X-Profile"))
+        if not requested:
+            rate = self.current_sample_rate()
+            if rate <= 0 or random.random() >= rate:
+                return
+        if not self._slot.acquire(blocking=False):
+            return # another request is being profiled
+        if self.backend == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.active_profiler = profiler
+
+    def _halt(self):
+        profiler = g.pop("active_profiler", None)
+        if profiler is None:
+            return None
+        try:
+            if self.backend == "pyinstrument":
+                profiler.stop()
+            else:
+                profiler.disable()
+        finally:
+            self._slot.release()
+        return profiler
+
+    def stop(self, request, response, seconds: float) -> Optional[str]:
+        """Stops the request's profiler, if any, and returns the saved file's name."""
+        profiler = self._halt()
+        if profiler is None:
+            return None
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        name = (f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{request.method}-{slug}-"
+                f"{response.status_code}-{int(seconds * 1000)}ms")
+        os.makedirs(self.directory, exist_ok=True)
+        if self.backend == "pyinstrument":
+            name += ".html"
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            name += ".prof"
+            profiler.dump_stats(os.path.join(self.directory, name))
+        self.saved += 1
+        self._prune()
+        return name
+
+    def abandon(self) -> None:
+        """Stops a profiler left running by a request that never reached stop()."""
+        self._halt()
+
+    def list_profiles(self, limit: int = 50) -> list[dict]:
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.is_file() and e.name.endswith((".prof", ".html"))]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda e: e.name, reverse=True) # names start with the UTC time
+        return [{"name": e.name, "bytes": e.stat().st_size} for e in entries[:limit]]
+
+    def _prune(self) -> None:
+        for entry in self.list_profiles(limit=10**6)[self.max_profiles:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "directory": self.directory,
+            "sample_rate": self.sample_rate,
+            "current_sample_rate": self.current_sample_rate(),
+            "armed_seconds_left": round(max(0.0, self._armed_until - time.monotonic()), 1),
+            "header_trigger": bool(self.token),
+            "saved": self.saved,
+            "profiles": self.list_profiles(limit=20),
+        }
@@ -0,0 +1,185 @@
+# ai_hr_jd_project/services/prompt_compiler.py
+# Turns a JDGenerateRequest into the Gemini request's system_instruction and
+# contents, within an input token budget.
+#
+# The instructions are the same for every call, so they are one constant
+# system_instruction block: identical leading bytes on every request, which is
+# what Gemini's implicit prefix caching matches on. The output shape is left to
+# response_schema instead of being spelled out again as a JSON skeleton. The
+# user's lists are cleaned (whitespace, blanks, duplicates), capped, and trimmed
+# from the end until the estimated prompt fits PROMPT_MAX_INPUT_TOKENS.
+import threading
+from dataclasses import dataclass
+
+from config import Config
+from schemas.jd_schemas import JDGenerateRequest
+from services import metrics
+
+SYSTEM_INSTRUCTION = """You are an expert HR recruitment specialist and a master copywriter.
+Write a comprehensive and engaging job description from the details in the user message.
+Reply with a single JSON object matching the response schema:
+- job_title: the final title; keep the given one or refine it.
+- company_summary: summarize the company description, or write a generic placeholder if none is given.
+- key_responsibilities, required_qualifications: build on the given lists.
+- preferred_qualifications, benefits: add sensible defaults when not given, or omit them."""
+
+CHARS_PER_TOKEN = 4 # Gemini's rule of thumb for English text
+MAX_TITLE_CHARS = 200
+DROP_REASONS = ("duplicate", "max_items", "budget")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count, without a tokenizer or a count_tokens round trip."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 3:
+        return ""
+    # Cut at a word boundary where there is one
+    return text[:max_chars - 3].rsplit(" ", 1)[0].rstrip(" ,;:") + "..."
+
+
+def _clean_items(items, max_items: int, max_chars: int, dropped: dict) -> list[str]:
+    # Same whitespace handling as the generation cache key, plus de-duplication
+    # ("Python" and "python." are one skill as far as the model is concerned)
+    cleaned = []
+    seen = set()
+    for item in items or []:
+        line = " ".join(str(item).split())
+        if not line:
+            continue
+        key = line.casefold().rstrip(".")
+        if key in seen:
+            dropped["duplicate"] += 1
+            continue
+        seen.add(key)
+        cleaned.append(_clip(line, max_chars))
+    if len(cleaned) > max_items:
+        dropped["max_items"] += len(cleaned) - max_items
+        del cleaned[max_items:]
+    return cleaned
+
+
+def _render(title: str, responsibilities: list[str], skills: list[str], description: str) -> str:
+    lines = [f"Job Title to be created: {title}", "Key Responsibilities:"]
+    lines.extend(f"- {item}" for item in responsibilities)
+    lines.append("Required Skills/Qualifications:")
+    lines.extend(f"- {item}" for item in skills)
+    lines.append(f"Company Description: {description or 'Not provided.'}")
+    return "\n".join(lines)
+
+
+def _list_tokens(items: list[str]) -> int:
+    return sum(estimate_tokens(item) for item in items)
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    system_instruction: str
+    contents: str
+    estimated_tokens: int # instructions + contents; the response schema is not counted
+    dropped: dict # items left out, by reason
+    description_clipped: bool = False
+
+
+class PromptCompiler:
+    """
+    Builds generation prompts and keeps per-process prompt size statistics
+    (also exported as jd_prompt_* metrics). The budget is best effort: at
+    least one item of each list is kept, so a single huge request can still
+    exceed it after every trim.
+    """
+
+    def __init__(self, max_input_tokens: int = 2000, max_list_items: int = 30,
+                 max_item_chars: int = 300, max_description_chars: int = 2000):
+        self.max_input_tokens = max_input_tokens
+        self.max_list_items = max_list_items
+        self.max_item_chars = max_item_chars
+        self.max_description_chars = max_description_chars
+        self.system_instruction = SYSTEM_INSTRUCTION
+        self.instruction_tokens = estimate_tokens(SYSTEM_INSTRUCTION)
+        self._lock = threading.Lock()
+        self.compiled = 0
+        self.total_tokens = 0
+        self.largest_tokens = 0
+        self.over_budget = 0
+        self.dropped = dict.fromkeys(DROP_REASONS, 0)
+
+    @classmethod
+    def from_config(cls) -> "PromptCompiler":
+        return cls(
+            max_input_tokens=Config.PROMPT_MAX_INPUT_TOKENS,
+            max_list_items=Config.PROMPT_MAX_LIST_ITEMS,
+            max_item_chars=Config.PROMPT_MAX_ITEM_CHARS,
+            max_description_chars=Config.PROMPT_MAX_DESCRIPTION_CHARS,
+        )
+
+    def compile(self, jd_input: JDGenerateRequest) -> CompiledPrompt:
+        dropped = dict.fromkeys(DROP_REASONS, 0)
+        title = _clip(" ".join(jd_input.job_title_input.split()), MAX_TITLE_CHARS)
+        responsibilities = _clean_items(jd_input.key_responsibilities_input, self.max_list_items,
+                                        self.max_item_chars, dropped)
+        skills = _clean_items(jd_input.required_skills_input, self.max_list_items, self.max_item_chars, dropped)
+        description = _clip(" ".join((jd_input.company_description_input or "").split()),
+                            self.max_description_chars)
+        contents = _render(title, responsibilities, skills, description)
+
+        budget = self.max_input_tokens - self.instruction_tokens
+        description_clipped = False
+        description_share = budget // 4 * CHARS_PER_TOKEN
+        if estimate_tokens(contents) > budget and len(description) > description_share:
+            # The lists carry more of the JD than the company blurb: shorten that first
+            description = _clip(description, description_share)
+            description_clipped = True
+            contents = _render(title, responsibilities, skills, description)
+
+        while estimate_tokens(contents) > budget and (len(responsibilities) > 1 or len(skills) > 1):
+            # Trim the longer list from the end; callers tend to list the important items first
+            longer = responsibilities if _list_tokens(responsibilities) >= _list_tokens(skills) else skills
+            if len(longer) == 1:
+                longer = skills if longer is responsibilities else responsibilities
+            longer.pop()
+            dropped["budget"] += 1
+            contents = _render(title, responsibilities, skills, description)
+
+        excess = estimate_tokens(contents) - budget
+        if excess > 0 and description:
+            description = _clip(description, len(description) - excess * CHARS_PER_TOKEN)
+            description_clipped = True
+            contents = _render(title, responsibilities, skills, description)
+
+        prompt = CompiledPrompt(
+            system_instruction=self.system_instruction,
+            contents=contents,
+            estimated_tokens=self.instruction_tokens + estimate_tokens(contents),
+            dropped=dropped,
+            description_clipped=description_clipped,
+        )
+        self._record(prompt)
+        return prompt
+
+    def _record(self, prompt: CompiledPrompt) -> None:
+        with self._lock:
+            self.compiled += 1
+            self.total_tokens += prompt.estimated_tokens
+            self.largest_tokens = max(self.largest_tokens, prompt.estimated_tokens)
+            if prompt.estimated_tokens > self.max_input_tokens:
+                self.over_budget += 1
+            for reason, count in prompt.dropped.items():
+                self.dropped[reason] += count
+        metrics.record_prompt(prompt.estimated_tokens, prompt.dropped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_input_tokens": self.max_input_tokens,
+                "instruction_tokens": self.instruction_tokens,
+                "compiled": self.compiled,
+                "mean_estimated_tokens": round(self.total_tokens / self.compiled, 1) if self.compiled else 0.0,
+                "largest_estimated_tokens": self.largest_tokens,
+                "over_budget": self.over_budget,
+                "items_dropped": dict(self.dropped),
+            }
@@ -0,0 +1,131 @@
+# ai_hr_jd_project/services/request_timing.py
+# Per-request phase timings. Code wraps its hot spots in `with phase("name"):`
+# and the totals go out in a Server-Timing header (visible in the browser's
+# network panel and to curl -v), plus a structured log line for slow requests.
+# SQL time is collected separately from engine events as the "db" phase.
+#
+# The phases live in a ContextVar, so the same calls work in Flask's worker
+# threads and in async_app.py's coroutines. Outside a request (background
+# threads, manage.py) phase() does nothing.
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from flask import g, request
+from sqlalchemy import event
+
+from config import Config
+from database import connection
+
+_request_phases: ContextVar[Optional[dict]] = ContextVar("request_phases", default=None)
+
+
+def begin_request() -> Token:
+    return _request_phases.set({})
+
+
+def end_request(token: Token) -> dict:
+    phases = _request_phases.get() or {}
+    _request_phases.reset(token)
+    return phases
+
+
+def current_phases() -> dict:
+    return _request_phases.get() or {}
+
+
+def record_phase(name: str, seconds: float) -> None:
+    phases = _request_phases.get()
+    if phases is not None:
+        total = phases.get(name)
+        phases[name] = (total[0] + seconds, total[1] + 1) if total else (seconds, 1)
+
+
+@contextmanager
+def phase(name: str):
+    if _request_phases.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def server_timing_header(phases: dict, total_seconds: float) -> str:
+    entries = [
+        f'{name};dur={seconds * 1000:.2f}' + (f';desc="{count}x"' if count > 1 else "")
+        for name, (seconds, count) in phases.items()
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def log_if_slow(method: str, route: str, status: int, phases: dict, total_seconds: float,
+                profile: Optional[str] = None) -> None:
+    if Config.REQUEST_LOG_SLOW_MS >= 0 and total_seconds * 1000 >= Config.REQUEST_LOG_SLOW_MS:
+        print(json.dumps({
+            "event": "request_timing",
+            "method": method,
+            "route": route,
+            "status": status,
+            "total_ms": round(total_seconds * 1000, 2),
+            "phases_ms": {name: round(seconds * 1000, 2) for name, (seconds, _) in phases.items()},
+            "profile": profile,
+        }))
+
+
+def bind_engine(engine) -> None:
+    """Adds the time spent in cursor.execute() to the current request's "db" phase."""
+    if engine is None:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if _request_phases.get() is not None:
+            conn.info.setdefault("timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("timing_started")
+        if started:
+            record_phase("db", time.perf_counter() - started.pop())
+
+
+def install_request_timing(app, profiler=None) -> None:
+    """Sets Server-Timing on every response, logs slow requests and drives the optional profiler."""
+    if not Config.SERVER_TIMING_ENABLED and profiler is None:
+        return
+    connection.add_engine_listener(bind_engine)
+
+    @app.before_request
+    def _start_request_timing():
+        g.timing_token = begin_request()
+        g.timing_started = time.perf_counter()
+        if profiler is not None:
+            profiler.maybe_start(request)
+
+    @app.after_request
+    def _finish_request_timing(response):
+        started = g.pop("timing_started", None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        phases = end_request(g.pop("timing_token"))
+        profile_path = profiler.stop(request, response, total) if profiler is not None else None
+        if profile_path:
+            response.headers["X-Profile-Saved"] = profile_path
+        if Config.SERVER_TIMING_ENABLED:
+            # For streamed responses this covers the work until the headers were sent
+            response.headers["Server-Timing"] = server_timing_header(phases, total)
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        log_if_slow(request.method, route, response.status_code, phases, total, profile_path)
+        return response
+
+    if profiler is not None:
+        @app.teardown_request
+        def _discard_unfinished_profile(exception=None):
+            profiler.abandon()
@@ -0,0 +1,260 @@
+# ai_hr_jd_project/services/response_cache.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from config import Config
+
+
+class RedisResponseTier:
+    """
+    Optional shared tier so replicas reuse each other's serialized responses.
+    Needs the `redis` package; entries carry their own TTL in Redis.
+    """
+
+    def __init__(self, url: str, prefix: str = "jd:response:"):
+        import redis # optional dependency, only needed when JD_RESPONSE_CACHE_REDIS_URL is set
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, job_id: int) -> Optional[Tuple[bytes, str]]:
+        value = self._client.get(f"{self.prefix}{job_id}")
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n") # stored as "<etag>\n<body>"
+        return body, etag.decode("ascii")
+
+    def get_etag(self, job_id: int) -> Optional[str]:
+        # Only the "<etag>\n" prefix, so validating a local copy doesn't transfer the body
+        head = self._client.getrange(f"{self.prefix}{job_id}", 0, 127)
+        if not head:
+            return None
+        return head.partition(b"\n")[0].decode("ascii")
+
+    def set(self, job_id: int, body: bytes, etag: str, ttl_seconds: float) -> None:
+        self._client.set(f"{self.prefix}{job_id}", etag.encode("ascii") + b"\n" + body,
+                         px=max(1, int(ttl_seconds * 1000)))
+
+    def delete(self, job_id: int) -> None:
+        self._client.delete(f"{self.prefix}{job_id}")
+
+
+class JDResponseCache:
+    """
+    Read-through cache of the fully serialized GET /api/jd/<id> body, so a hit
+    skips the query, the JSON parse, the Pydantic model and jsonify. The ETag
+    is kept next to the body so If-None-Match can be answered from here too.
+    Bounded by
+    entry count and total bytes (LRU). Registered as a JDService listener: any
+    save or delete of a JD drops its entry, which covers content, status and
+    expires_at changes. An entry never outlives the JD's expires_at.
+
+    Listeners only run in the process that made the write (for the expiry
+    sweeper, the replica holding its lease). With a shared tier, that write
+    deletes the shared entry, and other replicas check the shared ETag on
+    every local hit, so they notice at once. If that check fails (Redis
+    down), local copies are trusted for at most local_ttl_seconds. Without a
+    shared tier, other replicas can serve the old body and ETag, 304s
+    included, for up to ttl_seconds after a write.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_seconds: float = 300, shared_tier: Optional[RedisResponseTier] = None,
+                 enabled: bool = True, local_ttl_seconds: float = 30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds # caps in-process entries when a shared tier is set
+        self.shared_tier = shared_tier
+        self.enabled = enabled
+        self._entries: "OrderedDict[int, Tuple[float, bytes, str]]" = OrderedDict() # job_id -> (deadline, body, etag)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read that raced a write doesn't cache stale bytes
+        self._generation = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stale_drops = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls) -> "JDResponseCache":
+        tier = None
+        if Config.JD_RESPONSE_CACHE_REDIS_URL:
+            try:
+                tier = RedisResponseTier(Config.JD_RESPONSE_CACHE_REDIS_URL)
+            except Exception as e:
+                print(f"JD response cache: shared tier disabled ({e})")
+        return cls(
+            max_entries=Config.JD_RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=Config.JD_RESPONSE_CACHE_MAX_BYTES,
+            ttl_seconds=Config.JD_RESPONSE_CACHE_TTL_SECONDS,
+            shared_tier=tier,
+            enabled=Config.JD_RESPONSE_CACHE_ENABLED,
+            local_ttl_seconds=Config.JD_RESPONSE_CACHE_LOCAL_TTL_SECONDS,
+        )
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _memory_ttl(self, ttl: float) -> float:
+        return min(ttl, self.local_ttl_seconds) if self.shared_tier is not None else ttl
+
+    def _shared_etag_matches(self, job_id: int, etag: str) -> bool:
+        try:
+            return self.shared_tier.get_etag(job_id) == etag
+        except Exception as e:
+            # Can't tell; the short local TTL bounds how stale the copy can be
+            print(f"JD response cache: shared tier check failed: {e}")
+            return True
+
+    def get(self, job_id: int) -> Optional[Tuple[bytes, str]]:
+        """Returns (body, etag) or None."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        local = None
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None:
+                deadline, body, etag = entry
+                if now < deadline:
+                    local = (body, etag)
+                else:
+                    self._drop(job_id)
+
+        if local is not None:
+            # Another replica's write deletes the shared entry, so a missing or different ETag means stale
+            if self.shared_tier is None or self._shared_etag_matches(job_id, local[1]):
+                with self._lock:
+                    if job_id in self._entries:
+                        self._entries.move_to_end(job_id)
+                    self.hits += 1
+                return local
+            with self._lock:
+                if self._entries.get(job_id, (None, None, None))[2] == local[1]:
+                    self._drop(job_id)
+                self.stale_drops += 1
+
+        if self.shared_tier is not None:
+            try:
+                cached = self.shared_tier.get(job_id)
+            except Exception as e:
+                print(f"JD response cache: shared tier read failed: {e}")
+                cached = None
+            if cached is not None:
+                self._put_memory(job_id, cached[0], cached[1], now + self._memory_ttl(self.ttl_seconds))
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return cached
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, job_id: int, body: bytes, etag: str, expires_at: Optional[datetime] = None,
+            generation: Optional[int] = None) -> None:
+        """
+        Stores a response body. Pass the `generation` read before querying the
+        database; if an invalidation happened since, the body may be stale and
+        is not stored.
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            if expires_at.tzinfo is not None: # stored values are naive UTC
+                expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+            if ttl <= 0:
+                return
+        if not self._put_memory(job_id, body, etag, time.monotonic() + self._memory_ttl(ttl), generation):
+            return
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.set(job_id, body, etag, ttl)
+                if generation is not None and generation != self._generation:
+                    # Invalidated while writing: the delete may have run before our set
+                    self.shared_tier.delete(job_id)
+            except Exception as e:
+                print(f"JD response cache: shared tier write failed: {e}")
+
+    def _put_memory(self, job_id: int, body: bytes, etag: str, deadline: float,
+                    generation: Optional[int] = None) -> bool:
+        """Returns False when the body is stale (see set()) and was not stored."""
+        with self._lock:
+            # Checked under the same lock hold as the insert, so no invalidation can slip in between
+            if generation is not None and generation != self._generation:
+                return False
+            if len(body) > self.max_bytes:
+                return True
+            self._drop(job_id)
+            self._entries[job_id] = (deadline, body, etag)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def _drop(self, job_id: int) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(job_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def invalidate(self, job_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._drop(job_id)
+            self.invalidations += 1
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.delete(job_id)
+            except Exception as e:
+                print(f"JD response cache: shared tier delete failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    # --- JDService listener hooks ---
+    def on_jd_saved(self, job_id: int, job_title: str, status: str, jd_content_json: str) -> None:
+        self.invalidate(job_id)
+
+    def on_jd_deleted(self, job_id: int) -> None:
+        self.invalidate(job_id)
+
+    def on_jds_changed(self) -> None:
+        # Which rows changed is unknown; local entries go, shared ones age out via their TTL
+        self.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "local_ttl_seconds": self._memory_ttl(self.ttl_seconds),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "stale_drops": self.stale_drops,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "shared_tier": self.shared_tier.url if self.shared_tier else None,
+            }
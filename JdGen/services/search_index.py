@@ -0,0 +1,233 @@
+# ai_hr_jd_project/services/search_index.py
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from config import Config
+from database.models import JDTable, JobStatus
+
+# Text fields of JobDescriptionContent that are worth searching
+SEARCHABLE_FIELDS = (
+    "role_summary", "company_summary", "key_responsibilities",
+    "required_qualifications", "preferred_qualifications", "benefits",
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our the this to we will with you your".split()
+)
+
+
+def extract_search_text(jd_content_json: str) -> str:
+    """Flattens the searchable parts of a stored JD into plain text."""
+    try:
+        content = json.loads(jd_content_json)
+    except (TypeError, ValueError):
+        return ""
+    parts = []
+    for field in SEARCHABLE_FIELDS:
+        value = content.get(field)
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value if item)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def tokenize(value: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall(value.lower()) if token not in _STOP_WORDS]
+
+
+def _normalize_phrase(value: str) -> str:
+    return " ".join(_TOKEN_RE.findall(value.lower()))
+
+
+class InvertedIndex:
+    """
+    In-process inverted index with BM25 ranking. Used when the database has
+    no FULLTEXT support (e.g. SQLite). Kept up to date by JDService writes and
+    rebuilt from the table on first use / every rebuild_interval seconds so
+    replicas converge on writes made elsewhere.
+    """
+    K1 = 1.2
+    B = 0.75
+    TITLE_BOOST = 2 # title tokens are counted this many times
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._doc_lengths: dict[int, int] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_meta: dict[int, dict] = {} # job_id -> {"job_title", "status", "text"}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, job_id: int, job_title: str, status: str, search_text: str) -> None:
+        with self._lock:
+            self.remove(job_id)
+            terms = Counter(tokenize(search_text))
+            for token in tokenize(job_title):
+                terms[token] += self.TITLE_BOOST
+            for term, freq in terms.items():
+                self._postings[term][job_id] = freq
+            length = sum(terms.values())
+            self._doc_terms[job_id] = terms
+            self._doc_lengths[job_id] = length
+            self._total_length += length
+            self._doc_meta[job_id] = {
+                "job_title": job_title,
+                "status": status,
+                "text": _normalize_phrase(job_title + "\n" + search_text),
+            }
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            terms = self._doc_terms.pop(job_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(job_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(job_id, 0)
+            self._doc_meta.pop(job_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_lengths.clear()
+            self._doc_terms.clear()
+            self._doc_meta.clear()
+            self._total_length = 0
+
+    def search(self, query: str, status: Optional[str] = None) -> list[dict]:
+        """All matches ranked by BM25. Quoted phrases must appear verbatim."""
+        phrases = [_normalize_phrase(p) for p in _PHRASE_RE.findall(query)]
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            avg_length = (self._total_length / doc_count) if doc_count else 0
+            scores: dict[int, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for job_id, freq in postings.items():
+                    norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[job_id] / avg_length)
+                    scores[job_id] += idf * freq * (self.K1 + 1) / (freq + norm)
+
+            results = []
+            for job_id, score in scores.items():
+                meta = self._doc_meta[job_id]
+                if status is not None and meta["status"] != status:
+                    continue
+                if phrases and not all(phrase in meta["text"] for phrase in phrases):
+                    continue
+                results.append({"id": job_id, "job_title": meta["job_title"], "score": round(score, 4)})
+        results.sort(key=lambda item: (-item["score"], -item["id"]))
+        return results
+
+
+class SearchService:
+    """
+    Ranked, paginated search over JD content. Uses the MySQL FULLTEXT index on
+    (job_title, search_text) when running on MySQL, otherwise the in-process
+    InvertedIndex. Registered as a JDService listener so the in-process index
+    follows every create/update/delete.
+    """
+
+    def __init__(self, backend: str = "auto", rebuild_interval: float = 300):
+        self.backend = backend
+        self.rebuild_interval = rebuild_interval
+        self.index = InvertedIndex()
+        self._built_at: Optional[float] = None
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "SearchService":
+        return cls(backend=Config.SEARCH_BACKEND, rebuild_interval=Config.SEARCH_INDEX_REBUILD_SECONDS)
+
+    def _uses_fulltext(self, db: Session) -> bool:
+        if self.backend == "memory":
+            return False
+        if self.backend == "fulltext":
+            return True
+        return db.get_bind().dialect.name == "mysql"
+
+    # --- JDService listener hooks ---
+    def on_jd_saved(self, job_id: int, job_title: str, status: str, jd_content_json: str) -> None:
+        if self._built_at is not None:
+            self.index.add(job_id, job_title, status, extract_search_text(jd_content_json))
+
+    def on_jd_deleted(self, job_id: int) -> None:
+        self.index.remove(job_id)
+
+    def on_jds_changed(self) -> None:
+        # Rows changed without us knowing which ones (e.g. a bulk insert): rebuild on next search
+        self._built_at = None
+
+    # --- Search ---
+    def rebuild(self, db: Session) -> int:
+        stmt = select(
+            JDTable.id, JDTable.job_title, JDTable.status, JDTable.search_text, JDTable.jd_content_json
+        ).execution_options(yield_per=500)
+        fresh = InvertedIndex()
+        for row in db.execute(stmt):
+            # Rows written before the search_text column existed are extracted on the fly
+            search_text = row.search_text if row.search_text is not None else extract_search_text(row.jd_content_json)
+            fresh.add(row.id, row.job_title, row.status.value, search_text)
+        self.index = fresh
+        self._built_at = time.monotonic()
+        return len(fresh)
+
+    def _ensure_index(self, db: Session) -> None:
+        stale = self._built_at is None or time.monotonic() - self._built_at > self.rebuild_interval
+        if stale:
+            with self._build_lock:
+                if self._built_at is None or time.monotonic() - self._built_at > self.rebuild_interval:
+                    self.rebuild(db)
+
+    def search(self, db: Session, query: str, page: int = 1, page_size: int = 20,
+               status: Optional[str] = None) -> dict:
+        offset = (page - 1) * page_size
+        if self._uses_fulltext(db):
+            total, results = self._search_fulltext(db, query, offset, page_size, status)
+            backend = "fulltext"
+        else:
+            self._ensure_index(db)
+            matches = self.index.search(query, status=status)
+            total, results = len(matches), matches[offset:offset + page_size]
+            backend = "memory"
+        return {"query": query, "backend": backend, "total": total, "page": page,
+                "page_size": page_size, "results": results}
+
+    def _search_fulltext(self, db: Session, query: str, offset: int, limit: int, status: Optional[str]):
+        # Boolean mode understands "quoted phrases"; natural language mode ranks plain keywords better
+        mode = "IN BOOLEAN MODE" if '"' in query else "IN NATURAL LANGUAGE MODE"
+        match = f"MATCH(job_title, search_text) AGAINST (:query {mode})"
+        where = match
+        params = {"query": query, "limit": limit, "offset": offset}
+        if status is not None:
+            where += " AND status = :status"
+            params["status"] = JobStatus(status).name # SQLAlchemy stores the enum name
+        total = db.execute(text(f"SELECT COUNT(*) FROM job_descriptions WHERE {where}"), params).scalar()
+        rows = db.execute(text(
+            f"SELECT id, job_title, {match} AS score FROM job_descriptions "
+            f"WHERE {where} ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset"
+        ), params).all()
+        return total, [{"id": row.id, "job_title": row.job_title, "score": round(float(row.score), 4)} for row in rows]
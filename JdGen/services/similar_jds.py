@@ -0,0 +1,443 @@
+# ai_hr_jd_project/services/similar_jds.py
+# Near-duplicate detection between generation requests and stored JDs, so
+# /api/jd/generate can offer (or return) an existing JD instead of spending an
+# LLM call on "Sr. Python Engineer" when "Senior Python Developer" with the
+# same skills is already in job_descriptions.
+#
+# Candidates come from MinHash/LSH over title and skill tokens; each candidate
+# is then scored exactly on title, skills and responsibilities. The index lives
+# in process, follows JDService writes as a listener, re-syncs against the
+# table's (id, version) pairs periodically, and can be built offline into a
+# snapshot file (`python manage.py build-similarity-index`) that workers load
+# instead of reading every row at start-up.
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import Config
+from database import connection
+from database.models import JDTable, JobStatus
+from schemas.jd_schemas import JDGenerateRequest, JobDescriptionContent
+from services.search_index import tokenize
+
+MODES = ("off", "offer", "return")
+SNAPSHOT_FORMAT = 1
+
+# Spellings that should count as the same word in titles and skills
+_SYNONYMS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "jnr": "junior",
+    "dev": "engineer", "developer": "engineer", "eng": "engineer", "programmer": "engineer",
+    "mgr": "manager", "js": "javascript", "ts": "typescript", "k8s": "kubernetes",
+    "postgres": "postgresql", "golang": "go",
+}
+# Words that appear in most qualification lines and say nothing about the role
+_FILLER = frozenset(
+    "experience years year knowledge strong proficiency proficient ability skills skill understanding "
+    "familiarity familiar working excellent good solid plus including using hands".split()
+)
+# Score weights; fields the request leaves empty are left out and the rest re-weighted
+_WEIGHTS = {"title": 0.5, "skills": 0.3, "responsibilities": 0.2}
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_tokens(texts: Iterable[str]) -> frozenset:
+    tokens = set()
+    for text in texts:
+        for token in tokenize(str(text)):
+            token = _SYNONYMS.get(token, token)
+            if token in _FILLER or token.isdigit():
+                continue
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1] # crude plural folding, applied to both sides alike
+            tokens.add(token)
+    return frozenset(tokens)
+
+
+@dataclass(frozen=True)
+class JDFeatures:
+    title: frozenset
+    skills: frozenset
+    responsibilities: frozenset
+
+    @classmethod
+    def from_request(cls, jd_input: JDGenerateRequest) -> "JDFeatures":
+        return cls(
+            title=normalize_tokens([jd_input.job_title_input]),
+            skills=normalize_tokens(jd_input.required_skills_input),
+            responsibilities=normalize_tokens(jd_input.key_responsibilities_input),
+        )
+
+    @classmethod
+    def from_stored(cls, job_title: str, jd_content_json: str) -> "JDFeatures":
+        try:
+            content = json.loads(jd_content_json)
+        except (TypeError, ValueError):
+            content = {}
+        return cls(
+            title=normalize_tokens([job_title]),
+            skills=normalize_tokens(content.get("required_qualifications") or []),
+            responsibilities=normalize_tokens(content.get("key_responsibilities") or []),
+        )
+
+    def lsh_features(self) -> set:
+        return {f"t:{token}" for token in self.title} | {f"s:{token}" for token in self.skills}
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _containment(query: frozenset, doc: frozenset) -> float:
+    return len(query & doc) / len(query) if query else 0.0
+
+
+def similarity(query: JDFeatures, doc: JDFeatures) -> dict:
+    """Title Jaccard, plus how much of the requested skills/responsibilities the stored JD covers."""
+    parts = {
+        "title": _jaccard(query.title, doc.title),
+        "skills": _containment(query.skills, doc.skills),
+        "responsibilities": _containment(query.responsibilities, doc.responsibilities),
+    }
+    present = {"title": bool(query.title), "skills": bool(query.skills),
+               "responsibilities": bool(query.responsibilities)}
+    total_weight = sum(weight for field, weight in _WEIGHTS.items() if present[field])
+    score = sum(parts[field] * weight for field, weight in _WEIGHTS.items() if present[field])
+    parts["score"] = score / total_weight if total_weight else 0.0
+    return {name: round(value, 4) for name, value in parts.items()}
+
+
+class MinHasher:
+    """MinHash signatures from `num_perm` universal hash functions (a*x + b mod p)."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.seed = seed
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, features: set) -> Optional[tuple]:
+        if not features:
+            return None
+        hashes = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+                  for f in features]
+        # The low 32 bits are plenty to compare and keep snapshots small
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF for a, b in self._params)
+
+
+@dataclass
+class IndexedJD:
+    job_title: str
+    status: str
+    version: Optional[int] # None when added by a listener; the next sync reads it from the table
+    features: JDFeatures
+    signature: Optional[tuple]
+
+
+class MinHashLSHIndex:
+    """
+    Banded LSH over MinHash signatures: two JDs become candidates when all
+    `rows` values of at least one band agree. With 32 bands of 2 rows a pair
+    at Jaccard 0.3 is found 95% of the time, at 0.1 about 27%.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._docs: dict[int, IndexedJD] = {}
+        self._buckets: dict[tuple, set] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _band_keys(self, signature: tuple) -> list[tuple]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def add(self, job_id: int, job_title: str, status: str, features: JDFeatures,
+            version: Optional[int] = None, signature: Optional[tuple] = None) -> None:
+        if signature is None:
+            signature = self.hasher.signature(features.lsh_features())
+        with self._lock:
+            self.remove(job_id)
+            self._docs[job_id] = IndexedJD(job_title, status, version, features, signature)
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, set()).add(job_id)
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            doc = self._docs.pop(job_id, None)
+            if doc is None or doc.signature is None:
+                return
+            for key in self._band_keys(doc.signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(job_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def set_status(self, job_id: int, status: str) -> None:
+        with self._lock:
+            doc = self._docs.get(job_id)
+            if doc is not None:
+                doc.status = status
+
+    def versions(self) -> dict:
+        with self._lock:
+            return {job_id: (doc.version, doc.status) for job_id, doc in self._docs.items()}
+
+    def query(self, features: JDFeatures, min_score: float, limit: int = 5,
+              status: Optional[str] = JobStatus.ACTIVE.value) -> tuple[list[dict], int]:
+        """Best matches at or above min_score, and how many candidates were scored."""
+        signature = self.hasher.signature(features.lsh_features())
+        if signature is None:
+            return [], 0
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            matches = []
+            for job_id in candidates:
+                doc = self._docs[job_id]
+                if status is not None and doc.status != status:
+                    continue
+                scores = similarity(features, doc.features)
+                if scores["score"] >= min_score:
+                    matches.append({"id": job_id, "job_title": doc.job_title, **scores})
+        matches.sort(key=lambda match: (-match["score"], -match["id"]))
+        return matches[:limit], len(candidates)
+
+    def to_snapshot(self) -> dict:
+        with self._lock:
+            docs = [
+                [job_id, doc.version, doc.status, doc.job_title, sorted(doc.features.title),
+                 sorted(doc.features.skills), sorted(doc.features.responsibilities),
+                 list(doc.signature) if doc.signature is not None else None]
+                for job_id, doc in self._docs.items()
+            ]
+        return {"format": SNAPSHOT_FORMAT, "num_perm": self.hasher.num_perm, "bands": self.bands,
+                "seed": self.hasher.seed, "docs": docs}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "MinHashLSHIndex":
+        if snapshot.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported similarity snapshot format {snapshot.get('format')}")
+        index = cls(num_perm=snapshot["num_perm"], bands=snapshot["bands"], seed=snapshot["seed"])
+        for job_id, version, status, job_title, title, skills, responsibilities, signature in snapshot["docs"]:
+            features = JDFeatures(frozenset(title), frozenset(skills), frozenset(responsibilities))
+            index.add(job_id, job_title, status, features, version=version,
+                      signature=tuple(signature) if signature is not None else None)
+        return index
+
+
+@dataclass(frozen=True)
+class SimilarJD:
+    job_id: int
+    job_title: str
+    score: float
+    content: Optional[JobDescriptionContent] = None # only fetched when it is served (mode "return")
+
+    def headers(self) -> dict:
+        return {"X-Similar-JD-Id": str(self.job_id), "X-Similar-JD-Score": f"{self.score:.4f}"}
+
+
+class SimilarJDService:
+    """
+    Looks up stored JDs close to a generation request. `mode` decides what
+    /generate does with the best match at or above `threshold`: "offer" adds
+    X-Similar-JD-Id / X-Similar-JD-Score headers to the normal generation,
+    "return" serves the stored JD's content instead of calling the LLM.
+    POST /api/jd/generate/similar lists matches in any mode.
+
+    Once start()ed, a daemon thread builds the index and re-syncs it every
+    sync_interval seconds (sooner after a bulk write), so lookups made during a
+    request only read memory. Until the first build finishes, nothing matches.
+    """
+
+    SYNC_BATCH_SIZE = 500
+
+    def __init__(self, mode: str = "off", threshold: float = 0.85, sync_interval: float = 300,
+                 snapshot_path: Optional[str] = None):
+        if mode not in MODES:
+            raise ValueError(f"SIMILAR_JD_MODE must be one of {', '.join(MODES)}, got '{mode}'")
+        self.mode = mode
+        self.threshold = threshold
+        self.sync_interval = sync_interval
+        self.snapshot_path = snapshot_path
+        self.index = MinHashLSHIndex()
+        self._synced_at: Optional[float] = None
+        self._built = False
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.candidates_scored = 0
+        self.last_sync: Optional[dict] = None
+
+    @classmethod
+    def from_config(cls) -> "SimilarJDService":
+        return cls(mode=Config.SIMILAR_JD_MODE, threshold=Config.SIMILAR_JD_THRESHOLD,
+                   sync_interval=Config.SIMILAR_JD_SYNC_SECONDS, snapshot_path=Config.SIMILAR_JD_INDEX_PATH)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    # --- JDService listener hooks ---
+    def on_jd_saved(self, job_id: int, job_title: str, status: str, jd_content_json: str) -> None:
+        if self._built:
+            self.index.add(job_id, job_title, status, JDFeatures.from_stored(job_title, jd_content_json))
+
+    def on_jd_deleted(self, job_id: int) -> None:
+        self.index.remove(job_id)
+
+    def on_jds_changed(self) -> None:
+        # Rows changed without us knowing which ones (e.g. a bulk insert): sync now
+        self._synced_at = None
+        self._wake.set()
+
+    # --- Index maintenance ---
+    def sync(self, db: Session) -> dict:
+        """
+        Brings the index in line with the table: rows that are new or at another
+        version are (re)indexed, deleted rows dropped, status changes applied.
+        On an empty index this is a full build.
+        """
+        started = time.monotonic()
+        indexed = self.index.versions()
+        stale_ids = []
+        seen = set()
+        for job_id, version, status in db.execute(select(JDTable.id, JDTable.version, JDTable.status)):
+            seen.add(job_id)
+            current = indexed.get(job_id)
+            if current is None or current[0] != version:
+                stale_ids.append(job_id)
+            elif current[1] != status.value:
+                self.index.set_status(job_id, status.value)
+        removed = [job_id for job_id in indexed if job_id not in seen]
+        for job_id in removed:
+            self.index.remove(job_id)
+        for start in range(0, len(stale_ids), self.SYNC_BATCH_SIZE):
+            batch = stale_ids[start:start + self.SYNC_BATCH_SIZE]
+            stmt = select(JDTable.id, JDTable.job_title, JDTable.status, JDTable.version, JDTable.jd_content_json) \
+                .where(JDTable.id.in_(batch))
+            for row in db.execute(stmt):
+                self.index.add(row.id, row.job_title, row.status.value,
+                               JDFeatures.from_stored(row.job_title, row.jd_content_json), version=row.version)
+        self._built = True
+        self._synced_at = time.monotonic()
+        self.last_sync = {"indexed": len(stale_ids), "removed": len(removed), "size": len(self.index),
+                          "seconds": round(time.monotonic() - started, 3)}
+        return self.last_sync
+
+    def load_snapshot(self, path: str) -> int:
+        with open(path, encoding="utf-8") as f:
+            self.index = MinHashLSHIndex.from_snapshot(json.load(f))
+        return len(self.index)
+
+    def save_snapshot(self, path: str) -> int:
+        snapshot = self.index.to_snapshot()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return len(snapshot["docs"])
+
+    def refresh(self) -> dict:
+        """Loads the snapshot on the first call (if there is one), then syncs with the table."""
+        with self._sync_lock:
+            if not self._built and self.snapshot_path and os.path.exists(self.snapshot_path):
+                try:
+                    self.load_snapshot(self.snapshot_path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ignoring similarity snapshot {self.snapshot_path}: {e}")
+            with Session(bind=connection.get_engine()) as db:
+                return self.sync(db)
+
+    def _ensure_index(self) -> None:
+        # Only without the background thread (SIMILAR_JD_MODE=off, scripts): sync inline when stale
+        if self._synced_at is None or time.monotonic() - self._synced_at > self.sync_interval:
+            self.refresh()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error in similar JD index sync: {e}")
+            self._wake.wait(self.sync_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="jd-similarity-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    # --- Lookups ---
+    def find_matches(self, jd_input: JDGenerateRequest, min_score: Optional[float] = None,
+                     limit: int = 5) -> list[dict]:
+        if self._thread is None:
+            self._ensure_index()
+        matches, scored = self.index.query(JDFeatures.from_request(jd_input),
+                                           self.threshold if min_score is None else min_score, limit)
+        with self._stats_lock:
+            self.lookups += 1
+            self.candidates_scored += scored
+            if matches:
+                self.matches += 1
+        return matches
+
+    def best_match(self, jd_input: JDGenerateRequest) -> Optional[SimilarJD]:
+        """
+        The closest stored JD at or above the threshold, or None (also when off).
+        In "return" mode its content is read too, one primary-key SELECT that
+        replaces the LLM call; "offer" mode only reads the in-memory index.
+        """
+        if not self.enabled:
+            return None
+        matches = self.find_matches(jd_input, limit=3)
+        if self.mode == "offer":
+            return SimilarJD(matches[0]["id"], matches[0]["job_title"], matches[0]["score"]) if matches else None
+        for match in matches:
+            with Session(bind=connection.get_engine()) as db:
+                content_json = db.execute(
+                    select(JDTable.jd_content_json).where(JDTable.id == match["id"])).scalar()
+            if content_json is None:
+                self.index.remove(match["id"]) # deleted by another replica since the last sync
+                continue
+            return SimilarJD(match["id"], match["job_title"], match["score"],
+                             JobDescriptionContent.model_validate_json(content_json))
+        return None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "mode": self.mode,
+                "threshold": self.threshold,
+                "indexed": len(self.index),
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "mean_candidates": round(self.candidates_scored / self.lookups, 1) if self.lookups else 0.0,
+                "ready": self._built,
+                "last_sync": self.last_sync,
+                "snapshot_path": self.snapshot_path,
+            }
@@ -0,0 +1,128 @@
+# ai_hr_jd_project/services/skills_service.py
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database.models import JDSkillTable, JDTable, JobStatus, SkillKind
+
+SKILL_KEY_LENGTH = 255
+SKILL_LENGTH = 512
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.lower().split()).strip(" .;,")[:SKILL_KEY_LENGTH]
+
+
+def extract_skill_rows(job_id: int, jd_content_json: str) -> list[dict]:
+    """jd_skills rows for one JD: its required and preferred qualifications, deduplicated."""
+    try:
+        content = json.loads(jd_content_json)
+    except (TypeError, ValueError):
+        return []
+    rows = []
+    for kind, field in ((SkillKind.REQUIRED, "required_qualifications"),
+                        (SkillKind.PREFERRED, "preferred_qualifications")):
+        seen = set()
+        for skill in content.get(field) or []:
+            skill_key = normalize_skill(str(skill))
+            if skill_key and skill_key not in seen:
+                seen.add(skill_key)
+                rows.append({"job_id": job_id, "kind": kind,
+                             "skill": " ".join(str(skill).split())[:SKILL_LENGTH], "skill_key": skill_key})
+    return rows
+
+
+def replace_skills(db: Session, jd_rows: list[tuple[int, str]], existing: bool = True) -> None:
+    """
+    Rewrites the jd_skills rows for (job_id, jd_content_json) pairs within the
+    caller's transaction: one DELETE and one executemany INSERT for the lot.
+    """
+    if not jd_rows:
+        return
+    job_ids = [job_id for job_id, _ in jd_rows]
+    if existing:
+        db.execute(delete(JDSkillTable).where(JDSkillTable.job_id.in_(job_ids)))
+    skill_rows = [row for job_id, content_json in jd_rows for row in extract_skill_rows(job_id, content_json)]
+    if skill_rows:
+        db.execute(insert(JDSkillTable), skill_rows)
+    db.execute(update(JDTable).where(JDTable.id.in_(job_ids)).values(skills_indexed=True)
+               .execution_options(synchronize_session=False))
+
+
+def index_pending_skills(db: Session, batch_size: int = 500) -> int:
+    """Indexes every JD whose skills_indexed flag is still false. Safe to re-run."""
+    indexed = 0
+    while True:
+        rows = db.execute(
+            select(JDTable.id, JDTable.jd_content_json)
+            .where(JDTable.skills_indexed.is_(False))
+            .order_by(JDTable.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+        replace_skills(db, [(row.id, row.jd_content_json) for row in rows])
+        db.commit()
+        indexed += len(rows)
+
+
+class SkillsService:
+    """Read side of the jd_skills table."""
+
+    MATCH_MODES = ("exact", "prefix", "contains")
+
+    def find_jds(self, db: Session, skill: str, match: str = "contains", kind: str | None = None,
+                 status: str | None = None, limit: int = 100) -> list[dict]:
+        skill_key = normalize_skill(skill)
+        if match == "exact":
+            condition = JDSkillTable.skill_key == skill_key
+        elif match == "prefix":
+            condition = JDSkillTable.skill_key.startswith(skill_key, autoescape=True) # uses the index
+        else:
+            condition = JDSkillTable.skill_key.contains(skill_key, autoescape=True)
+
+        stmt = (
+            select(JDTable.id, JDTable.job_title, JDTable.status,
+                   func.count(JDSkillTable.id).label("matched_skills"))
+            .join(JDSkillTable, JDSkillTable.job_id == JDTable.id)
+            .where(condition)
+            .group_by(JDTable.id, JDTable.job_title, JDTable.status)
+            .order_by(JDTable.id.desc())
+            .limit(limit)
+        )
+        if kind is not None:
+            stmt = stmt.where(JDSkillTable.kind == SkillKind(kind))
+        if status is not None:
+            stmt = stmt.where(JDTable.status == JobStatus(status))
+        return [
+            {"id": row.id, "job_title": row.job_title, "status": row.status.value,
+             "matched_skills": row.matched_skills}
+            for row in db.execute(stmt)
+        ]
+
+    def top_skills(self, db: Session, kind: str | None = None, status: str | None = None,
+                   created_after: datetime | None = None, created_before: datetime | None = None,
+                   limit: int = 20) -> list[dict]:
+        job_count = func.count(func.distinct(JDSkillTable.job_id)).label("job_count")
+        stmt = (
+            select(JDSkillTable.skill_key, func.min(JDSkillTable.skill).label("example"), job_count)
+            .group_by(JDSkillTable.skill_key)
+            .order_by(job_count.desc(), JDSkillTable.skill_key)
+            .limit(limit)
+        )
+        if kind is not None:
+            stmt = stmt.where(JDSkillTable.kind == SkillKind(kind))
+        if status is not None or created_after is not None or created_before is not None:
+            stmt = stmt.join(JDTable, JDTable.id == JDSkillTable.job_id)
+            if status is not None:
+                stmt = stmt.where(JDTable.status == JobStatus(status))
+            if created_after is not None:
+                stmt = stmt.where(JDTable.created_at >= created_after)
+            if created_before is not None:
+                stmt = stmt.where(JDTable.created_at < created_before)
+        return [
+            {"skill": row.skill_key, "example": row.example, "job_count": row.job_count}
+            for row in db.execute(stmt)
+        ]
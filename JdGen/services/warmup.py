@@ -0,0 +1,56 @@
+# ai_hr_jd_project/services/warmup.py
+# Start-up initialization of the database engine and the LLM client, per STARTUP_INIT:
+#
+#   eager       create_app() connects, migrates (DB_AUTO_MIGRATE) and builds the client before
+#               returning, so a misconfiguration fails the deploy instead of the first request
+#   lazy        nothing up front; each is created by the first request that needs it
+#   background  create_app() returns at once and a daemon thread does the eager work while the
+#               server starts listening; requests that arrive first wait on the same locks
+import json
+import threading
+import time
+from typing import Optional
+
+from config import Config
+from database.connection import init_db
+from services.llm_providers import get_provider
+
+STARTUP_MODES = ("eager", "lazy", "background")
+
+
+def warm_up() -> dict:
+    """Initializes the database and the LLM client. Returns the milliseconds spent on each."""
+    timings = {}
+    started = time.perf_counter()
+    init_db()
+    timings["database_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    started = time.perf_counter()
+    get_provider().warm()
+    timings["llm_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return timings
+
+
+def _warm_up_in_background() -> None:
+    try:
+        timings = warm_up()
+    except Exception as e:
+        # Not fatal: the first request that needs the failed part retries the initialization
+        print(f"Background warm-up failed: {e}")
+        return
+    print(json.dumps({"event": "warm_up", "mode": "background", **timings}))
+
+
+def start_warm_up(mode: Optional[str] = None) -> Optional[threading.Thread]:
+    """Runs the STARTUP_INIT policy. Returns the warm-up thread in background mode."""
+    mode = (mode or Config.STARTUP_INIT).lower()
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"STARTUP_INIT must be one of {', '.join(STARTUP_MODES)}, got '{mode}'")
+    if mode == "eager":
+        print(json.dumps({"event": "warm_up", "mode": mode, **warm_up()}))
+        return None
+    if mode == "lazy":
+        return None
+    thread = threading.Thread(target=_warm_up_in_background, name="jd-warm-up", daemon=True)
+    thread.start()
+    return thread
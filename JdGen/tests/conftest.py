@@ -0,0 +1,61 @@
+# ai_hr_jd_project/tests/conftest.py
+# Runs the app against a throwaway SQLite file with the stub LLM provider.
+# Config reads the environment at import time, so it is set up here, before
+# anything from the app is imported. Run from the JdGen directory:
+#   python -m pytest -q
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='jd-tests-'), 'test.db')}",
+    "LLM_PROVIDER": "stub",
+    "STARTUP_INIT": "lazy",
+    "EXPIRY_SWEEPER_ENABLED": "false",
+    "SIMILAR_JD_MODE": "off",
+    "GEN_CACHE_SQLITE_PATH": "",
+    "REQUEST_LOG_SLOW_MS": "-1",
+})
+
+from app import create_app  # noqa: E402
+from database import connection  # noqa: E402
+from schemas.jd_schemas import JDCreateRequest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    # Fixtures delete rows with plain DELETEs and SQLite reuses their ids, so don't serve
+    # a response another test cached for the same id
+    from routes.jd_routes import jd_response_cache
+    jd_response_cache.clear()
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    connection.init_db()
+    session = connection.SessionLocal()
+    yield session
+    session.close()
+    connection.SessionLocal.remove()
+
+
+def make_jd_request(job_title: str = "Backend Engineer", **content) -> JDCreateRequest:
+    jd_content = {
+        "job_title": job_title,
+        "role_summary": "Builds and runs backend services.",
+        "key_responsibilities": ["Design APIs", "Review code"],
+        "required_qualifications": ["Python", "SQL"],
+    }
+    jd_content.update(content)
+    return JDCreateRequest(job_title=job_title, jd_content=jd_content)
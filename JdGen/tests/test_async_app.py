@@ -0,0 +1,151 @@
+# ai_hr_jd_project/tests/test_async_app.py
+import asyncio
+import json
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from async_app import create_async_app
+from conftest import make_jd_request
+from routes import jd_routes
+from schemas.jd_schemas import JobDescriptionContent
+from services.gemini_gateway import CircuitOpenError
+
+GENERATE_BODY = {
+    "job_title_input": "SRE",
+    "key_responsibilities_input": ["Keep services up"],
+    "required_skills_input": ["Linux"],
+}
+NO_CACHE = {"Cache-Control": "no-cache"} # keeps the generation cache out of the way
+
+
+def content(title: str = "Site Reliability Engineer") -> JobDescriptionContent:
+    return JobDescriptionContent(job_title=title, role_summary="Keeps services up.",
+                                 key_responsibilities=["On-call"], required_qualifications=["Linux"])
+
+
+@pytest.fixture
+def run(app):
+    """Runs `scenario(client)` against create_async_app() on a fresh event loop."""
+    def runner(scenario):
+        async def main():
+            async with TestClient(TestServer(create_async_app(app))) as client:
+                return await scenario(client)
+        return asyncio.run(main())
+    return runner
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    calls = []
+
+    async def agenerate(jd_input):
+        calls.append(jd_input.job_title_input)
+        await asyncio.sleep(0)
+        return content()
+
+    async def astream(jd_input):
+        calls.append(jd_input.job_title_input)
+        generated = content()
+        for name, value in generated.model_dump().items():
+            yield "field", name, value
+        yield "done", None, generated
+
+    monkeypatch.setattr(jd_routes.gemini_service, "agenerate_structured_jd", agenerate)
+    monkeypatch.setattr(jd_routes.gemini_service, "astream_structured_jd", astream)
+    return calls
+
+
+def sse_events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_generate_runs_as_a_coroutine(run, fake_gemini):
+    async def scenario(client):
+        response = await client.post("/api/jd/generate", json=GENERATE_BODY, headers=NO_CACHE)
+        return response.status, response.headers["X-Cache"], await response.json()
+
+    status, cache, body = run(scenario)
+    assert (status, cache) == (200, "BYPASS")
+    assert body == content().model_dump()
+    assert fake_gemini == ["SRE"]
+
+
+def test_generate_rejects_invalid_input_like_the_flask_route(run, fake_gemini):
+    async def scenario(client):
+        invalid = await client.post("/api/jd/generate", json={"job_title_input": "SRE"})
+        not_json = await client.post("/api/jd/generate", data="x", headers={"Content-Type": "text/plain"})
+        return invalid.status, await invalid.json(), not_json.status
+
+    status, body, not_json_status = run(scenario)
+    assert status == 422 and "detail" in body
+    assert not_json_status == 415
+    assert fake_gemini == []
+
+
+def test_stream_sends_fields_then_done(run, fake_gemini):
+    async def scenario(client):
+        response = await client.post("/api/jd/generate/stream", json=GENERATE_BODY, headers=NO_CACHE)
+        return response.headers["Content-Type"], await response.text()
+
+    content_type, text = run(scenario)
+    assert content_type.startswith("text/event-stream")
+    events = sse_events(text)
+    assert [event for event, _ in events[:-1]] == ["field"] * (len(events) - 1)
+    assert events[0][1] == {"name": "job_title_generated", "value": "Site Reliability Engineer"}
+    assert events[-1] == ("done", content().model_dump())
+
+
+def test_stream_reports_an_open_circuit_as_an_error_event(run, monkeypatch):
+    async def astream(jd_input):
+        raise CircuitOpenError("Gemini circuit breaker is open; failing fast.", retry_after=12)
+        yield # an async generator that fails on first use
+
+    monkeypatch.setattr(jd_routes.gemini_service, "astream_structured_jd", astream)
+
+    async def scenario(client):
+        response = await client.post("/api/jd/generate/stream", json=GENERATE_BODY, headers=NO_CACHE)
+        return sse_events(await response.text())
+
+    [(event, data)] = run(scenario)
+    assert event == "error"
+    assert data["retry_after"] == 12
+
+
+def test_bridge_serves_the_flask_routes_with_headers_and_conditional_gets(run, db):
+    job_id = jd_routes.jd_service.create_jd(db, make_jd_request("Bridged Engineer")).id
+
+    async def scenario(client):
+        created = await client.post("/api/jd", json=make_jd_request("Posted Engineer").model_dump(mode="json", by_alias=True))
+        fetched = await client.get(f"/api/jd/{job_id}")
+        etag = fetched.headers["ETag"]
+        not_modified = await client.get(f"/api/jd/{job_id}", headers={"If-None-Match": etag})
+        missing = await client.get("/api/jd/999999")
+        return (created.status, await created.json(), fetched.status, await fetched.json(), etag,
+                not_modified.status, missing.status)
+
+    created_status, created_body, status, body, etag, not_modified, missing = run(scenario)
+    assert created_status == 201 and "job_id" in created_body
+    assert (status, body["job_title"]) == (200, "Bridged Engineer")
+    assert etag.strip('"') == f"jd-{job_id}-v1"
+    assert (not_modified, missing) == (304, 404)
+
+
+def test_bridge_streams_responses_without_a_content_length(run, db):
+    job_ids = [jd_routes.jd_service.create_jd(db, make_jd_request(f"Exported {i}")).id for i in range(3)]
+
+    async def scenario(client):
+        response = await client.get("/api/jd/export", params={"format": "ndjson", "title_prefix": "Exported"})
+        chunks = [chunk async for chunk in response.content.iter_any()]
+        return response.status, response.headers, b"".join(chunks)
+
+    status, headers, body = run(scenario)
+    assert status == 200
+    assert "Content-Length" not in headers
+    assert headers["Content-Disposition"] == "attachment; filename=job_descriptions.ndjson"
+    exported = [json.loads(line) for line in body.decode().splitlines()]
+    assert sorted(row["id"] for row in exported) == sorted(job_ids)
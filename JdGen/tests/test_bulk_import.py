@@ -0,0 +1,76 @@
+# ai_hr_jd_project/tests/test_bulk_import.py
+import json
+
+from conftest import make_jd_request
+from database.models import JDTable
+from routes import jd_routes
+
+
+def rows(*titles) -> list[dict]:
+    return [make_jd_request(title).model_dump(mode="json", by_alias=True) for title in titles]
+
+
+def titles_of(db, job_ids):
+    db.expire_all()
+    return [db.get(JDTable, job_id).job_title for job_id in job_ids]
+
+
+def test_rows_are_committed_in_chunks_of_chunk_size(client, db):
+    response = client.post("/api/jd/bulk?chunk_size=2", json=rows("A0", "A1", "A2", "A3", "A4"))
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body["created"], body["chunks_committed"], body["errors"]) == (5, 3, [])
+    assert titles_of(db, body["created_ids"]) == ["A0", "A1", "A2", "A3", "A4"]
+
+
+def test_invalid_rows_are_reported_by_index_and_do_not_shift_chunks(client, db):
+    payload = rows("B0", "B1", "B2")
+    payload.insert(1, {"job_title": "No content"})
+    response = client.post("/api/jd/bulk?chunk_size=2", json=payload)
+
+    body = response.get_json()
+    assert response.status_code == 201
+    assert (body["created"], body["chunks_committed"]) == (3, 2)
+    assert [error["index"] for error in body["errors"]] == [1]
+    assert titles_of(db, body["created_ids"]) == ["B0", "B1", "B2"]
+
+
+def test_ndjson_lines_are_read_one_by_one(client, db):
+    lines = [json.dumps(row) for row in rows("C0", "C1")]
+    lines.insert(1, "{not json")
+    response = client.post("/api/jd/bulk?return_ids=false", data="\n".join(lines) + "\n",
+                           content_type="application/x-ndjson")
+
+    body = response.get_json()
+    assert (body["created"], body["created_ids"]) == (2, None)
+    assert body["errors"][0]["index"] == 1
+    assert body["errors"][0]["detail"].startswith("Invalid JSON")
+
+
+def test_a_failed_chunk_is_reported_per_row_and_other_chunks_stay_committed(client, db, monkeypatch):
+    bulk_insert = jd_routes.jd_service.bulk_insert_jds
+    calls = []
+
+    def failing_second_chunk(session, chunk, return_ids=True):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise RuntimeError("deadlock detected")
+        return bulk_insert(session, chunk, return_ids=return_ids)
+
+    monkeypatch.setattr(jd_routes.jd_service, "bulk_insert_jds", failing_second_chunk)
+    response = client.post("/api/jd/bulk?chunk_size=2", json=rows("D0", "D1", "D2", "D3", "D4"))
+
+    body = response.get_json()
+    assert response.status_code == 201
+    assert calls == [2, 2, 1]
+    assert (body["created"], body["chunks_committed"]) == (3, 2)
+    assert [error["index"] for error in body["errors"]] == [2, 3]
+    assert all("deadlock detected" in error["detail"] for error in body["errors"])
+    assert titles_of(db, body["created_ids"]) == ["D0", "D1", "D4"]
+
+
+def test_nothing_created_is_a_422(client):
+    assert client.post("/api/jd/bulk", json=[{"job_title": "No content"}]).status_code == 422
+    response = client.post("/api/jd/bulk", json={"not": "a list"})
+    assert response.status_code == 422
+    assert response.get_json()["errors"][0]["index"] == 0
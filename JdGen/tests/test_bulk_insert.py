@@ -0,0 +1,38 @@
+# ai_hr_jd_project/tests/test_bulk_insert.py
+import pytest
+from sqlalchemy import insert, select
+
+from conftest import make_jd_request
+from database.models import JDSkillTable, JDTable, JobStatus
+from services.jd_service import JDService
+
+
+@pytest.fixture
+def legacy_id(db):
+    # A row from before jd_skills existed: never indexed
+    result = db.execute(insert(JDTable).values(
+        job_title="Legacy", jd_content_json=make_jd_request("Legacy").jd_content.model_dump_json(),
+        status=JobStatus.ACTIVE, skills_indexed=False,
+    ))
+    db.commit()
+    return result.inserted_primary_key[0]
+
+
+def skills_of(db, job_id):
+    return sorted(db.execute(select(JDSkillTable.skill_key).where(JDSkillTable.job_id == job_id)).scalars())
+
+
+@pytest.mark.parametrize("return_ids", [True, False])
+def test_bulk_insert_indexes_only_its_own_rows(db, legacy_id, return_ids):
+    service = JDService()
+    service.bulk_insert_jds(db, [make_jd_request(f"Bulk {i}", required_qualifications=[f"Skill {i}"])
+                                 for i in range(3)], return_ids=return_ids)
+
+    new_rows = db.execute(select(JDTable.id, JDTable.job_title, JDTable.skills_indexed)
+                          .where(JDTable.job_title.startswith("Bulk ")).order_by(JDTable.id.desc()).limit(3)).all()
+    assert all(row.skills_indexed for row in new_rows)
+    for row in new_rows:
+        assert skills_of(db, row.id) == [f"skill {row.job_title[-1]}"]
+
+    assert db.get(JDTable, legacy_id).skills_indexed is False
+    assert skills_of(db, legacy_id) == []
@@ -0,0 +1,136 @@
+# ai_hr_jd_project/tests/test_expiry_sweeper.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.sql.dml import Update
+
+from conftest import make_jd_request
+from database.models import JDSkillTable, JDTable, JobStatus, MaintenanceLeaseTable
+from services import expiry_sweeper
+from services.expiry_sweeper import ExpirySweeper, acquire_lease, release_lease
+from services.jd_service import JDService
+from services.response_cache import JDResponseCache
+
+LEASE = "test_lease"
+
+
+class SavedListener:
+    def __init__(self):
+        self.saved = []
+
+    def on_jd_saved(self, job_id, job_title, status, jd_content_json):
+        self.saved.append((job_id, status))
+
+
+@pytest.fixture
+def service(db):
+    db.execute(delete(JDSkillTable))
+    db.execute(delete(JDTable))
+    db.execute(delete(MaintenanceLeaseTable))
+    db.commit()
+    return JDService()
+
+
+def add_jds(service, db, count, expires_at):
+    return [service.create_jd(db, make_jd_request(f"Engineer {i}").model_copy(update={"expires_at": expires_at})).id
+            for i in range(count)]
+
+
+def status_and_version(db, job_id):
+    db.expire_all()
+    return db.execute(select(JDTable.status, JDTable.version).where(JDTable.id == job_id)).one()
+
+
+def test_free_lease_is_acquired_and_renewed_by_its_holder(db, service):
+    assert acquire_lease(db, LEASE, "a", 60)
+    assert acquire_lease(db, LEASE, "a", 60)
+    assert db.get(MaintenanceLeaseTable, LEASE).holder == "a"
+
+
+def test_lease_held_by_someone_else_is_refused(db, service):
+    assert acquire_lease(db, LEASE, "a", 60)
+    assert not acquire_lease(db, LEASE, "b", 60)
+    db.expire_all()
+    assert db.get(MaintenanceLeaseTable, LEASE).holder == "a"
+
+
+def test_expired_or_released_lease_can_be_taken_over(db, service):
+    assert acquire_lease(db, LEASE, "a", -1) # already run out
+    assert acquire_lease(db, LEASE, "b", 60)
+    release_lease(db, LEASE, "b")
+    assert acquire_lease(db, LEASE, "c", 60)
+    db.expire_all()
+    assert db.get(MaintenanceLeaseTable, LEASE).holder == "c"
+
+
+def test_expiry_runs_in_bounded_batches_and_is_idempotent(db, service):
+    now = datetime.utcnow()
+    due = add_jds(service, db, 5, now - timedelta(days=1))
+    future = add_jds(service, db, 1, now + timedelta(days=1))
+    listener = SavedListener()
+    service.add_listener(listener)
+
+    assert [service.expire_due_jds(db, now, batch_size=2) for _ in range(4)] == [2, 2, 1, 0]
+    assert all(status_and_version(db, job_id) == (JobStatus.INACTIVE, 2) for job_id in due)
+    assert status_and_version(db, future[0]) == (JobStatus.ACTIVE, 1)
+    assert sorted(listener.saved) == [(job_id, "inactive") for job_id in sorted(due)]
+
+
+def test_only_rows_the_update_flipped_are_notified(db, service, monkeypatch):
+    now = datetime.utcnow()
+    due = add_jds(service, db, 2, now - timedelta(days=1))
+    listener = SavedListener()
+    service.add_listener(listener)
+
+    # Another writer deactivates one of the candidates between the SELECT and the UPDATE
+    execute = db.execute
+    def racing_execute(statement, *args, **kwargs):
+        if isinstance(statement, Update) and not racing_execute.raced:
+            racing_execute.raced = True
+            execute(update(JDTable).where(JDTable.id == due[0]).values(status=JobStatus.INACTIVE))
+        return execute(statement, *args, **kwargs)
+    racing_execute.raced = False
+    monkeypatch.setattr(db, "execute", racing_execute)
+
+    assert service.expire_due_jds(db, now) == 1
+    assert listener.saved == [(due[1], "inactive")]
+
+
+def test_expiry_invalidates_cached_responses(db, service):
+    now = datetime.utcnow()
+    due = add_jds(service, db, 1, now - timedelta(days=1))[0]
+    cache = JDResponseCache()
+    service.add_listener(cache)
+    cache.set(due, b"{}", f"jd-{due}-v1", generation=cache.generation)
+
+    service.expire_due_jds(db, now)
+    assert cache.get(due) is None
+
+
+def test_sweeper_stops_after_max_batches_and_releases_the_lease(db, service):
+    due = add_jds(service, db, 5, datetime.utcnow() - timedelta(days=1))
+    sweeper = ExpirySweeper(service, batch_size=2, max_batches=2)
+
+    report = sweeper.run_once()
+    assert (report["expired"], report["batches"], report["lease_acquired"]) == (4, 2, True)
+    assert acquire_lease(db, ExpirySweeper.LEASE_NAME, "another-replica", 60)
+    assert sum(status_and_version(db, job_id)[0] == JobStatus.ACTIVE for job_id in due) == 1
+
+
+def test_sweeper_stops_when_the_lease_renewal_fails(db, service, monkeypatch):
+    add_jds(service, db, 5, datetime.utcnow() - timedelta(days=1))
+    sweeper = ExpirySweeper(service, batch_size=2)
+    outcomes = iter([True, False]) # acquired, then lost at the first renewal
+    monkeypatch.setattr(expiry_sweeper, "acquire_lease", lambda *args: next(outcomes))
+
+    report = sweeper.run_once()
+    assert (report["expired"], report["batches"], report["lease_lost"]) == (2, 1, True)
+
+
+def test_sweeper_skips_the_run_while_another_replica_holds_the_lease(db, service):
+    add_jds(service, db, 1, datetime.utcnow() - timedelta(days=1))
+    assert acquire_lease(db, ExpirySweeper.LEASE_NAME, "another-replica", 60)
+
+    report = ExpirySweeper(service).run_once()
+    assert (report["expired"], report["lease_acquired"]) == (0, False)
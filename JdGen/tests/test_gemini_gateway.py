@@ -0,0 +1,243 @@
+# ai_hr_jd_project/tests/test_gemini_gateway.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import gemini_gateway
+from services.gemini_gateway import CircuitBreaker, CircuitOpenError, GatewayBusyError, GeminiGateway
+
+
+class FakeAPIError(Exception):
+    """Carries the HTTP status as `.code`, like google.genai.errors.APIError."""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeModels:
+    """
+    Stand-in for client.models. Each call takes the next outcome off the script:
+    an exception to raise, a response to return, or (for streams) a list of
+    chunks, where an exception in the list is raised after the chunks before it.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def generate_content(self, **kwargs):
+        return self._next()
+
+    def generate_content_stream(self, **kwargs):
+        for chunk in self._next():
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+class FakeAsyncModels:
+    """Stand-in for client.aio.models, sharing the script of the sync fake."""
+
+    def __init__(self, models):
+        self.models = models
+
+    async def generate_content(self, **kwargs):
+        outcome = self.models._next()
+        if isinstance(outcome, asyncio.Event):
+            await outcome.wait() # lets a test cancel the call mid-flight
+        return outcome
+
+    async def generate_content_stream(self, **kwargs):
+        chunks = self.models._next()
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        return stream()
+
+
+def make_gateway(*script, **kwargs):
+    options = dict(api_key="test", max_concurrency=1, async_max_concurrency=1, queue_timeout=0.05,
+                   max_retries=2, backoff_base=0.5, backoff_max=0.75,
+                   breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    options.update(kwargs)
+    gateway = GeminiGateway(**options)
+    models = FakeModels(script)
+    gateway._client = SimpleNamespace(models=models, aio=SimpleNamespace(models=FakeAsyncModels(models)))
+    return gateway, models
+
+
+def half_open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at -= breaker.reset_timeout # as if reset_timeout had passed
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Backoff at its upper bound, recorded instead of slept
+    recorded = []
+    monkeypatch.setattr(gemini_gateway.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(gemini_gateway.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_transient_errors_are_retried_with_capped_exponential_backoff(sleeps):
+    gateway, models = make_gateway(FakeAPIError(503), FakeAPIError(429), "ok")
+    assert gateway.generate_content(model="m") == "ok"
+    assert models.calls == 3
+    assert sleeps == [0.5, 0.75] # 0.5 * 2**1 is capped at backoff_max
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_error_is_raised_at_once_and_keeps_the_circuit_closed(sleeps):
+    gateway, models = make_gateway(FakeAPIError(400))
+    with pytest.raises(FakeAPIError):
+        gateway.generate_content(model="m")
+    assert models.calls == 1
+    assert sleeps == []
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_retries_open_the_circuit(sleeps):
+    gateway, models = make_gateway(*[FakeAPIError(503)] * 6)
+    for _ in range(2):
+        with pytest.raises(FakeAPIError):
+            gateway.generate_content(model="m")
+    assert models.calls == 6
+    assert gateway.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        gateway.generate_content(model="m")
+    assert models.calls == 6
+    assert 0 < excinfo.value.retry_after <= 30
+
+
+def test_open_circuit_fails_fast_instead_of_queueing_for_a_slot():
+    gateway, _ = make_gateway(queue_timeout=5)
+    gateway.breaker.record_failure()
+    gateway.breaker.record_failure()
+    gateway._slots.acquire() # every slot busy
+    try:
+        started = time.monotonic()
+        with pytest.raises(CircuitOpenError):
+            gateway.generate_content(model="m")
+        assert time.monotonic() - started < 1
+    finally:
+        gateway._slots.release()
+
+
+def test_half_open_admits_a_single_trial_and_its_success_closes_the_circuit():
+    gateway, _ = make_gateway(["a", "b"], "ok")
+    half_open(gateway.breaker)
+    trial = gateway.generate_content_stream(model="m")
+    assert next(trial) == "a"
+    with pytest.raises(CircuitOpenError):
+        gateway.generate_content(model="m")
+    assert list(trial) == ["b"]
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+    assert gateway.generate_content(model="m") == "ok"
+
+
+def test_failed_trial_reopens_the_circuit(sleeps):
+    gateway, _ = make_gateway(*[FakeAPIError(503)] * 3)
+    half_open(gateway.breaker)
+    with pytest.raises(FakeAPIError):
+        gateway.generate_content(model="m")
+    assert gateway.breaker.state == CircuitBreaker.OPEN
+
+
+def test_saturated_gateway_rejects_with_busy_error_until_a_slot_frees():
+    gateway, _ = make_gateway(["a", "b"], "ok")
+    stream = gateway.generate_content_stream(model="m")
+    next(stream) # holds the only slot
+    assert gateway.stats()["in_flight"] == 1
+    with pytest.raises(GatewayBusyError) as excinfo:
+        gateway.generate_content(model="m")
+    assert excinfo.value.retry_after == gateway.queue_timeout
+
+    stream.close()
+    assert gateway.stats()["in_flight"] == 0
+    assert gateway.generate_content(model="m") == "ok"
+
+
+def test_busy_rejection_hands_the_half_open_trial_back():
+    gateway, _ = make_gateway("ok")
+    half_open(gateway.breaker)
+    gateway._slots.acquire()
+    with pytest.raises(GatewayBusyError):
+        gateway.generate_content(model="m")
+    gateway._slots.release()
+    assert gateway.generate_content(model="m") == "ok"
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_closing_the_stream_during_the_half_open_trial_hands_the_trial_back():
+    gateway, _ = make_gateway(["a", "b"], "ok")
+    half_open(gateway.breaker)
+    stream = gateway.generate_content_stream(model="m")
+    assert next(stream) == "a"
+    stream.close() # e.g. the SSE client disconnected
+
+    assert gateway.breaker.state == CircuitBreaker.HALF_OPEN
+    assert gateway.stats()["in_flight"] == 0
+    assert gateway.generate_content(model="m") == "ok"
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_retries_before_the_first_chunk_only(sleeps):
+    gateway, models = make_gateway(FakeAPIError(503), ["a", "b"])
+    assert list(gateway.generate_content_stream(model="m")) == ["a", "b"]
+    assert models.calls == 2
+
+    gateway, models = make_gateway(["a", FakeAPIError(503)])
+    received = []
+    with pytest.raises(FakeAPIError):
+        for chunk in gateway.generate_content_stream(model="m"):
+            received.append(chunk)
+    assert received == ["a"]
+    assert models.calls == 1
+
+
+def test_async_stream_closed_during_the_half_open_trial_hands_the_trial_back():
+    gateway, _ = make_gateway(["a", "b"], "ok")
+    half_open(gateway.breaker)
+
+    async def scenario():
+        stream = gateway.agenerate_content_stream(model="m")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        assert gateway.stats()["async_in_flight"] == 0
+        return await gateway.agenerate_content(model="m")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_async_call_during_the_half_open_trial_hands_the_trial_back():
+    async def scenario():
+        hang = asyncio.Event() # never set: the fake call waits until it is cancelled
+        gateway, models = make_gateway(hang, "ok")
+        half_open(gateway.breaker)
+        task = asyncio.create_task(gateway.agenerate_content(model="m"))
+        while models.calls == 0:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert gateway.breaker.state == CircuitBreaker.HALF_OPEN
+        assert await gateway.agenerate_content(model="m") == "ok"
+        return gateway.breaker.state
+
+    assert asyncio.run(scenario()) == CircuitBreaker.CLOSED
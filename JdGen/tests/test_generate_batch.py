@@ -0,0 +1,82 @@
+# ai_hr_jd_project/tests/test_generate_batch.py
+import json
+import threading
+
+import pytest
+
+from config import Config
+from database.models import JDTable
+from routes import jd_routes
+from schemas.jd_schemas import JobDescriptionContent
+
+
+def item(title: str) -> dict:
+    return {"job_title_input": title, "key_responsibilities_input": ["Ship features"],
+            "required_skills_input": ["Python"]}
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """
+    "Slow" waits until "Fast" has finished, so the NDJSON lines arrive out of
+    input order; "Boom" fails. Everything else returns at once.
+    """
+    fast_done = threading.Event()
+
+    def generate(jd_input):
+        title = jd_input.job_title_input
+        if title == "Boom":
+            raise RuntimeError("Gemini returned invalid JSON")
+        if title == "Slow":
+            assert fast_done.wait(5)
+        content = JobDescriptionContent(job_title=title, role_summary=f"{title} role.",
+                                        key_responsibilities=["Ship features"], required_qualifications=["Python"])
+        if title == "Fast":
+            fast_done.set()
+        return content
+
+    monkeypatch.setattr(jd_routes.gemini_service, "generate_structured_jd", generate)
+
+
+def post_batch(client, body):
+    # no-cache keeps results of earlier tests in the generation cache out of the way
+    response = client.post("/api/jd/generate/batch", json=body, headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_lines_arrive_in_completion_order_with_their_input_index(client, fake_gemini):
+    lines = post_batch(client, {"items": [item("Slow"), item("Boom"), item("Fast")], "max_parallel": 3})
+
+    results, summary = lines[:-1], lines[-1]
+    assert sorted(line["index"] for line in results) == [0, 1, 2]
+    assert results[-1]["index"] == 0 # the slow item finishes last although it was sent first
+    by_index = {line["index"]: line for line in results}
+    assert by_index[0]["jd_content"]["job_title_generated"] == "Slow"
+    assert by_index[2]["jd_content"]["job_title_generated"] == "Fast"
+    assert (by_index[0]["status"], by_index[0]["cache"]) == ("succeeded", "BYPASS")
+    assert by_index[1] == {"type": "result", "index": 1, "status": "failed", "error": "Gemini returned invalid JSON"}
+    assert summary == {"type": "summary", "total": 3, "succeeded": 2, "failed": 1}
+
+
+def test_persisted_results_follow_input_order_and_skip_failures(client, db, fake_gemini):
+    lines = post_batch(client, {"items": [item("Slow"), item("Boom"), item("Fast")], "max_parallel": 3,
+                                "persist": True})
+
+    summary = lines[-1]
+    assert summary["persisted_indexes"] == [0, 2]
+    titles = [db.get(JDTable, job_id).job_title for job_id in summary["persisted_job_ids"]]
+    assert titles == ["Slow", "Fast"]
+
+
+def test_a_bare_list_is_accepted(client, fake_gemini):
+    lines = post_batch(client, [item("Fast")])
+    assert lines[-1] == {"type": "summary", "total": 1, "succeeded": 1, "failed": 0}
+
+
+def test_oversized_or_invalid_batches_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/api/jd/generate/batch", json={"items": [item("A"), item("B"), item("C")]})
+    assert response.status_code == 422
+    assert client.post("/api/jd/generate/batch", json={"items": []}).status_code == 422
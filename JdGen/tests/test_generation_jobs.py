@@ -0,0 +1,144 @@
+# ai_hr_jd_project/tests/test_generation_jobs.py
+import json
+import threading
+import time
+
+import pytest
+
+from config import Config
+from routes import jd_routes
+from schemas.jd_schemas import JDGenerateRequest, JobDescriptionContent
+from services.generation_jobs import (
+    FAILED, QUEUED, RUNNING, SUCCEEDED, DatabaseJobStore, GenerationJobManager, InMemoryJobStore,
+    JobQueueFullError, job_to_dict,
+)
+
+GENERATE_BODY = {
+    "job_title_input": "Platform Engineer",
+    "key_responsibilities_input": ["Run Kubernetes"],
+    "required_skills_input": ["Go"],
+}
+
+
+def generated(title: str = "Platform Engineer") -> JobDescriptionContent:
+    return JobDescriptionContent(job_title=title, role_summary="Runs the platform.",
+                                 key_responsibilities=["Run Kubernetes"], required_qualifications=["Go"])
+
+
+def wait_until_finished(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def sse_events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, db):
+    return InMemoryJobStore() if request.param == "memory" else DatabaseJobStore()
+
+
+def test_store_records_the_job_lifecycle(store):
+    store.create("job-ok", '{"job_title_input": "x"}')
+    assert store.get("job-ok")["status"] == QUEUED
+    store.mark_running("job-ok")
+    assert store.get("job-ok")["status"] == RUNNING
+    store.mark_succeeded("job-ok", generated().model_dump_json(), "miss")
+
+    public = job_to_dict(store.get("job-ok"))
+    assert (public["status"], public["cache"], public["error"]) == (SUCCEEDED, "miss", None)
+    assert public["result"]["job_title_generated"] == "Platform Engineer"
+    assert public["finished_at"].endswith("Z")
+
+    store.create("job-failed", "{}")
+    store.mark_failed("job-failed", "Gemini unavailable")
+    assert job_to_dict(store.get("job-failed"))["error"] == "Gemini unavailable"
+    assert store.get("missing") is None
+
+
+def test_store_purges_finished_and_orphaned_jobs(store):
+    store.create("fresh", "{}")
+    assert store.purge_expired(ttl_seconds=3600) == 0
+    # A negative TTL puts the cutoff in the future, so every job counts as expired
+    assert store.purge_expired(ttl_seconds=-60) >= 1
+    assert store.get("fresh") is None
+
+
+def test_manager_runs_jobs_in_the_background_and_records_failures():
+    def generate(req):
+        if req.job_title_input == "boom":
+            raise RuntimeError("generation failed")
+        return generated(req.job_title_input), "miss"
+
+    manager = GenerationJobManager(InMemoryJobStore(), generate, max_workers=2)
+    ok = manager.submit(JDGenerateRequest(**GENERATE_BODY))
+    bad = manager.submit(JDGenerateRequest(**{**GENERATE_BODY, "job_title_input": "boom"}))
+
+    assert job_to_dict(wait_until_finished(manager, ok))["result"]["job_title_generated"] == "Platform Engineer"
+    failed = wait_until_finished(manager, bad)
+    assert (failed["status"], failed["error"]) == (FAILED, "generation failed")
+
+
+def test_manager_rejects_submissions_beyond_max_pending():
+    release = threading.Event()
+
+    def generate(req):
+        release.wait(5)
+        return generated(), "miss"
+
+    manager = GenerationJobManager(InMemoryJobStore(), generate, max_workers=1, max_pending=1)
+    first = manager.submit(JDGenerateRequest(**GENERATE_BODY))
+    manager.submit(JDGenerateRequest(**GENERATE_BODY)) # waits in the queue
+    with pytest.raises(JobQueueFullError):
+        manager.submit(JDGenerateRequest(**GENERATE_BODY))
+
+    release.set()
+    wait_until_finished(manager, first)
+    # Finished jobs hand their slot back
+    wait_until_finished(manager, manager.submit(JDGenerateRequest(**GENERATE_BODY)))
+
+
+def test_events_stream_reports_status_changes_then_the_result(client, monkeypatch):
+    release = threading.Event()
+
+    def generate(req):
+        release.wait(5)
+        return generated(req.job_title_input), "miss"
+
+    monkeypatch.setattr(jd_routes, "generation_jobs", GenerationJobManager(InMemoryJobStore(), generate))
+    monkeypatch.setattr(Config, "JOB_SSE_POLL_INTERVAL_SECONDS", 0.01)
+
+    created = client.post("/api/jd/generate/jobs", json=GENERATE_BODY)
+    assert created.status_code == 202
+    body = created.get_json()
+    assert created.headers["Location"] == body["status_url"]
+
+    response = client.get(body["events_url"])
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    first = sse_events(next(chunks).decode())
+    release.set()
+    events = first + sse_events(b"".join(chunks).decode())
+
+    assert events[0][0] == "status" and events[0][1]["status"] in (QUEUED, RUNNING)
+    statuses = [data["status"] for event, data in events if event == "status"]
+    assert all(before != after for before, after in zip(statuses, statuses[1:])) # one event per change
+    event, result = events[-1]
+    assert (event, result["status"]) == ("result", SUCCEEDED)
+    assert result["result"]["job_title_generated"] == "Platform Engineer"
+
+
+def test_unknown_job_is_a_404(client):
+    assert client.get("/api/jd/generate/jobs/nope").status_code == 404
+    assert client.get("/api/jd/generate/jobs/nope/events").status_code == 404
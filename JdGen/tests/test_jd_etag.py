@@ -0,0 +1,83 @@
+# ai_hr_jd_project/tests/test_jd_etag.py
+import pytest
+
+from conftest import make_jd_request
+from schemas.jd_schemas import JDPatchRequest
+from services.jd_service import JDService, JDVersionConflictError, jd_etag, parse_jd_etag
+
+
+def jd_body(job_title: str) -> dict:
+    return make_jd_request(job_title).model_dump(mode="json", by_alias=True)
+
+
+@pytest.fixture
+def job_id(db):
+    return JDService().create_jd(db, make_jd_request("Data Engineer")).id
+
+
+def test_etag_round_trip():
+    assert parse_jd_etag(7, jd_etag(7, 3)) == 3
+    assert parse_jd_etag(8, jd_etag(7, 3)) is None # another JD's ETag
+    assert parse_jd_etag(7, "jd-7-vX") is None
+
+
+def test_get_returns_etag_and_honours_if_none_match(client, job_id):
+    response = client.get(f"/api/jd/{job_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"].strip('"')
+    assert etag == jd_etag(job_id, 1)
+
+    response = client.get(f"/api/jd/{job_id}", headers={"If-None-Match": f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_update_bumps_version_and_invalidates_old_etag(client, job_id):
+    old_etag = client.get(f"/api/jd/{job_id}").headers["ETag"]
+    response = client.put(f"/api/jd/{job_id}", json=jd_body("Senior Data Engineer"),
+                          headers={"If-Match": old_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"].strip('"') == jd_etag(job_id, 2)
+
+    response = client.get(f"/api/jd/{job_id}", headers={"If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert response.get_json()["job_title"] == "Senior Data Engineer"
+
+
+def test_stale_if_match_is_rejected_for_put_patch_and_delete(client, job_id):
+    stale = f'"{jd_etag(job_id, 1)}"'
+    assert client.put(f"/api/jd/{job_id}", json=jd_body("First writer")).status_code == 200
+
+    response = client.put(f"/api/jd/{job_id}", json=jd_body("Second writer"), headers={"If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"].strip('"') == jd_etag(job_id, 2)
+
+    response = client.patch(f"/api/jd/{job_id}", json={"job_title": "Patched"}, headers={"If-Match": stale})
+    assert response.status_code == 412
+
+    assert client.delete(f"/api/jd/{job_id}", headers={"If-Match": stale}).status_code == 412
+    assert client.get(f"/api/jd/{job_id}").get_json()["job_title"] == "First writer"
+
+
+def test_if_match_of_another_resource_never_matches(client, job_id):
+    response = client.delete(f"/api/jd/{job_id}", headers={"If-Match": f'"{jd_etag(job_id + 1000, 1)}"'})
+    assert response.status_code == 412
+
+
+def test_current_if_match_and_star_are_accepted(client, job_id):
+    response = client.patch(f"/api/jd/{job_id}", json={"status": "inactive"},
+                            headers={"If-Match": f'"{jd_etag(job_id, 1)}"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"].strip('"') == jd_etag(job_id, 2)
+    assert client.delete(f"/api/jd/{job_id}", headers={"If-Match": "*"}).status_code == 200
+    assert client.get(f"/api/jd/{job_id}").status_code == 404
+
+
+def test_service_raises_conflict_with_current_version(db, job_id):
+    service = JDService()
+    service.patch_jd(db, job_id, JDPatchRequest(job_title="Renamed"))
+    with pytest.raises(JDVersionConflictError) as excinfo:
+        service.delete_jd(db, job_id, expected_version=1)
+    assert excinfo.value.current_version == 2
+    assert service.delete_jd(db, job_id + 1000, expected_version=1) is False
+
@@ -0,0 +1,104 @@
+# ai_hr_jd_project/tests/test_jd_pagination.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+
+from conftest import make_jd_request
+from database.models import JDSkillTable, JDTable
+from services.jd_service import JDService
+
+
+@pytest.fixture
+def service(db):
+    db.execute(delete(JDSkillTable))
+    db.execute(delete(JDTable))
+    db.commit()
+    return JDService()
+
+
+def all_pages(service, db, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = service.get_jds_page(db, limit=limit, cursor=cursor, **filters)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert JDService.decode_cursor(JDService.encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W1sxXQ", "WyJ4IiwgMV0"])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        JDService.decode_cursor(cursor)
+
+
+def test_pages_cover_ties_on_created_at_without_gaps_or_repeats(service, db):
+    # bulk_insert_jds stamps one created_at on the whole batch, so only the id breaks the tie
+    ids = service.bulk_insert_jds(db, [make_jd_request(f"Engineer {i}") for i in range(7)])
+    ids += service.bulk_insert_jds(db, [make_jd_request(f"Analyst {i}") for i in range(5)])
+
+    pages = all_pages(service, db, limit=5)
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    flattened = [job_id for page in pages for job_id in page]
+    assert flattened == sorted(ids, reverse=True)
+
+
+def test_exact_multiple_of_limit_ends_without_an_empty_page(service, db):
+    service.bulk_insert_jds(db, [make_jd_request(f"Engineer {i}") for i in range(4)])
+    rows, cursor = service.get_jds_page(db, limit=4)
+    assert len(rows) == 4
+    assert cursor is None
+
+
+def test_rows_inserted_ahead_of_the_cursor_do_not_shift_later_pages(service, db):
+    ids = service.bulk_insert_jds(db, [make_jd_request(f"Engineer {i}") for i in range(6)])
+    first, cursor = service.get_jds_page(db, limit=3)
+    service.create_jd(db, make_jd_request("Newest"))
+    second, _ = service.get_jds_page(db, limit=3, cursor=cursor)
+    assert [row.id for row in first + second] == sorted(ids, reverse=True)
+
+
+def test_filters_apply_on_every_page(service, db):
+    service.bulk_insert_jds(db, [make_jd_request(f"Senior {i}") for i in range(5)]
+                            + [make_jd_request(f"Junior {i}") for i in range(5)])
+    pages = all_pages(service, db, limit=2, title_prefix="Senior")
+    titles = {row.job_title for row in db.query(JDTable).filter(JDTable.id.in_(sum(pages, [])))}
+    assert len(sum(pages, [])) == 5
+    assert all(title.startswith("Senior") for title in titles)
+
+
+def test_list_endpoint_pages_through_next_cursor_header(client, service, db):
+    ids = service.bulk_insert_jds(db, [make_jd_request(f"Engineer {i}") for i in range(5)])
+    seen, params = [], {"limit": 2}
+    while True:
+        response = client.get("/api/jd", query_string=params)
+        assert response.status_code == 200
+        seen += [item["id"] for item in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_list_endpoint_rejects_a_bad_cursor(client):
+    response = client.get("/api/jd", query_string={"cursor": "garbage"})
+    assert response.status_code == 422
+    assert "detail" in response.get_json()
+
+
+def test_list_endpoint_converts_offset_bounds_to_utc(client, service, db):
+    # expires_at is stored as naive UTC; 12:00+05:30 is 06:30 UTC
+    early, late = (service.create_jd(db, make_jd_request(title).model_copy(update={"expires_at": expires_at})).id
+                   for title, expires_at in [("Early", datetime(2030, 1, 1, 6, 0)),
+                                             ("Late", datetime(2030, 1, 1, 10, 0))])
+    after = client.get("/api/jd", query_string={"expires_after": "2030-01-01T12:00:00+05:30"})
+    before = client.get("/api/jd", query_string={"expires_before": "2030-01-01T12:00:00+05:30"})
+    assert [item["id"] for item in after.get_json()] == [late]
+    assert [item["id"] for item in before.get_json()] == [early]
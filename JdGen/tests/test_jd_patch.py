@@ -0,0 +1,96 @@
+# ai_hr_jd_project/tests/test_jd_patch.py
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from conftest import make_jd_request
+from database.models import JDSkillTable, JDTable, JobStatus
+from schemas.jd_schemas import JDPatchRequest
+from services.jd_service import JDService, jd_etag
+from services.response_cache import JDResponseCache
+
+
+class SavedListener:
+    def __init__(self):
+        self.saved = []
+
+    def on_jd_saved(self, job_id, job_title, status, jd_content_json):
+        self.saved.append((job_id, job_title, status, json.loads(jd_content_json)))
+
+
+@pytest.fixture
+def service():
+    return JDService()
+
+
+@pytest.fixture
+def job_id(db, service):
+    jd = make_jd_request("Data Engineer", benefits=["Pension"]).model_copy(
+        update={"expires_at": datetime(2030, 1, 1)})
+    return service.create_jd(db, jd).id
+
+
+def stored(db, job_id):
+    db.expire_all()
+    return db.get(JDTable, job_id)
+
+
+def test_patch_merges_nested_fields_and_assigns_scalars(db, service, job_id):
+    listener, cache = SavedListener(), JDResponseCache()
+    service.add_listener(listener)
+    service.add_listener(cache)
+    cache.set(job_id, b"{}", jd_etag(job_id, 1), generation=cache.generation)
+
+    patch = JDPatchRequest(
+        job_title="Staff Data Engineer",
+        status="inactive",
+        expires_at=None, # explicitly sent, so it clears the column
+        jd_content={"role_summary": "Owns the data platform.", "required_qualifications": ["Spark", "Python"]},
+    )
+    row = service.patch_jd(db, job_id, patch, expected_version=1)
+
+    jd = stored(db, job_id)
+    content = json.loads(jd.jd_content_json)
+    assert content["role_summary"] == "Owns the data platform."
+    assert content["required_qualifications"] == ["Spark", "Python"]
+    # Fields that weren't sent keep their stored values
+    assert content["key_responsibilities"] == ["Design APIs", "Review code"]
+    assert content["benefits"] == ["Pension"]
+    assert content["job_title_generated"] == "Data Engineer"
+
+    assert (jd.job_title, jd.status, jd.expires_at, jd.version) == ("Staff Data Engineer", JobStatus.INACTIVE, None, 2)
+    assert row.version == 2
+    assert "owns the data platform" in jd.search_text.lower()
+    skills = db.execute(select(JDSkillTable.skill).where(JDSkillTable.job_id == job_id)).scalars().all()
+    assert sorted(skills) == ["Python", "Spark"]
+
+    assert listener.saved == [(job_id, "Staff Data Engineer", "inactive", content)]
+    assert cache.get(job_id) is None
+
+
+def test_patch_without_content_changes_leaves_the_json_alone(db, service, job_id):
+    before = stored(db, job_id).jd_content_json
+    service.patch_jd(db, job_id, JDPatchRequest(job_title="Renamed"))
+    jd = stored(db, job_id)
+    assert jd.jd_content_json == before
+    assert (jd.job_title, jd.version, jd.expires_at) == ("Renamed", 2, datetime(2030, 1, 1))
+
+
+def test_patch_of_a_missing_jd_returns_none(db, service):
+    assert service.patch_jd(db, 999_999, JDPatchRequest(job_title="Nobody")) is None
+
+
+def test_patch_endpoint_serves_the_new_version_after_a_cached_read(client, job_id):
+    old = client.get(f"/api/jd/{job_id}")
+    assert client.get(f"/api/jd/{job_id}").headers["X-Cache"] == "HIT"
+
+    response = client.patch(f"/api/jd/{job_id}", json={"jd_content": {"benefits": ["Remote"]}},
+                            headers={"If-Match": old.headers["ETag"]})
+    assert response.status_code == 200
+
+    fresh = client.get(f"/api/jd/{job_id}")
+    assert fresh.headers["ETag"].strip('"') == jd_etag(job_id, 2)
+    assert fresh.get_json()["jd_content"]["benefits"] == ["Remote"]
+    assert fresh.get_json()["jd_content"]["role_summary"] == "Builds and runs backend services."
@@ -0,0 +1,70 @@
+# ai_hr_jd_project/tests/test_json_stream.py
+import json
+
+import pytest
+
+from services.json_stream import IncrementalJSONObjectParser
+
+DOCUMENT = {
+    "job_title": "Senior \"Platform\" Engineer",
+    "role_summary": "Owns {braces}, [brackets], commas, and a \\ backslash.",
+    "key_responsibilities": ["Ship, then measure", "Escape \"quotes\""],
+    "details": {"nested": {"level": 2}, "list": [1, [2, 3]]},
+    "remote": True,
+    "headcount": 3,
+    "manager": None,
+    "benefits": ["Unicode: café ☃"],
+}
+TEXT = json.dumps(DOCUMENT, indent=2)
+
+
+def feed_in_chunks(text: str, size: int):
+    parser = IncrementalJSONObjectParser()
+    members = []
+    for start in range(0, len(text), size):
+        members.extend(parser.feed(text[start:start + size]))
+    return parser, members
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(TEXT)])
+def test_members_survive_any_chunk_boundary(size):
+    parser, members = feed_in_chunks(TEXT, size)
+    assert parser.done
+    assert members == list(DOCUMENT.items())
+
+
+def test_every_split_point_inside_strings_and_escapes():
+    text = json.dumps({"a": "x\\\"y,}", "b": ["\\\\", "\"]"]})
+    for split in range(1, len(text)):
+        parser = IncrementalJSONObjectParser()
+        members = parser.feed(text[:split]) + parser.feed(text[split:])
+        assert dict(members) == json.loads(text), f"split at {split}"
+
+
+def test_member_is_reported_once_it_is_complete():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"role_summary": "Writes') == []
+    assert parser.feed(' code", "benefits": [') == [("role_summary", "Writes code")]
+    assert parser.feed('"Gym"]}') == [("benefits", ["Gym"])]
+    assert parser.done
+
+
+def test_input_after_the_object_is_ignored():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"a": 1}\n{"b": 2}') == [("a", 1)]
+    assert parser.feed('{"c": 3}') == []
+    assert parser.done
+
+
+def test_empty_object_and_empty_chunks():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed("") == []
+    assert parser.feed("  {  ") == []
+    assert parser.feed("}") == []
+    assert parser.done
+
+
+def test_malformed_member_raises():
+    parser = IncrementalJSONObjectParser()
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed('{"a": tru, "b": 1}')
@@ -0,0 +1,81 @@
+# ai_hr_jd_project/tests/test_prompt_compiler.py
+from schemas.jd_schemas import JDGenerateRequest
+from services.prompt_compiler import SYSTEM_INSTRUCTION, PromptCompiler, estimate_tokens
+
+
+def request(responsibilities, skills, description=None, title="Backend Engineer") -> JDGenerateRequest:
+    return JDGenerateRequest(job_title_input=title, key_responsibilities_input=responsibilities,
+                             required_skills_input=skills, company_description_input=description)
+
+
+def listed(contents: str, heading: str) -> list[str]:
+    lines = contents.splitlines()
+    start = lines.index(heading) + 1
+    items = []
+    for line in lines[start:]:
+        if not line.startswith("- "):
+            break
+        items.append(line[2:])
+    return items
+
+
+def compiler_with_budget(content_tokens: int, **kwargs) -> PromptCompiler:
+    # The budget left for the user message is what remains after the fixed instructions
+    return PromptCompiler(max_input_tokens=estimate_tokens(SYSTEM_INSTRUCTION) + content_tokens, **kwargs)
+
+
+def test_duplicates_are_dropped_case_insensitively_keeping_the_first_spelling():
+    prompt = PromptCompiler().compile(request(
+        ["Design  APIs", "design apis.", "  ", "Review code"],
+        ["Python", "PYTHON", "python.", "SQL"],
+    ))
+    assert listed(prompt.contents, "Key Responsibilities:") == ["Design APIs", "Review code"]
+    assert listed(prompt.contents, "Required Skills/Qualifications:") == ["Python", "SQL"]
+    assert prompt.dropped == {"duplicate": 3, "max_items": 0, "budget": 0}
+
+
+def test_lists_are_capped_and_long_items_clipped_at_a_word_boundary():
+    prompt = PromptCompiler(max_list_items=2, max_item_chars=20).compile(request(
+        ["Own the whole payments platform end to end", "Mentor", "Hire"], ["Go"],
+    ))
+    assert listed(prompt.contents, "Key Responsibilities:") == ["Own the whole...", "Mentor"]
+    assert prompt.dropped["max_items"] == 1
+
+
+def test_budget_trims_the_longer_list_from_the_end_but_keeps_one_item_each():
+    responsibilities = [f"Responsibility number {i} with some detail" for i in range(20)]
+    compiler = compiler_with_budget(80)
+    prompt = compiler.compile(request(responsibilities, ["Python", "SQL"]))
+
+    kept = listed(prompt.contents, "Key Responsibilities:")
+    assert kept == responsibilities[:len(kept)] # the first, most important items survive
+    assert 1 <= len(kept) < len(responsibilities)
+    assert listed(prompt.contents, "Required Skills/Qualifications:") == ["Python", "SQL"]
+    assert prompt.dropped["budget"] == len(responsibilities) - len(kept)
+    assert prompt.estimated_tokens <= compiler.max_input_tokens
+
+    tiny = compiler_with_budget(1).compile(request(responsibilities, ["Python", "SQL"]))
+    assert len(listed(tiny.contents, "Key Responsibilities:")) == 1
+    assert len(listed(tiny.contents, "Required Skills/Qualifications:")) == 1
+
+
+def test_a_long_company_description_is_shortened_before_any_list_item():
+    compiler = compiler_with_budget(120)
+    prompt = compiler.compile(request(["Design APIs", "Review code"], ["Python", "SQL"], description="Acme " * 400))
+
+    assert prompt.description_clipped
+    assert prompt.dropped["budget"] == 0
+    assert prompt.estimated_tokens <= compiler.max_input_tokens
+
+
+def test_the_system_instruction_is_identical_for_every_request_and_stats_add_up():
+    compiler = compiler_with_budget(5)
+    first = compiler.compile(request(["Design APIs"], ["Python"], title="A"))
+    second = compiler.compile(request(["Review code"], ["Go"], title="B"))
+    assert first.system_instruction == second.system_instruction == SYSTEM_INSTRUCTION
+    assert first.contents != second.contents
+
+    stats = compiler.stats()
+    assert stats["compiled"] == 2
+    assert stats["over_budget"] == 2 # one item of each list is kept even when it doesn't fit
+    assert stats["largest_estimated_tokens"] == max(first.estimated_tokens, second.estimated_tokens)
@@ -0,0 +1,77 @@
+# ai_hr_jd_project/tests/test_response_cache.py
+from services.response_cache import JDResponseCache
+
+
+class DictTier:
+    """In-memory stand-in for RedisResponseTier."""
+
+    def __init__(self):
+        self.url = "dict://"
+        self.entries = {}
+        self.on_set = None
+        self.fail = False
+
+    def get(self, job_id):
+        return self.entries.get(job_id)
+
+    def get_etag(self, job_id):
+        if self.fail:
+            raise ConnectionError("tier down")
+        entry = self.entries.get(job_id)
+        return entry[1] if entry else None
+
+    def set(self, job_id, body, etag, ttl):
+        self.entries[job_id] = (body, etag)
+        if self.on_set:
+            self.on_set()
+
+    def delete(self, job_id):
+        self.entries.pop(job_id, None)
+
+
+def test_body_read_before_an_invalidation_is_not_cached():
+    cache = JDResponseCache()
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set(1, b"stale", "jd-1-v1", generation=generation)
+    assert cache.get(1) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_current_generation_is_cached():
+    cache = JDResponseCache()
+    cache.set(1, b"fresh", "jd-1-v2", generation=cache.generation)
+    assert cache.get(1) == (b"fresh", "jd-1-v2")
+
+
+def test_invalidation_during_the_shared_write_removes_the_shared_entry():
+    tier = DictTier()
+    cache = JDResponseCache(shared_tier=tier)
+    tier.on_set = lambda: cache.invalidate(1) # a write lands while the stale body is being stored
+    cache.set(1, b"stale", "jd-1-v1", generation=cache.generation)
+    assert 1 not in tier.entries
+    assert cache.get(1) is None
+
+
+def test_write_on_another_replica_is_seen_on_the_next_local_hit():
+    tier = DictTier()
+    replica_a, replica_b = JDResponseCache(shared_tier=tier), JDResponseCache(shared_tier=tier)
+    replica_b.set(1, b"v1", "jd-1-v1", generation=replica_b.generation)
+    assert replica_b.get(1) == (b"v1", "jd-1-v1")
+
+    replica_a.on_jd_saved(1, "Engineer", "inactive", "{}") # e.g. the expiry sweeper on the lease holder
+    assert replica_b.get(1) is None
+    assert replica_b.stats()["stale_drops"] == 1
+
+    replica_a.set(1, b"v2", "jd-1-v2", generation=replica_a.generation)
+    assert replica_b.get(1) == (b"v2", "jd-1-v2")
+
+
+def test_local_copy_is_served_while_the_tier_is_down_within_the_local_ttl():
+    tier = DictTier()
+    cache = JDResponseCache(shared_tier=tier, ttl_seconds=300, local_ttl_seconds=30)
+    cache.set(1, b"v1", "jd-1-v1", generation=cache.generation)
+    tier.fail = True
+    assert cache.get(1) == (b"v1", "jd-1-v1")
+    assert cache.stats()["local_ttl_seconds"] == 30
+    assert JDResponseCache(ttl_seconds=300).stats()["local_ttl_seconds"] == 300
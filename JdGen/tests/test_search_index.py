@@ -0,0 +1,92 @@
+# ai_hr_jd_project/tests/test_search_index.py
+import json
+
+from sqlalchemy import insert
+
+from conftest import make_jd_request
+from database.models import JDTable, JobStatus
+from routes.jd_routes import jd_service
+from services.jd_service import JDService
+from services.search_index import InvertedIndex, SearchService
+
+
+def ids(results):
+    return [result["id"] for result in results]
+
+
+def test_bm25_prefers_title_matches_and_rare_terms():
+    index = InvertedIndex()
+    index.add(1, "Kafka Engineer", "active", "Builds streaming services.")
+    index.add(2, "Backend Engineer", "active", "Maintains Kafka consumers among many other services and tools.")
+    index.add(3, "Backend Engineer", "active", "Writes Python services.")
+
+    assert ids(index.search("kafka")) == [1, 2] # boosted title beats one mention in a longer text
+    scores = {result["id"]: result["score"] for result in index.search("kafka python")}
+    assert scores[3] > 0 and set(scores) == {1, 2, 3}
+    # "services" is in every document and adds almost nothing; the rarer "python" decides
+    assert ids(index.search("python services"))[0] == 3
+
+
+def test_stop_words_and_empty_queries_match_nothing():
+    index = InvertedIndex()
+    index.add(1, "Engineer", "active", "The role is for you.")
+    assert index.search("the for you") == []
+    assert index.search("") == []
+
+
+def test_phrase_queries_require_the_words_in_order():
+    index = InvertedIndex()
+    index.add(1, "Data Engineer", "active", "Builds data pipelines on Spark.")
+    index.add(2, "Analyst", "active", "Pipelines for data quality reports.")
+
+    assert set(ids(index.search("data pipelines"))) == {1, 2}
+    assert ids(index.search('"data pipelines"')) == [1]
+
+
+def test_status_filter_and_updates_replace_the_old_terms():
+    index = InvertedIndex()
+    index.add(1, "Engineer", "active", "Terraform and AWS.")
+    index.add(2, "Engineer", "inactive", "Terraform and GCP.")
+    assert ids(index.search("terraform", status="inactive")) == [2]
+
+    index.add(1, "Engineer", "active", "Pulumi and AWS.")
+    assert ids(index.search("terraform")) == [2]
+    index.remove(2)
+    assert index.search("terraform") == []
+    assert len(index) == 1
+
+
+def test_rebuild_reads_the_table_and_follows_writes(db):
+    service = JDService()
+    search = SearchService(backend="memory")
+    service.add_listener(search)
+    created = service.create_jd(db, make_jd_request("Zebrafish Biologist")).id
+    # A row from before the search_text column: extracted from jd_content_json on rebuild
+    legacy = db.execute(insert(JDTable).values(
+        job_title="Lab Manager", status=JobStatus.ACTIVE, search_text=None,
+        jd_content_json=json.dumps({**make_jd_request().jd_content.model_dump(), "role_summary": "Runs the zebrafish lab."}),
+    )).inserted_primary_key[0]
+    db.commit()
+
+    assert set(ids(search.search(db, "zebrafish")["results"])) == {created, legacy}
+
+    # Known rows are indexed as they are written; a write of unknown rows forces a rebuild
+    service.delete_jd(db, legacy)
+    assert ids(search.search(db, "zebrafish")["results"]) == [created]
+    db.execute(insert(JDTable).values(job_title="Zebrafish Technician", status=JobStatus.ACTIVE,
+                                      jd_content_json=make_jd_request().jd_content.model_dump_json()))
+    db.commit()
+    search.on_jds_changed()
+    assert len(search.search(db, "zebrafish")["results"]) == 2
+
+
+def test_search_endpoint_pages_and_validates(client, db):
+    for i in range(3):
+        jd_service.create_jd(db, make_jd_request(f"Quokka Keeper {i}"))
+
+    response = client.get("/api/jd/search", query_string={"q": "quokka", "page": 2, "page_size": 2})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["total"], body["page"], len(body["results"])) == (3, 2, 1)
+    assert client.get("/api/jd/search").status_code == 422
+    assert client.get("/api/jd/search", query_string={"q": "quokka", "status": "gone"}).status_code == 422
@@ -0,0 +1,84 @@
+# ai_hr_jd_project/tests/test_similar_jds.py
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from conftest import make_jd_request
+from database import connection
+from schemas.jd_schemas import JDGenerateRequest
+from services.jd_service import JDService
+from services.similar_jds import SimilarJDService
+
+
+def generate_request(title: str, skills=("Kotlin", "Gradle")) -> JDGenerateRequest:
+    return JDGenerateRequest(job_title_input=title, key_responsibilities_input=["Build Android apps"],
+                             required_skills_input=list(skills))
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def statements():
+    # SQL run on the test's own thread, i.e. by the lookup, not by the background sync
+    executed = []
+    engine = connection.get_engine()
+    test_thread = threading.current_thread()
+
+    def listener(conn, cursor, statement, *args):
+        if threading.current_thread() is test_thread:
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+@pytest.fixture
+def make_service(db):
+    JDService().create_jd(db, make_jd_request("Senior Android Developer", required_qualifications=["Kotlin", "Gradle"]))
+    started = []
+
+    def factory(mode: str) -> SimilarJDService:
+        service = SimilarJDService(mode=mode, threshold=0.8, sync_interval=3600)
+        service.start()
+        started.append(service)
+        wait_for(lambda: service.stats()["ready"])
+        return service
+
+    yield factory
+    for service in started:
+        service.stop()
+
+
+def test_offer_mode_lookup_only_reads_memory(make_service, statements):
+    service = make_service("offer")
+    match = service.best_match(generate_request("Sr. Android Engineer"))
+    assert match is not None and match.score >= 0.8
+    assert match.content is None
+    assert statements == []
+
+
+def test_return_mode_reads_only_the_matched_content(make_service, statements):
+    service = make_service("return")
+    match = service.best_match(generate_request("Sr. Android Engineer"))
+    assert match.content.job_title_generated == "Senior Android Developer"
+    assert len(statements) == 1 and "jd_content_json" in statements[0]
+
+
+def test_no_sync_in_the_request_after_a_bulk_write(make_service, db, statements):
+    service = make_service("offer")
+    jd_service = JDService()
+    jd_service.add_listener(service)
+    jd_service.bulk_insert_jds(db, [make_jd_request("Staff iOS Developer", required_qualifications=["Swift"])],
+                               return_ids=False)
+    statements.clear()
+    # The bulk write wakes the background thread; the lookups themselves never sync
+    wait_for(lambda: service.best_match(generate_request("Staff iOS Engineer", skills=["Swift"])) is not None)
+    assert statements == []
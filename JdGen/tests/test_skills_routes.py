@@ -0,0 +1,34 @@
+# ai_hr_jd_project/tests/test_skills_routes.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import make_jd_request
+from services.jd_service import JDService
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@pytest.fixture
+def skill(db):
+    JDService().create_jd(db, make_jd_request("Cobol Engineer", required_qualifications=["COBOL 85"]))
+    return "cobol 85"
+
+
+def top_skill_keys(client, **params):
+    response = client.get("/api/jd/skills/top", query_string={"limit": 100, **params})
+    assert response.status_code == 200
+    return {row["skill"] for row in response.get_json()}
+
+
+def test_created_bounds_with_offsets_are_converted_to_utc(client, skill):
+    hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    # The same instant written in UTC and in +05:30 must filter the same way
+    assert skill in top_skill_keys(client, created_after=hour_ago.isoformat())
+    assert skill in top_skill_keys(client, created_after=hour_ago.astimezone(IST).isoformat())
+    assert skill not in top_skill_keys(client, created_before=hour_ago.astimezone(IST).isoformat())
+
+
+def test_bad_created_bound_is_rejected(client):
+    response = client.get("/api/jd/skills/top", query_string={"created_after": "yesterday"})
+    assert response.status_code == 422
@@ -1,3 +1,7 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
 import streamlit as st
 
@@ -5,12 +9,135 @@ import streamlit as st
 session = requests.Session()
 BASE_URL = "http://127.0.0.1:8085/api/jd" # Make sure this matches your Flask app's address
 
-def generate_jd_from_api(payload: dict):
-    """Calls the /generate endpoint."""
+# Streamlit reruns the whole script on every interaction (each keystroke in the delete
+# confirmation, each widget in the edit form), so the same list page and JD are read
+# over and over. Reads younger than these TTLs are answered from memory without a
+# request; older ones are revalidated with If-None-Match, usually getting a 304.
+LIST_CACHE_TTL_SECONDS = 15
+DETAIL_CACHE_TTL_SECONDS = 60
+_MAX_CACHE_ENTRIES = 256
+
+# Request key -> (fetched_at, etag, parsed body, response headers). The module is imported
+# once per Streamlit server, so every browser session shares it; writes made through this
+# client invalidate it for all of them, other writers show up after the TTL.
+_cache: dict[str, tuple[float, str | None, object, dict]] = {}
+_cache_lock = threading.Lock()
+# Bumped by every write through this client; a GET that started before a write may have
+# read the old version (e.g. a slow prefetch racing an update), so it is not cached
+_generation = 0
+
+# Background detail fetches for the JDs next to the selected one
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jd-prefetch")
+_inflight: dict[str, Future] = {}
+
+def _cache_key(url: str, params: dict | None = None) -> str:
+    return url if not params else f"{url}?{sorted(params.items())}"
+
+def _detail_url(job_id: int) -> str:
+    return f"{BASE_URL}/{job_id}"
+
+def _store(key: str, etag: str | None, data, headers, generation: int | None = None) -> None:
+    """Caches a response. With the `generation` read before the GET, skips it if a write happened since."""
+    global _generation
+    with _cache_lock:
+        if generation is None:
+            _generation += 1 # a write's own result: newer than anything still in flight
+        elif generation != _generation:
+            return
+        _cache.pop(key, None)
+        _cache[key] = (time.monotonic(), etag, data, headers)
+        while len(_cache) > _MAX_CACHE_ENTRIES:
+            _cache.pop(next(iter(_cache))) # oldest first
+
+def _cached_get(url: str, params: dict | None = None, ttl: float = 0):
+    """
+    GET through the cache. Returns (body, headers): straight from memory while the
+    entry is younger than `ttl`, otherwise revalidated with If-None-Match.
+    """
+    key = _cache_key(url, params)
+    with _cache_lock:
+        cached = _cache.get(key)
+        generation = _generation
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[2], cached[3]
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+    response = session.get(url, params=params, headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        _store(key, cached[1], cached[2], response.headers, generation)
+        return cached[2], response.headers
+    response.raise_for_status()
+    data = response.json()
+    _store(key, response.headers.get("ETag"), data, response.headers, generation)
+    return data, response.headers
+
+def _invalidate_detail(job_id: int) -> None:
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _cache.pop(_detail_url(job_id), None)
+
+def _invalidate_lists() -> None:
+    # Any write can move a JD in or out of every list page and filter
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        for key in [key for key in _cache if key == BASE_URL or key.startswith(f"{BASE_URL}?")]:
+            del _cache[key]
+
+def _fetch_detail(job_id: int):
+    # Shares a fetch already in flight (e.g. a prefetch of the JD just selected)
+    url = _detail_url(job_id)
+    with _cache_lock:
+        future = _inflight.get(url)
+    if future is not None:
+        try:
+            future.result(timeout=10)
+        except Exception:
+            pass # a failed prefetch is retried below, where the error gets reported
+    jd, headers = _cached_get(url, ttl=DETAIL_CACHE_TTL_SECONDS)
+    return jd, headers.get("ETag")
+
+def _prefetch(url: str) -> None:
     try:
-        response = session.post(f"{BASE_URL}/generate", json=payload, timeout=60)
+        _cached_get(url, ttl=DETAIL_CACHE_TTL_SECONDS)
+    except requests.exceptions.RequestException:
+        pass # best effort; there is no Streamlit context here to report it in
+    finally:
+        with _cache_lock:
+            _inflight.pop(url, None)
+
+def prefetch_jd_details(job_ids) -> None:
+    """Loads the given JDs into the cache in the background, skipping fresh and in-flight ones."""
+    now = time.monotonic()
+    with _cache_lock:
+        for job_id in job_ids:
+            url = _detail_url(job_id)
+            cached = _cache.get(url)
+            if url in _inflight or (cached and now - cached[0] < DETAIL_CACHE_TTL_SECONDS):
+                continue
+            _inflight[url] = _prefetch_pool.submit(_prefetch, url)
+
+def generate_jd_from_api(payload: dict, poll_interval: float = 1.0, max_wait: float = 120):
+    """Submits a /generate/jobs job and polls it until the JD is ready."""
+    try:
+        response = session.post(f"{BASE_URL}/generate/jobs", json=payload, timeout=10)
         response.raise_for_status()  # Raises an exception for 4XX/5XX errors
-        return response.json()
+        job_id = response.json()["job_id"]
+
+        # Each poll is a cheap request, so no backend worker is held for the whole generation
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            response = session.get(f"{BASE_URL}/generate/jobs/{job_id}", timeout=10)
+            response.raise_for_status()
+            job = response.json()
+            if job["status"] == "succeeded":
+                return job["result"]
+            if job["status"] == "failed":
+                st.error(f"API Error: JD generation failed. Details: {job.get('error')}")
+                return None
+            time.sleep(poll_interval)
+        st.error("API Error: JD generation timed out. Please try again.")
+        return None
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to connect or generate JD. Details: {e}")
         # Try to parse the error from the response if possible
@@ -22,11 +149,38 @@ def generate_jd_from_api(payload: dict):
                 pass
         return None
 
+def stream_jd_from_api(payload: dict):
+    """
+    Calls the /generate/stream endpoint and yields (event, data) pairs as the
+    server-sent events arrive: ("field", {"name", "value"}) per completed
+    section, then ("done", full_jd) or ("error", details).
+    """
+    try:
+        with session.post(f"{BASE_URL}/generate/stream", json=payload, stream=True, timeout=(10, 90)) as response:
+            response.raise_for_status()
+            event, data_lines = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line == "":
+                    # A blank line terminates one event
+                    if event and data_lines:
+                        yield event, json.loads("\n".join(data_lines))
+                    event, data_lines = None, []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Error: Failed to connect or generate JD. Details: {e}")
+        yield "error", {"error": str(e)}
+
 def save_jd_to_db(payload: dict):
     """Calls the POST / endpoint to create a new JD."""
     try:
         response = session.post(BASE_URL, json=payload, timeout=10)
         response.raise_for_status()
+        _invalidate_lists()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to save JD. Details: {e}")
@@ -38,32 +192,53 @@ def save_jd_to_db(payload: dict):
                 pass
         return None
 
-def get_all_jds():
-    """Calls the GET / endpoint to list all JDs."""
+def get_jds_page(cursor: str | None = None, limit: int = 25, status: str | None = None, title_prefix: str | None = None):
+    """Calls GET / for one page. Returns (items, next_cursor); next_cursor is None on the last page."""
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    if status:
+        params["status"] = status
+    if title_prefix:
+        params["title_prefix"] = title_prefix
     try:
-        response = session.get(BASE_URL, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        items, headers = _cached_get(BASE_URL, params=params, ttl=LIST_CACHE_TTL_SECONDS)
+        return items, headers.get("X-Next-Cursor")
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to retrieve job descriptions. Is the backend server running?")
-        return []
+        return [], None
 
 def get_jd_details(job_id: int):
-    """Calls the GET /{job_id} endpoint."""
+    """
+    Calls the GET /{job_id} endpoint. Returns (jd, etag), or (None, None) on
+    error. Keep the etag with whatever the user edits and pass it back to
+    update_jd_in_db/delete_jd_from_db: the cache here is shared by every
+    browser session and may already hold a newer version by then.
+    """
     try:
-        response = session.get(f"{BASE_URL}/{job_id}", timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return _fetch_detail(job_id)
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to retrieve JD details. Details: {e}")
-        return None
+        return None, None
+
+def _if_match_headers(etag: str | None) -> dict:
+    # Pins a write to the version the user was looking at
+    return {"If-Match": etag} if etag else {}
 
-def update_jd_in_db(job_id: int, payload: dict):
-    """Calls the PUT /{job_id} endpoint."""
+def update_jd_in_db(job_id: int, payload: dict, etag: str | None = None):
+    """Calls the PUT /{job_id} endpoint; with `etag`, only if the JD is still at that version."""
     try:
-        response = session.put(f"{BASE_URL}/{job_id}", json=payload, timeout=10)
+        response = session.put(f"{BASE_URL}/{job_id}", json=payload, headers=_if_match_headers(etag), timeout=10)
+        if response.status_code == 412:
+            _invalidate_detail(job_id)
+            st.error("This job description was changed by someone else after you opened it. Reload it and try again.")
+            return None
         response.raise_for_status()
-        return response.json()
+        jd = response.json()
+        # The response is the new version, so the next read needs no request
+        _store(_detail_url(job_id), response.headers.get("ETag"), jd, response.headers)
+        _invalidate_lists()
+        return jd
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to update JD. Details: {e}")
         if e.response is not None:
@@ -74,11 +249,16 @@ def update_jd_in_db(job_id: int, payload: dict):
                 pass
         return None
 
-def delete_jd_from_db(job_id: int):
-    """Calls the DELETE /{job_id} endpoint."""
+def delete_jd_from_db(job_id: int, etag: str | None = None):
+    """Calls the DELETE /{job_id} endpoint; with `etag`, only if the JD is still at that version."""
     try:
-        response = session.delete(f"{BASE_URL}/{job_id}", timeout=10)
+        response = session.delete(f"{BASE_URL}/{job_id}", headers=_if_match_headers(etag), timeout=10)
+        _invalidate_detail(job_id)
+        if response.status_code == 412:
+            st.error("This job description was changed by someone else after you opened it. Reload it and try again.")
+            return None
         response.raise_for_status()
+        _invalidate_lists()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: Failed to delete JD. Details: {e}")
@@ -1,9 +1,10 @@
 import streamlit as st
 from api_client import (
-    generate_jd_from_api,
+    stream_jd_from_api,
     save_jd_to_db,
-    get_all_jds,
+    get_jds_page,
     get_jd_details,
+    prefetch_jd_details,
     update_jd_in_db,
     delete_jd_from_db,
 )
@@ -54,12 +55,13 @@ st.markdown("""
 
 
 # --- Helper function to display JD content ---
+# Works with a partial dict too, so it can re-render while sections are still streaming in
 def display_jd(jd_content):
-    st.subheader(jd_content.get("job_title_generated", "Job Description"))
+    st.subheader(jd_content.get("job_title_generated") or "Job Description")
     
-    if "company_summary" in jd_content:
+    if jd_content.get("company_summary"):
         st.markdown(f"**Company Summary:** {jd_content['company_summary']}")
-    if "role_summary" in jd_content:
+    if jd_content.get("role_summary"):
         st.markdown(f"**Role Summary:** {jd_content['role_summary']}")
 
     st.markdown("---")
@@ -108,13 +110,25 @@ def page_create_jd():
                 "required_skills_input": required_skills_input.split('\n'),
                 "company_description_input": company_description_input
             }
-            with st.spinner("🤖 The AI is crafting the perfect job description..."):
-                generated_content = generate_jd_from_api(payload)
-                # Store the generated content in session state to use it after the rerun
-                if generated_content:
-                    st.session_state.generated_jd = generated_content
-                else:
-                    st.session_state.generated_jd = None # Clear if generation failed
+            # Render each section as soon as the backend streams it in
+            st.info("🤖 The AI is crafting the perfect job description...")
+            live_preview = st.empty()
+            partial_jd, generated_content = {}, None
+            for event, data in stream_jd_from_api(payload):
+                if event == "field":
+                    partial_jd[data["name"]] = data["value"]
+                    with live_preview.container(border=True):
+                        display_jd(partial_jd)
+                elif event == "done":
+                    generated_content = data
+                elif event == "error":
+                    st.error(f"Backend Error Message: {data}")
+            live_preview.empty()
+            # Store the generated content in session state to use it after the rerun
+            if generated_content:
+                st.session_state.generated_jd = generated_content
+            else:
+                st.session_state.generated_jd = None # Clear if generation failed
     
     # This part runs after the form submission and after the page reruns
     if "generated_jd" in st.session_state and st.session_state.generated_jd:
@@ -152,12 +166,48 @@ def page_create_jd():
 # --- Page: Manage Existing Job Descriptions ---
 def page_manage_jds():
     st.markdown('<p class="main-header">Manage Job Descriptions</p>', unsafe_allow_html=True)
-    
-    jd_list = get_all_jds()
+
+    # --- Filters & paging ---
+    # The backend pages with opaque cursors, so we keep a stack of the cursors that led to each page
+    filter_col1, filter_col2, filter_col3 = st.columns([2, 1, 1])
+    with filter_col1:
+        title_filter = st.text_input("Filter by title prefix", placeholder="e.g., Senior")
+    with filter_col2:
+        status_filter = st.selectbox("Status", options=["all", "active", "inactive"])
+    with filter_col3:
+        page_size = st.selectbox("Page size", options=[10, 25, 50, 100], index=1)
+
+    filter_key = (title_filter, status_filter, page_size)
+    if st.session_state.get("jd_page_filter_key") != filter_key:
+        st.session_state.jd_page_filter_key = filter_key
+        st.session_state.jd_page_cursors = [None]
+    cursors = st.session_state.jd_page_cursors
+
+    jd_list, next_cursor = get_jds_page(
+        cursor=cursors[-1],
+        limit=page_size,
+        status=None if status_filter == "all" else status_filter,
+        title_prefix=title_filter or None,
+    )
     if not jd_list:
-        st.info("No job descriptions found in the database. Go to the 'Create' page to add one!")
+        if len(cursors) == 1 and not title_filter and status_filter == "all":
+            st.info("No job descriptions found in the database. Go to the 'Create' page to add one!")
+        else:
+            st.info("No job descriptions match these filters.")
         return
 
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with page_col:
+        st.markdown(f"<p style='text-align: center'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+    with next_col:
+        if st.button("Next ➡️", disabled=next_cursor is None, use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+
     # Create a mapping from a display string to the ID
     jd_options = {f"{jd['job_title']} (ID: {jd['id']})": jd['id'] for jd in jd_list}
     selected_jd_display = st.selectbox("Select a Job Description to View or Edit", options=jd_options.keys())
@@ -167,9 +217,30 @@ def page_manage_jds():
         
         # Fetch full details
         with st.spinner("Loading details..."):
-            jd_details = get_jd_details(selected_id)
+            latest_jd, latest_etag = get_jd_details(selected_id)
+
+        # Warm the cache for the JDs either side of this one, the likeliest next picks
+        page_ids = list(jd_options.values())
+        position = page_ids.index(selected_id)
+        prefetch_jd_details(page_ids[max(0, position - 1):position] + page_ids[position + 1:position + 2])
+
+        # The page, the edit form and the delete button all work on the version this session
+        # first rendered, together with its ETag. Reruns can read a newer version from the
+        # client's shared cache, and If-Match must name the version the user actually saw.
+        snapshot = st.session_state.get("jd_edit_snapshot")
+        if latest_jd and (snapshot is None or snapshot["id"] != selected_id):
+            snapshot = {"id": selected_id, "jd": latest_jd, "etag": latest_etag}
+            st.session_state.jd_edit_snapshot = snapshot
+
+        if latest_jd:
+            jd_details, jd_etag = snapshot["jd"], snapshot["etag"]
+            if latest_etag != jd_etag:
+                st.warning("This job description was changed after you opened it. "
+                           "Saving or deleting will fail until you load the latest version.")
+                if st.button("🔄 Load latest version"):
+                    del st.session_state.jd_edit_snapshot
+                    st.rerun()
 
-        if jd_details:
             _, edit_tab, delete_tab = st.tabs(["📄 View Details", "✏️ Edit JD", "🗑️ Danger Zone"])
 
             # --- View Tab ---
@@ -222,8 +293,9 @@ def page_manage_jds():
                             }
                         }
                         with st.spinner("Updating..."):
-                            result = update_jd_in_db(selected_id, update_payload)
+                            result = update_jd_in_db(selected_id, update_payload, etag=jd_etag)
                             if result:
+                                del st.session_state.jd_edit_snapshot # render the saved version next
                                 st.success("Update successful! The page will now reload.")
                                 st.rerun()
 
@@ -238,8 +310,9 @@ def page_manage_jds():
                 if confirmation_input == confirm_text:
                     if st.button("DELETE PERMANENTLY", type="primary", use_container_width=True):
                         with st.spinner("Deleting..."):
-                            result = delete_jd_from_db(selected_id)
+                            result = delete_jd_from_db(selected_id, etag=jd_etag)
                             if result:
+                                del st.session_state.jd_edit_snapshot
                                 st.success("Job Description deleted successfully. The page will now reload.")
                                 st.rerun()
                 else: